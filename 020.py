@@ -1,13 +1,35 @@
 import oracledb
-import pandas as pd
+import time
+from batch_sizing import AdaptiveBatchSizer, DEFAULT_TARGET_BYTES, sample_source
+from excel_lookup import DEFAULT_LOOKUP_CACHE_DIR, ExcelLookup, JoinColumns, StreamingHashJoin, pushdown_join_sql
+from table_ddl import create_table_sql, table_columns
 
 class OracleExcelTransfer:
-    def __init__(self, src_config, dst_config, excel_path, excel_key, batch_size=100_000):
+    def __init__(self, src_config, dst_config, excel_path, excel_key, batch_size=None,
+                 target_batch_bytes=DEFAULT_TARGET_BYTES, sheet_name=0, lookup_cache_dir=DEFAULT_LOOKUP_CACHE_DIR,
+                 join_in_database=False, columnar=False):
+        # batch_size=None sizes batches to target_batch_bytes from sampled rows and adapts them
+        # lookup_cache_dir: parsed sheets and key indexes are reused until the workbook changes (None: always parse)
+        # join_in_database: load the sheet into a temporary table on the source and join there,
+        #                   so only joined rows are fetched (better when the join drops most rows)
+        # columnar: fetch Arrow batches, join and insert them column-wise (needs pyarrow); batches
+        #           keep their first size since fetch_df_batches takes a fixed one
         self.src_conn = oracledb.connect(**src_config)
         self.dst_conn = oracledb.connect(**dst_config)
         self.batch_size = batch_size
-        self.excel_df = pd.read_excel(excel_path)
+        self.target_batch_bytes = target_batch_bytes
+        self.excel_lookup = ExcelLookup.load(excel_path, sheet_name, lookup_cache_dir, key_columns=excel_key)
+        self.excel_df = self.excel_lookup.df
         self.excel_key = excel_key
+        self.join_in_database = join_in_database
+        self.columnar = columnar
+        self.lookup_table = None
+
+    def _lookup_table(self):
+        """The sheet as a global temporary table on the source connection, loaded once."""
+        if self.lookup_table is None:
+            self.lookup_table = self.excel_lookup.load_temp_table(self.src_conn)
+        return self.lookup_table
 
     def _table_exists(self, conn, table_name):
         """Check if a table exists in Oracle."""
@@ -17,53 +39,96 @@ class OracleExcelTransfer:
         cur.close()
         return exists
 
-    def _create_table_from_columns(self, table_name, columns):
-        """Create a table in the destination DB based on column names (all VARCHAR2 by default)."""
-        col_defs = [f"{col} VARCHAR2(4000)" for col in columns]
-        create_sql = f"CREATE TABLE {table_name} ({', '.join(col_defs)})"
+    def _create_table_from_columns(self, table_name, description, primary_key=None, compress=None, partition_by=None):
+        """Create a table in the destination DB typed like the query's columns (the join carries no
+        Excel columns); see table_ddl.create_table_sql for the options."""
+        columns = table_columns(description)
+        create_sql = create_table_sql(table_name, columns, primary_key, compress, partition_by)
         cur = self.dst_conn.cursor()
         cur.execute(create_sql)
         self.dst_conn.commit()
         cur.close()
-        print(f"📦 Created table {table_name} with columns: {', '.join(columns)}")
+        print(f"📦 Created table {table_name} with columns: {', '.join(f'{name} {kind}' for name, kind in columns)}")
 
-    def transfer_query_with_excel_join(self, query, join_key, dst_table, how='inner'):
+    def transfer_query_with_excel_join(self, query, join_key, dst_table, how='inner', primary_key=None,
+                                       compress=None, partition_by=None):
+        # join_key / excel_key: one column name or a list of them for multi-column keys
+        # primary_key, compress, partition_by: only used when dst_table has to be created
         src_cursor = self.src_conn.cursor()
         dst_cursor = self.dst_conn.cursor()
 
-        # Run the query with limit to get column names
-        src_cursor.execute(f"SELECT * FROM ({query}) WHERE ROWNUM = 1")
-        col_names = [desc[0] for desc in src_cursor.description]
+        source_sql = query
+        join = None
+        if self.join_in_database:
+            # Oracle joins the query to the sheet's temporary table; only joined rows are fetched
+            description, _ = sample_source(self.src_conn, query, rows=1)
+            plan = JoinColumns(
+                self.excel_df.columns, self.excel_key, [d[0] for d in description], join_key, how, right_columns=[]
+            )
+            source_sql = pushdown_join_sql(plan, query, self._lookup_table())
+
+        # Sample the query to get column names and row width
+        sizer = AdaptiveBatchSizer.for_source(
+            self.src_conn, source_sql, self.batch_size, self.target_batch_bytes, label="Query"
+        )
+        col_names = sizer.columns
 
         # Create table in destination if it doesn't exist
         if not self._table_exists(self.dst_conn, dst_table):
-            self._create_table_from_columns(dst_table, col_names)
+            self._create_table_from_columns(
+                dst_table, sizer.description, primary_key=primary_key, compress=compress, partition_by=partition_by
+            )
+
+        if self.columnar:
+            from arrow_batches import ArrowHashJoin, fetch_arrow_batches  # pyarrow only for this path
+        if not self.join_in_database:
+            # Hash the Excel keys once; only the query's columns are kept
+            join_class = ArrowHashJoin if self.columnar else StreamingHashJoin
+            join = join_class(self.excel_lookup, self.excel_key, col_names, join_key, how=how, right_columns=[])
 
         # Prepare insert SQL
         placeholders = ", ".join([f":{i+1}" for i in range(len(col_names))])
         insert_sql = f"INSERT INTO {dst_table} ({', '.join(col_names)}) VALUES ({placeholders})"
 
-        # Execute full query for batch processing
-        src_cursor.execute(query)
+        # Execute full query for batch processing: Arrow tables, or lists of row tuples
+        if self.columnar:
+            batches = fetch_arrow_batches(self.src_conn, source_sql, sizer.rows)
+        else:
+            sizer.tune_cursor(src_cursor)
+            src_cursor.execute(source_sql)
+            batches = iter(lambda: src_cursor.fetchmany(sizer.rows), [])
         total_rows = 0
 
         while True:
-            rows = src_cursor.fetchmany(self.batch_size)
-            if not rows:
+            started = time.monotonic()
+            rows = next(batches, None)
+            if rows is None or not len(rows):
                 break
 
-            chunk_df = pd.DataFrame(rows, columns=col_names)
-
-            # Merge with Excel data
-            merged_df = chunk_df.merge(self.excel_df, how=how, left_on=join_key, right_on=self.excel_key)
-
-            # Insert merged data
-            dst_cursor.executemany(insert_sql, merged_df[col_names].values.tolist())
+            # Join with Excel data (unless Oracle already did) and insert; executemany binds
+            # Arrow tables column-wise
+            joined = join.probe(rows) if join else rows
+            if len(joined):
+                dst_cursor.executemany(insert_sql, joined)
+                self.dst_conn.commit()
+
+            total_rows += len(joined)
+            if not self.columnar:
+                sizer.record(len(rows), time.monotonic() - started, src_cursor)
+            print(f"[Query] Inserted {len(joined)} rows... Total: {total_rows}")
+
+        # right/outer joins: Excel rows no query row matched, once
+        unmatched = join.unmatched_right() if join else []
+        for start in range(0, len(unmatched), sizer.rows):
+            dst_cursor.executemany(insert_sql, unmatched[start:start + sizer.rows])
+        if len(unmatched):
             self.dst_conn.commit()
+            total_rows += len(unmatched)
+            print(f"[Query] Inserted {len(unmatched)} unmatched Excel rows... Total: {total_rows}")
 
-            total_rows += len(merged_df)
-            print(f"[Query] Inserted {len(merged_df)} rows... Total: {total_rows}")
-
+        if join:
+            print(f"[Query] {join.summary()}")
+        print(f"[Query] {sizer.summary()}")
         src_cursor.close()
         dst_cursor.close()
         print(f"✅ Transfer complete. Total rows inserted: {total_rows}")
@@ -89,8 +154,7 @@ transfer = OracleExcelTransfer(
     src_config,
     dst_config,
     excel_path="mapping.xlsx",
-    excel_key="MAP_KEY",  # column in Excel to join
-    batch_size=50_000
+    excel_key="MAP_KEY"  # column in Excel to join
 )
 
 query = """
@@ -100,6 +164,8 @@ JOIN orders o ON c.customer_id = o.customer_id
 WHERE o.order_date >= DATE '2025-01-01'
 """
 
+# A missing dst_table is created with the query's column types; it can also get
+# primary_key="...", compress="advanced" or partition_by=table_ddl.hash_partitions("CUSTOMER_ID", 16)
 transfer.transfer_query_with_excel_join(
     query=query,
     join_key="CUSTOMER_ID",  # join column in query result
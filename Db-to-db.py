@@ -1,50 +1,318 @@
 import oracledb
+import queue
+import threading
+import time
+from batch_sizing import AdaptiveBatchSizer, DEFAULT_TARGET_BYTES
+from load_strategy import LoadStrategy
+from transfer_checkpoint import FileCheckpointStore, TableCheckpoint
+from incremental_sync import Watermark, default_merge_keys, merge_sql
+from index_maintenance import offline_indexes
+from transfer_verify import VERIFY_RANGES, verify_table
+from reject_rows import DEFAULT_REJECT_LIMIT, RejectHandler, execute_batch
 
 class OracleTableTransfer:
-    def __init__(self, src_config, dst_config, batch_size=100_000):
+    def __init__(self, src_config, dst_config, batch_size=None, writers=1, queue_depth=4,
+                 target_batch_bytes=DEFAULT_TARGET_BYTES, load_strategy=None, checkpoint_store=None,
+                 index_rebuild_degree=None, reject_store=None, reject_limit=DEFAULT_REJECT_LIMIT):
+        """
+        batch_size:    fixed rows per batch; None sizes batches to target_batch_bytes per table
+                       and adapts them to the measured rows/sec
+        writers:       insert threads, each with its own destination connection
+        queue_depth:   fetched batches allowed to wait for a writer; at most
+                       queue_depth + writers + 1 batches are held in memory
+        load_strategy: LoadStrategy or a name from load_strategy.LOAD_STRATEGIES
+                       ("conventional", "commit_every_10", "single_commit", "direct_path",
+                       "nologging_staging"); direct-path strategies use a single writer
+        checkpoint_store: FileCheckpointStore or TableCheckpointStore; tables are then read in key
+                       order with progress saved at each commit, so a rerun resumes mid-table and
+                       skips finished tables (uses a single writer to keep commits in key order)
+        index_rebuild_degree: take the destination's indexes, keys and foreign keys offline for
+                       transfer_table and rebuild them afterwards with PARALLEL n NOLOGGING
+                       (see index_maintenance); None leaves them in place. Not used by sync_table,
+                       whose MERGE needs the key index
+        reject_store:  FileRejectStore or TableRejectStore; batches then run with batcherrors=True,
+                       rows Oracle rejects are written there with their error and the rest of the
+                       batch is kept (see reject_rows); needs a conventional load strategy. Rejects
+                       are committed on their own, so they outlast a rolled-back batch
+        reject_limit:  rejected rows allowed per table before the transfer fails (None: no limit)
+        """
         self.src_conn = oracledb.connect(**src_config)
         self.dst_conn = oracledb.connect(**dst_config)
+        self.dst_config = dst_config
         self.batch_size = batch_size
+        self.target_batch_bytes = target_batch_bytes
+        self.writers = max(1, writers)
+        self.queue_depth = max(1, queue_depth)
+        self.load_strategy = LoadStrategy.named(load_strategy)
+        if self.load_strategy.direct_path and self.writers > 1:
+            print("Direct-path inserts lock the table exclusively; using 1 writer instead of "
+                  f"{self.writers}")
+            self.writers = 1
+        self.checkpoint_store = checkpoint_store
+        self.index_rebuild_degree = index_rebuild_degree
+        self.reject_store = reject_store
+        self.reject_limit = reject_limit
+        if reject_store is not None and self.load_strategy.direct_path:
+            raise ValueError("Reject capture needs conventional inserts; direct-path loads cannot use batch errors")
+        if checkpoint_store is not None:
+            if self.load_strategy.staging:
+                raise ValueError("Checkpointed transfers must load the destination directly, not a staging table")
+            if self.writers > 1:
+                print(f"Checkpoints need batches committed in key order; using 1 writer instead of {self.writers}")
+                self.writers = 1
+
+    def _read_batches(self, src_cursor, sizer, batches, stats, stop):
+        """Reader thread: fetch batches into the bounded queue, then one end marker per writer."""
+        try:
+            while not stop.is_set():
+                started = time.monotonic()
+                rows = src_cursor.fetchmany(sizer.rows)
+                fetched = time.monotonic() - started
+                stats["fetch_s"] += fetched
+                if not rows:
+                    break
+                started = time.monotonic()
+                while not stop.is_set():
+                    try:
+                        batches.put(rows, timeout=0.5)  # blocks while every writer is busy
+                        break
+                    except queue.Full:
+                        continue
+                stalled = time.monotonic() - started
+                stats["read_stall_s"] += stalled
+                stats["rows_read"] += len(rows)
+                # fetch + wait for queue space is the pipeline's pace, whichever side is slower
+                sizer.record(len(rows), fetched + stalled, src_cursor)
+        except Exception as e:
+            stats["errors"].append(f"reader: {e}")
+            stop.set()
+        finally:
+            # Never drop a marker while writers run: a slow batch can keep the queue full for
+            # long. After a stop, the writers leave on their own (see _write_batches).
+            for _ in range(self.writers):
+                while not stop.is_set():
+                    try:
+                        batches.put(None, timeout=0.5)
+                        break
+                    except queue.Full:
+                        continue
+
+    def _write_batches(self, dst_conn, insert_sql, batches, stats, lock, stop, label, checkpoint=None, rejects=None):
+        """Writer thread: insert batches from the queue until the end marker, committing per the load strategy."""
+        dst_cursor = dst_conn.cursor()
+        committer = self.load_strategy.committer(dst_conn, checkpoint)
+        try:
+            while True:
+                started = time.monotonic()
+                while True:
+                    try:
+                        rows = batches.get(timeout=0.5)  # blocks while the reader has nothing ready
+                        break
+                    except queue.Empty:
+                        if stop.is_set():  # the reader or another writer failed; no marker may come
+                            rows = None
+                            break
+                waited = time.monotonic() - started
+                if rows is None or stop.is_set():
+                    break
+                started = time.monotonic()
+                written, rejected = execute_batch(
+                    dst_cursor, insert_sql, checkpoint.insert_rows(rows) if checkpoint else rows, rejects
+                )
+                if checkpoint:
+                    checkpoint.batch_done(rows, rejected)  # before the committer may save it
+                committer.batch_done(written)
+                spent = time.monotonic() - started
+                with lock:
+                    stats["write_stall_s"] += waited
+                    stats["insert_s"] += spent
+                    stats["rows_written"] += written
+                    total = stats["rows_written"]
+                print(f"[{label}] Transferred {written} rows... Total: {total}")
+            if not stop.is_set():
+                started = time.monotonic()
+                committer.flush()
+                with lock:
+                    stats["insert_s"] += time.monotonic() - started
+        except Exception as e:
+            with lock:
+                stats["errors"].append(f"writer: {e}")
+            stop.set()
+            try:
+                lost = committer.rollback()
+                with lock:
+                    stats["rows_written"] -= lost  # rolled back, not in the destination
+            except oracledb.DatabaseError:
+                pass
+        finally:
+            with lock:
+                stats["commits"] += committer.commits
+            dst_cursor.close()
+
+    def transfer_table(self, src_table, dst_table=None, key_column=None):
+        """Transfer a single table from source to destination, overlapping fetch and insert.
 
-    def transfer_table(self, src_table, dst_table=None):
-        """Transfer a single table from source to destination."""
+        key_column: checkpoint key when a checkpoint_store is set (default: primary key, else ROWID);
+                    must be a NOT NULL single-column unique key
+        """
         if dst_table is None:
             dst_table = src_table  # default: same name
-        
+
+        checkpoint = None
+        if self.checkpoint_store is not None:
+            checkpoint = TableCheckpoint.open(
+                self.checkpoint_store, self.src_conn, self.dst_conn, src_table, dst_table, key_column
+            )
+            print(f"[{src_table}] Checkpoint: {checkpoint.describe()}")
+            if checkpoint.done:
+                return checkpoint.rows
+
         src_cursor = self.src_conn.cursor()
-        dst_cursor = self.dst_conn.cursor()
 
-        # Get column names dynamically from source
-        src_cursor.execute(f"SELECT * FROM {src_table} WHERE ROWNUM = 1")
-        col_names = [desc[0] for desc in src_cursor.description]
-        placeholders = ", ".join([f":{i+1}" for i in range(len(col_names))])
-        insert_sql = f"INSERT INTO {dst_table} ({', '.join(col_names)}) VALUES ({placeholders})"
+        # Get column names and row width from a small sample of the source
+        sizer = AdaptiveBatchSizer.for_source(
+            self.src_conn, src_table, self.batch_size, self.target_batch_bytes, label=src_table
+        )
+        col_names = sizer.columns
+        load_table = self.load_strategy.prepare(self.dst_conn, dst_table)
+        insert_sql = self.load_strategy.insert_sql(load_table, col_names)
 
-        # Now fetch and insert in chunks
-        src_cursor.execute(f"SELECT * FROM {src_table}")
-        total_rows = 0
+        # Indexes come back also when the load, or taking them offline, fails part way
+        with offline_indexes(self.dst_conn, dst_table, self.index_rebuild_degree):
+            sizer.tune_cursor(src_cursor)
+            if checkpoint:
+                src_cursor.execute(*checkpoint.select_sql(col_names))  # key order, after the last committed key
+            else:
+                src_cursor.execute(f"SELECT * FROM {src_table}")
+            rejects = RejectHandler.open(
+                self.reject_store, self.dst_config, f"{src_table}->{dst_table}", self.reject_limit
+            )
+            try:
+                stats = self._run_pipeline(src_cursor, sizer, insert_sql, src_table, checkpoint, rejects)
+            except RuntimeError:
+                self.load_strategy.abandon(self.dst_conn, dst_table, load_table)
+                raise
+            self.load_strategy.publish(self.dst_conn, dst_table, load_table, col_names)
 
-        while True:
-            rows = src_cursor.fetchmany(self.batch_size)
-            if not rows:
-                break
+        total_rows = stats["rows_written"]
+        if checkpoint:
+            checkpoint.finish(self.dst_conn)
+            total_rows = checkpoint.rows  # including rows copied before a resume
+        print(f"✅ Transfer complete for table: {src_table} ({total_rows} rows)")
+        return total_rows
+
+    def _run_pipeline(self, src_cursor, sizer, write_sql, label, checkpoint=None, rejects=None):
+        """Reader thread -> bounded queue -> writer threads, for an executed source cursor; returns the stats."""
+        batches = queue.Queue(maxsize=self.queue_depth)
+        stats = {
+            "rows_read": 0, "rows_written": 0, "fetch_s": 0.0, "insert_s": 0.0,
+            "read_stall_s": 0.0, "write_stall_s": 0.0, "commits": 0, "errors": []
+        }
+        lock = threading.Lock()
+        stop = threading.Event()
+        dst_conns = [self.dst_conn] + [oracledb.connect(**self.dst_config) for _ in range(self.writers - 1)]
 
-            dst_cursor.executemany(insert_sql, rows)
-            self.dst_conn.commit()
-            total_rows += len(rows)
-            print(f"[{src_table}] Transferred {len(rows)} rows... Total: {total_rows}")
+        started = time.monotonic()
+        threads = [threading.Thread(target=self._read_batches, args=(src_cursor, sizer, batches, stats, stop))]
+        threads += [
+            threading.Thread(
+                target=self._write_batches,
+                args=(conn, write_sql, batches, stats, lock, stop, label, checkpoint, rejects)
+            )
+            for conn in dst_conns
+        ]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        elapsed = time.monotonic() - started
 
+        for conn in dst_conns[1:]:
+            conn.close()
         src_cursor.close()
-        dst_cursor.close()
-        print(f"✅ Transfer complete for table: {src_table} ({total_rows} rows)")
+        if rejects:
+            rejects.close()
+        if stats["errors"]:
+            raise RuntimeError(f"Transfer of {label} failed after {stats['rows_written']} rows: {'; '.join(stats['errors'])}")
+
+        # Reader stalls mean the destination is the bottleneck; writer stalls mean the source is
+        bottleneck = "destination inserts" if stats["read_stall_s"] > stats["write_stall_s"] / self.writers else "source fetches"
+        print(
+            f"[{label}] {elapsed:.1f}s: fetch {stats['fetch_s']:.1f}s, reader stalled {stats['read_stall_s']:.1f}s | "
+            f"insert {stats['insert_s']:.1f}s, writers stalled {stats['write_stall_s']:.1f}s "
+            f"({self.writers} writer(s)) -> limited by {bottleneck}"
+        )
+        print(f"[{label}] {self.load_strategy.describe()}: {stats['commits']} commit(s)")
+        print(f"[{label}] {sizer.summary()}")
+        if rejects:
+            print(f"[{label}] {rejects.summary()}")
+        return stats
 
-    def transfer_multiple_tables(self, table_mapping):
+    def sync_table(self, src_table, dst_table=None, watermark_column=None, merge_keys=None, overlap=None):
+        """Apply only the rows changed since the last sync, with batched MERGE statements.
+
+        watermark_column: updated_at timestamp or increasing id; the first run is a full pass
+        merge_keys:       columns matching source rows to destination rows (default: destination primary key)
+        overlap:          re-read this far below the saved watermark for late-committing rows
+        The watermark is kept in checkpoint_store (a FileCheckpointStore when none is set) and only
+        advances after a successful run, so a failed sync is simply rerun.
+        """
+        if dst_table is None:
+            dst_table = src_table
+        if not watermark_column:
+            raise ValueError("sync_table needs the watermark column")
+        store = self.checkpoint_store or FileCheckpointStore()
+        watermark = Watermark.open(store, self.src_conn, self.dst_conn, src_table, dst_table, watermark_column, overlap)
+        if watermark.up_to_date:
+            print(f"✅ [{src_table}] No changes since {watermark_column} {watermark.last}")
+            return 0
+        print(f"[{src_table}] Incremental sync: {watermark.describe()}")
+
+        src_cursor = self.src_conn.cursor()
+        sizer = AdaptiveBatchSizer.for_source(
+            self.src_conn, src_table, self.batch_size, self.target_batch_bytes, label=src_table
+        )
+        write_sql = merge_sql(dst_table, sizer.columns, merge_keys or default_merge_keys(self.dst_conn, dst_table))
+        sizer.tune_cursor(src_cursor)
+        src_cursor.execute(*watermark.select_sql())
+        rejects = RejectHandler.open(self.reject_store, self.dst_config, f"{src_table}->{dst_table}", self.reject_limit)
+        stats = self._run_pipeline(src_cursor, sizer, write_sql, src_table, rejects=rejects)
+        watermark.save(self.dst_conn, stats["rows_written"])
+        print(f"✅ Sync complete for table: {src_table} ({stats['rows_written']} changed rows merged)")
+        return stats["rows_written"]
+
+    def transfer_multiple_tables(self, table_mapping, key_columns=None, watermarks=None, merge_keys=None):
         """
         table_mapping: dict where key=source table name, value=destination table name (or None for same name)
         Example: {"SOURCE_TABLE1": "TARGET_TABLE1", "SOURCE_TABLE2": None}
+        key_columns: optional {source_table: checkpoint key column}; with a checkpoint_store, a rerun
+                     of the same mapping skips finished tables and resumes the interrupted one
+        watermarks:  optional {source_table: watermark column}; those tables are synced incrementally
+                     with MERGE (see sync_table) instead of copied in full
+        merge_keys:  optional {source_table: [key columns]} for the incremental tables
         """
+        key_columns = key_columns or {}
+        watermarks = watermarks or {}
+        merge_keys = merge_keys or {}
         for src_table, dst_table in table_mapping.items():
-            self.transfer_table(src_table, dst_table)
+            if src_table in watermarks:
+                self.sync_table(src_table, dst_table, watermarks[src_table], merge_keys.get(src_table))
+            else:
+                self.transfer_table(src_table, dst_table, key_columns.get(src_table))
+
+    def verify_tables(self, table_mapping, key_columns=None, ranges=VERIFY_RANGES, degree=None):
+        """
+        Compare each copied table with its source by bucketed row counts and row-hash sums
+        (see transfer_verify); returns {source_table: result} and prints only mismatching buckets.
+        key_columns: optional {source_table: column to bucket on} (default: first primary key column)
+        """
+        key_columns = key_columns or {}
+        return {
+            src_table: verify_table(
+                self.src_conn, self.dst_conn, src_table, dst_table, key_columns.get(src_table), ranges, degree
+            )
+            for src_table, dst_table in table_mapping.items()
+        }
 
     def close(self):
         self.src_conn.close()
@@ -53,10 +321,30 @@ class OracleTableTransfer:
 
 
 import oracledb
+import time
 from concurrent.futures import ProcessPoolExecutor, as_completed
+from batch_sizing import AdaptiveBatchSizer, DEFAULT_TARGET_BYTES, estimate_row_bytes, sample_source
+from load_strategy import LoadStrategy
+from transfer_checkpoint import TableCheckpoint
+from transfer_verify import VERIFY_RANGES, verify_single_table
+from index_maintenance import offline_indexes
+from reject_rows import DEFAULT_REJECT_LIMIT, RejectHandler, RejectLimitExceeded, execute_batch
+
+def transfer_single_table(src_config, dst_config, table_pair, batch_size, target_batch_bytes=DEFAULT_TARGET_BYTES,
+                          load_strategy=None, checkpoint_store=None, key_column=None, index_rebuild_degree=None,
+                          reject_store=None, reject_limit=DEFAULT_REJECT_LIMIT):
+    """Worker function to transfer one table in chunks (batch_size=None: adaptive, see batch_sizing).
 
-def transfer_single_table(src_config, dst_config, table_pair, batch_size):
-    """Worker function to transfer one table in chunks."""
+    checkpoint_store: FileCheckpointStore or TableCheckpointStore; the table is then read in
+                      key_column order (default: its primary key, else ROWID), progress is saved
+                      with every commit, a rerun resumes after the last committed key and a
+                      finished table is skipped
+    index_rebuild_degree: take the destination's indexes and key constraints offline for the load
+                      and rebuild them with PARALLEL n NOLOGGING afterwards (see index_maintenance)
+    reject_store:     FileRejectStore or TableRejectStore for rows Oracle rejects (see reject_rows);
+                      the table fails once more than reject_limit rows are rejected
+    """
+    load_strategy = LoadStrategy.named(load_strategy)
     src_table, dst_table = table_pair
     if dst_table is None:
         dst_table = src_table
@@ -66,22 +354,65 @@ def transfer_single_table(src_config, dst_config, table_pair, batch_size):
     src_cursor = src_conn.cursor()
     dst_cursor = dst_conn.cursor()
 
-    # Get column names dynamically
-    src_cursor.execute(f"SELECT * FROM {src_table} WHERE ROWNUM = 1")
-    col_names = [desc[0] for desc in src_cursor.description]
-    placeholders = ", ".join([f":{i+1}" for i in range(len(col_names))])
-    insert_sql = f"INSERT INTO {dst_table} ({', '.join(col_names)}) VALUES ({placeholders})"
+    # Get column names and row width from a small sample
+    checkpoint = None
+    if checkpoint_store is not None:
+        if load_strategy.staging:
+            raise ValueError("Checkpointed transfers must load the destination directly, not a staging table")
+        checkpoint = TableCheckpoint.open(checkpoint_store, src_conn, dst_conn, src_table, dst_table, key_column)
+        print(f"[{src_table}] Checkpoint: {checkpoint.describe()}")
+        if checkpoint.done:
+            src_cursor.close()
+            dst_cursor.close()
+            src_conn.close()
+            dst_conn.close()
+            return src_table, dst_table, checkpoint.rows
 
-    # Fetch and insert in chunks
-    src_cursor.execute(f"SELECT * FROM {src_table}")
+    sizer = AdaptiveBatchSizer.for_source(src_conn, src_table, batch_size, target_batch_bytes, label=src_table)
+    col_names = sizer.columns
+    load_table = load_strategy.prepare(dst_conn, dst_table)
+    insert_sql = load_strategy.insert_sql(load_table, col_names)
+    committer = load_strategy.committer(dst_conn, checkpoint)
+
+    # Fetch and insert in chunks; indexes come back also when the load, or taking them offline, fails
     total_rows = 0
-    while True:
-        rows = src_cursor.fetchmany(batch_size)
-        if not rows:
-            break
-        dst_cursor.executemany(insert_sql, rows)
-        dst_conn.commit()
-        total_rows += len(rows)
+    with offline_indexes(dst_conn, dst_table, index_rebuild_degree):
+        sizer.tune_cursor(src_cursor)
+        if checkpoint:
+            src_cursor.execute(*checkpoint.select_sql(col_names))  # key order, after the last committed key
+        else:
+            src_cursor.execute(f"SELECT * FROM {src_table}")
+        rejects = RejectHandler.open(reject_store, dst_config, f"{src_table}->{dst_table}", reject_limit, load_strategy)
+        try:
+            while True:
+                started = time.monotonic()
+                rows = src_cursor.fetchmany(sizer.rows)
+                if not rows:
+                    break
+                written, rejected = execute_batch(
+                    dst_cursor, insert_sql, checkpoint.insert_rows(rows) if checkpoint else rows, rejects
+                )
+                if checkpoint:
+                    checkpoint.batch_done(rows, rejected)  # before the committer may save it
+                committer.batch_done(written)
+                total_rows += written
+                sizer.record(len(rows), time.monotonic() - started, src_cursor)
+            committer.flush()
+            load_strategy.publish(dst_conn, dst_table, load_table, col_names)
+        except (oracledb.DatabaseError, RejectLimitExceeded):
+            committer.rollback()
+            load_strategy.abandon(dst_conn, dst_table, load_table)
+            raise
+        finally:
+            if rejects:
+                rejects.close()
+    if checkpoint:
+        checkpoint.finish(dst_conn)
+        total_rows = checkpoint.rows  # including rows copied before a resume
+    print(f"[{src_table}] {sizer.summary()}")
+    print(f"[{src_table}] {load_strategy.describe()}: {committer.commits} commit(s)")
+    if rejects:
+        print(f"[{src_table}] {rejects.summary()}")
 
     src_cursor.close()
     dst_cursor.close()
@@ -91,17 +422,194 @@ def transfer_single_table(src_config, dst_config, table_pair, batch_size):
     return src_table, dst_table, total_rows
 
 
+def transfer_range(src_config, dst_config, range_spec, insert_sql, batch_size, row_bytes=None,
+                   target_batch_bytes=DEFAULT_TARGET_BYTES, load_strategy=None, reject_store=None,
+                   reject_limit=DEFAULT_REJECT_LIMIT, reject_name=None):
+    """Worker function to transfer one key/ROWID range of a table or query.
+
+    range_spec:    {"id": n, "label": str, "statements": [(select_sql, binds), ...]}
+    row_bytes:     row width estimated once by the coordinator, used for adaptive batches
+    load_strategy: commit cadence; insert_sql already targets the coordinator's load table
+    reject_store:  store for rejected rows, shared by all ranges under reject_name; reject_limit
+                   applies to this range on its own
+    """
+    started = time.monotonic()
+    src_conn = oracledb.connect(**src_config)
+    dst_conn = oracledb.connect(**dst_config)
+    src_cursor = src_conn.cursor()
+    dst_cursor = dst_conn.cursor()
+    sizer = AdaptiveBatchSizer(row_bytes or 1024, target_batch_bytes, fixed_rows=batch_size)
+    load_strategy = LoadStrategy.named(load_strategy)
+    committer = load_strategy.committer(dst_conn)
+    rejects = RejectHandler.open(
+        reject_store, dst_config, reject_name or f"range {range_spec['id']}", reject_limit, load_strategy
+    )
+
+    total_rows = 0
+    try:
+        for select_sql, binds in range_spec["statements"]:
+            sizer.tune_cursor(src_cursor)
+            src_cursor.execute(select_sql, binds)
+            while True:
+                batch_started = time.monotonic()
+                rows = src_cursor.fetchmany(sizer.rows)
+                if not rows:
+                    break
+                written, _ = execute_batch(dst_cursor, insert_sql, rows, rejects)
+                committer.batch_done(written)
+                total_rows += written
+                sizer.record(len(rows), time.monotonic() - batch_started, src_cursor)
+                print(f"[range {range_spec['id']}: {range_spec['label']}] Transferred {written} rows... Total: {total_rows}")
+        committer.flush()
+    except (oracledb.DatabaseError, RejectLimitExceeded):
+        committer.rollback()
+        raise
+    finally:
+        if rejects:
+            rejects.close()
+
+    src_cursor.close()
+    dst_cursor.close()
+    src_conn.close()
+    dst_conn.close()
+
+    return range_spec["id"], total_rows, rejects.rejected if rejects else 0, time.monotonic() - started
+
+
+def _split_owner(table, default_owner):
+    owner, _, name = table.rpartition(".")
+    return (owner or default_owner).upper(), name.upper()
+
+
+def _balance_windows(windows, ranges):
+    """Spread (weight, statement) windows over at most `ranges` groups, heaviest first onto the lightest group."""
+    groups = [[0, []] for _ in range(min(ranges, len(windows)))]
+    for weight, statement in sorted(windows, key=lambda w: w[0], reverse=True):
+        group = min(groups, key=lambda g: g[0])
+        group[0] += weight
+        group[1].append(statement)
+    return [statements for _, statements in groups]
+
+
+def plan_rowid_ranges(conn, src_table, ranges):
+    """Split a table into ROWID windows, one per extent, balanced by block count.
+
+    Reads DBA_EXTENTS (the same source DBMS_PARALLEL_EXECUTE uses). Without access to it,
+    falls back to NTILE over ROWID, which costs one scan of the table's ROWIDs.
+    """
+    cursor = conn.cursor()
+    owner, name = _split_owner(src_table, conn.username)
+    select_sql = f"SELECT * FROM {src_table} WHERE ROWID BETWEEN CHARTOROWID(:1) AND CHARTOROWID(:2)"
+    try:
+        cursor.execute("""
+            SELECT ROWIDTOCHAR(DBMS_ROWID.ROWID_CREATE(1, o.data_object_id, e.relative_fno, e.block_id, 0)),
+                   ROWIDTOCHAR(DBMS_ROWID.ROWID_CREATE(1, o.data_object_id, e.relative_fno, e.block_id + e.blocks - 1, 32767)),
+                   e.blocks
+            FROM dba_extents e
+            JOIN dba_objects o
+              ON o.owner = e.owner
+             AND o.object_name = e.segment_name
+             AND NVL(o.subobject_name, '-') = NVL(e.partition_name, '-')
+            WHERE e.owner = :owner
+              AND e.segment_name = :name
+              AND e.segment_type LIKE 'TABLE%'
+              AND o.data_object_id IS NOT NULL
+            ORDER BY o.data_object_id, e.relative_fno, e.block_id
+        """, owner=owner, name=name)
+        extents = cursor.fetchall()
+    except oracledb.DatabaseError as e:
+        print(f"⚠️ DBA_EXTENTS not readable ({e}); splitting {src_table} with NTILE over ROWID")
+        extents = []
+    if not extents:
+        cursor.execute(f"""
+            SELECT ROWIDTOCHAR(MIN(rid)), ROWIDTOCHAR(MAX(rid)), COUNT(*)
+            FROM (SELECT ROWID rid, NTILE(:ranges) OVER (ORDER BY ROWID) bucket FROM {src_table})
+            GROUP BY bucket
+            ORDER BY bucket
+        """, ranges=ranges)
+        extents = cursor.fetchall()
+    cursor.close()
+
+    windows = [(weight, (select_sql, [start, end])) for start, end, weight in extents]
+    return [
+        {"label": f"{len(statements)} ROWID window(s)", "statements": statements}
+        for statements in _balance_windows(windows, ranges)
+    ]
+
+
+def plan_column_ranges(conn, source_sql, column, ranges):
+    """Split a table or query into equal-width ranges of a numeric key or date column.
+
+    Ranges are half-open [lo, hi) except the last, which includes the maximum; rows with a NULL
+    column value get a range of their own so nothing is dropped.
+    """
+    cursor = conn.cursor()
+    cursor.execute(f"SELECT MIN({column}), MAX({column}) FROM ({source_sql})")
+    low, high = cursor.fetchone()
+    cursor.execute(f"SELECT COUNT(*) FROM ({source_sql}) WHERE {column} IS NULL")
+    null_rows = cursor.fetchone()[0]
+    cursor.close()
+
+    plans = []
+    if low is not None:
+        if isinstance(low, int) and isinstance(high, int):
+            bounds = [low + (high - low) * i // ranges for i in range(ranges)] + [high]  # exact for large keys
+        else:
+            step = (high - low) / ranges  # float keys, or a timedelta for dates
+            bounds = [low + step * i for i in range(ranges)] + [high]
+        for i in range(ranges):
+            lo, hi = bounds[i], bounds[i + 1]
+            last = i == ranges - 1
+            if not last and lo == hi:
+                continue  # fewer distinct key values than ranges
+            operator = "<=" if last else "<"
+            plans.append({
+                "label": f"{column} [{lo}, {hi}{']' if last else ')'}",
+                "statements": [(f"SELECT * FROM ({source_sql}) WHERE {column} >= :1 AND {column} {operator} :2", [lo, hi])]
+            })
+    if null_rows:
+        plans.append({
+            "label": f"{column} IS NULL",
+            "statements": [(f"SELECT * FROM ({source_sql}) WHERE {column} IS NULL", [])]
+        })
+    return plans
+
+
 class ParallelOracleTransfer:
-    def __init__(self, src_config, dst_config, batch_size=100_000, max_workers=4):
+    def __init__(self, src_config, dst_config, batch_size=None, max_workers=4,
+                 target_batch_bytes=DEFAULT_TARGET_BYTES, load_strategy=None, checkpoint_store=None,
+                 index_rebuild_degree=None, reject_store=None, reject_limit=DEFAULT_REJECT_LIMIT):
+        """
+        batch_size:       fixed rows per batch; None sizes each worker's batches to target_batch_bytes
+                          (so up to max_workers * target_batch_bytes in flight) and adapts them
+        load_strategy:    LoadStrategy or a name from load_strategy.LOAD_STRATEGIES (default conventional)
+        checkpoint_store: FileCheckpointStore or TableCheckpointStore to make transfer_tables resumable
+        index_rebuild_degree: take each destination's indexes and key constraints offline for the load
+                          and rebuild them with PARALLEL n NOLOGGING afterwards; None leaves them
+        reject_store:     FileRejectStore or TableRejectStore; rows Oracle rejects are written there
+                          instead of failing their batch (see reject_rows). reject_limit counts per
+                          worker: per table in transfer_tables, per range in transfer_table_ranges
+        """
         self.src_config = src_config
         self.dst_config = dst_config
         self.batch_size = batch_size
         self.max_workers = max_workers
+        self.target_batch_bytes = target_batch_bytes
+        self.load_strategy = LoadStrategy.named(load_strategy)
+        self.checkpoint_store = checkpoint_store
+        self.index_rebuild_degree = index_rebuild_degree
+        self.reject_store = reject_store
+        self.reject_limit = reject_limit
+        if reject_store is not None and self.load_strategy.direct_path:
+            raise ValueError("Reject capture needs conventional inserts; direct-path loads cannot use batch errors")
 
-    def transfer_tables(self, table_mapping):
+    def transfer_tables(self, table_mapping, key_columns=None):
         """
         table_mapping: dict {source_table: destination_table or None}
+        key_columns:   optional {source_table: checkpoint key column} (default: primary key, else ROWID);
+                       each must be a NOT NULL single-column unique key
         """
+        key_columns = key_columns or {}
         with ProcessPoolExecutor(max_workers=self.max_workers) as executor:
             futures = []
             for table_pair in table_mapping.items():
@@ -111,7 +619,14 @@ class ParallelOracleTransfer:
                         self.src_config,
                         self.dst_config,
                         table_pair,
-                        self.batch_size
+                        self.batch_size,
+                        self.target_batch_bytes,
+                        self.load_strategy,
+                        self.checkpoint_store,
+                        key_columns.get(table_pair[0]),
+                        self.index_rebuild_degree,
+                        self.reject_store,
+                        self.reject_limit
                     )
                 )
 
@@ -119,6 +634,136 @@ class ParallelOracleTransfer:
                 src_table, dst_table, total_rows = future.result()
                 print(f"✅ {src_table} → {dst_table}: {total_rows} rows transferred.")
 
+    def verify_tables(self, table_mapping, key_columns=None, ranges=VERIFY_RANGES, degree=None):
+        """
+        Verify copied tables in parallel, one worker per table; both sides of a table are scanned
+        at the same time. Returns {source_table: result} with the mismatching buckets to re-copy.
+        """
+        key_columns = key_columns or {}
+        results = {}
+        with ProcessPoolExecutor(max_workers=self.max_workers) as executor:
+            futures = {
+                executor.submit(
+                    verify_single_table, self.src_config, self.dst_config, table_pair,
+                    key_columns.get(table_pair[0]), ranges, degree
+                ): table_pair[0]
+                for table_pair in table_mapping.items()
+            }
+            for future in as_completed(futures):
+                results[futures[future]] = future.result()
+        return results
+
+    def transfer_table_ranges(self, src_table=None, dst_table=None, split_by="rowid", column=None,
+                              ranges=None, source_query=None):
+        """
+        Transfer one large table (or one source query) as N ranges spread over the worker pool.
+
+        split_by: "rowid" (ROWID extents, tables only), "key" (numeric primary key column)
+                  or "date" (any DATE/TIMESTAMP column); "key" and "date" need column=.
+        ranges:   number of ranges, default 4 per worker so fast ranges free workers for slow ones.
+        Ends with a row-count reconciliation of source rows, rows moved and destination rows added.
+        """
+        if source_query is None and src_table is None:
+            raise ValueError("Pass src_table or source_query")
+        if split_by == "rowid" and source_query is not None:
+            raise ValueError("ROWID ranges need a table; split a source query by key or date")
+        if split_by in ("key", "date") and not column:
+            raise ValueError(f"split_by='{split_by}' needs the column to split on")
+        if split_by not in ("rowid", "key", "date"):
+            raise ValueError(f"Unknown split_by: {split_by}")
+        dst_table = dst_table or src_table
+        if dst_table is None:
+            raise ValueError("Pass dst_table when transferring a source query")
+        ranges = ranges or self.max_workers * 4
+        source_sql = source_query or f"SELECT * FROM {src_table}"
+        name = src_table or "query"
+
+        src_conn = oracledb.connect(**self.src_config)
+        dst_conn = oracledb.connect(**self.dst_config)
+        cursor = src_conn.cursor()
+        description, sample = sample_source(src_conn, source_sql)
+        col_names = [desc[0] for desc in description]
+        row_bytes = estimate_row_bytes(description, sample)
+
+        if split_by == "rowid":
+            plans = plan_rowid_ranges(src_conn, src_table, ranges)
+        else:
+            plans = plan_column_ranges(src_conn, source_sql, column, ranges)
+        for range_id, plan in enumerate(plans, start=1):
+            plan["id"] = range_id
+
+        dst_cursor = dst_conn.cursor()
+        dst_cursor.execute(f"SELECT COUNT(*) FROM {dst_table}")
+        dst_before = dst_cursor.fetchone()[0]
+        print(f"[{name}] Split by {split_by}{f' on {column}' if column else ''} into {len(plans)} ranges, {self.max_workers} workers")
+        # Staging: every range loads the same staging table and it is published once at the end
+        load_table = self.load_strategy.prepare(dst_conn, dst_table)
+        insert_sql = self.load_strategy.insert_sql(load_table, col_names)
+        if self.load_strategy.direct_path and self.max_workers > 1:
+            print(f"[{name}] Direct-path inserts into one table run one range at a time; fetches still overlap")
+        reject_name = f"{name}->{dst_table}"
+        if self.reject_store is not None:
+            # check the strategy and create the reject table once, before the workers start
+            RejectHandler.open(self.reject_store, self.dst_config, reject_name, self.reject_limit, self.load_strategy).close()
+        started = time.monotonic()
+        transferred = 0
+        rejected = 0
+        # The coordinator takes the indexes offline once for all ranges and rebuilds them at the end
+        with offline_indexes(dst_conn, dst_table, self.index_rebuild_degree):
+            try:
+                with ProcessPoolExecutor(max_workers=self.max_workers) as executor:
+                    futures = {
+                        executor.submit(
+                            transfer_range, self.src_config, self.dst_config, plan, insert_sql,
+                            self.batch_size, row_bytes, self.target_batch_bytes, self.load_strategy,
+                            self.reject_store, self.reject_limit, reject_name
+                        ): plan
+                        for plan in plans
+                    }
+                    for done, future in enumerate(as_completed(futures), start=1):
+                        range_id, total_rows, range_rejected, seconds = future.result()
+                        transferred += total_rows
+                        rejected += range_rejected
+                        print(
+                            f"✅ [{name}] range {range_id} ({futures[future]['label']}): {total_rows} rows"
+                            f"{f' ({range_rejected} rejected)' if range_rejected else ''} in {seconds:.1f}s "
+                            f"— {done}/{len(plans)} ranges done, {transferred} rows so far"
+                        )
+                self.load_strategy.publish(dst_conn, dst_table, load_table, col_names)
+            except Exception:
+                self.load_strategy.abandon(dst_conn, dst_table, load_table)
+                raise
+        elapsed = time.monotonic() - started
+
+        # Reconciliation: every source row must have been moved (or rejected) exactly once
+        cursor.execute(f"SELECT COUNT(*) FROM ({source_sql})")
+        src_count = cursor.fetchone()[0]
+        dst_cursor.execute(f"SELECT COUNT(*) FROM {dst_table}")
+        dst_added = dst_cursor.fetchone()[0] - dst_before
+        cursor.close()
+        dst_cursor.close()
+        src_conn.close()
+        dst_conn.close()
+
+        reconciled = src_count == transferred + rejected and transferred == dst_added
+        rate = transferred / elapsed if elapsed else 0
+        print(f"[{name}] {transferred} rows in {elapsed:.1f}s ({rate:,.0f} rows/s)")
+        print(
+            f"{'✅' if reconciled else '❌'} [{name}] Reconciliation: source {src_count}, "
+            f"transferred {transferred}, destination +{dst_added}"
+            + (f", rejected {rejected}" if rejected else "")
+        )
+        return {
+            "ranges": len(plans),
+            "source_rows": src_count,
+            "transferred_rows": transferred,
+            "destination_rows_added": dst_added,
+            "rejected_rows": rejected,
+            "reconciled": reconciled,
+            "load_strategy": self.load_strategy.describe(),
+            "seconds": elapsed
+        }
+
 src_config = {
     "user": "src_user",
     "password": "src_pass",
@@ -131,7 +776,7 @@ dst_config = {
     "dsn": "dst_host:1521/dst_service"
 }
 
-transfer = OracleTableTransfer(src_config, dst_config, batch_size=50_000)
+transfer = OracleTableTransfer(src_config, dst_config)  # batches sized per table from a byte budget
 
 # Transfer multiple tables with different names
 tables_to_transfer = {
@@ -141,6 +786,10 @@ tables_to_transfer = {
 }
 
 transfer.transfer_multiple_tables(tables_to_transfer)
+# Check the copies by per-bucket counts and row hashes; prints mismatches only
+# transfer.verify_tables(tables_to_transfer)
+# Nightly reruns: only rows changed since the last run, MERGEd on the destination primary key
+# transfer.transfer_multiple_tables(tables_to_transfer, watermarks={"CUSTOMERS": "UPDATED_AT", "ORDERS": "ORDER_ID"})
 transfer.close()
 
 # -------------------------
@@ -165,5 +814,31 @@ if __name__ == "__main__":
         "PRODUCTS": "PRODUCTS_2025"
     }
 
-    transfer = ParallelOracleTransfer(src_config, dst_config, batch_size=50_000, max_workers=3)
+    transfer = ParallelOracleTransfer(src_config, dst_config, max_workers=3)
     transfer.transfer_tables(tables_to_transfer)
+
+    # One large table split across all workers by ROWID extents (or split_by="key"/"date", column=...)
+    #   transfer.transfer_table_ranges("ORDERS", "ORDERS_BACKUP", split_by="rowid", ranges=12)
+
+    # Prove the copies complete: mismatching buckets come back with a WHERE clause to re-copy them by
+    #   transfer.verify_tables({**tables_to_transfer, "ORDERS": "ORDERS_BACKUP"}, degree=8)
+
+    # Load strategies (see load_strategy.py / load_benchmark.py): fewer commits, direct path or NOLOGGING staging
+    #   bulk = ParallelOracleTransfer(src_config, dst_config, max_workers=3, load_strategy="nologging_staging")
+    #   bulk.transfer_tables({"ORDER_LINES": "ORDER_LINES_2025"})
+
+    # Large refreshes: drop the per-row index maintenance and rebuild indexes/keys once, in parallel
+    #   refresh = ParallelOracleTransfer(src_config, dst_config, max_workers=3, index_rebuild_degree=8)
+    #   refresh.transfer_tables({"ORDER_LINES": "ORDER_LINES_2025"})
+
+    # Resumable copies: progress is saved with each commit, so rerunning the same mapping after a
+    # failure skips finished tables and continues the interrupted one after its last committed key
+    #   from transfer_checkpoint import TableCheckpointStore
+    #   resumable = ParallelOracleTransfer(src_config, dst_config, max_workers=3, checkpoint_store=TableCheckpointStore())
+    #   resumable.transfer_tables(tables_to_transfer, key_columns={"ORDERS": "ORDER_ID"})
+
+    # Row-level rejects: a bad row no longer fails its batch; it is written with its ORA- error to
+    # transfer_rejects/<table>.rejects.jsonl (or TableRejectStore()), and more than 100 rejects fail the table
+    #   from reject_rows import FileRejectStore
+    #   tolerant = ParallelOracleTransfer(src_config, dst_config, max_workers=3, reject_store=FileRejectStore(), reject_limit=100)
+    #   tolerant.transfer_tables(tables_to_transfer)
@@ -1,51 +1,118 @@
 import oracledb
-import pandas as pd
+import time
+from batch_sizing import AdaptiveBatchSizer, DEFAULT_TARGET_BYTES, sample_source
+from load_strategy import LoadStrategy
+from excel_lookup import DEFAULT_LOOKUP_CACHE_DIR, ExcelLookup, JoinColumns, StreamingHashJoin, pushdown_join_sql
 
 class OracleExcelTransfer:
-    def __init__(self, src_config, dst_config, excel_path, excel_key, batch_size=100_000):
+    def __init__(self, src_config, dst_config, excel_path, excel_key, batch_size=None,
+                 target_batch_bytes=DEFAULT_TARGET_BYTES, load_strategy=None, sheet_name=0,
+                 lookup_cache_dir=DEFAULT_LOOKUP_CACHE_DIR, join_in_database=False, columnar=False):
+        # batch_size=None sizes batches to target_batch_bytes from sampled rows and adapts them
+        # load_strategy: LoadStrategy or a load_strategy.LOAD_STRATEGIES name (default conventional)
+        # lookup_cache_dir: parsed sheets and key indexes are reused until the workbook changes (None: always parse)
+        # join_in_database: load the sheet into a temporary table on the source and join there,
+        #                   so only joined rows are fetched (better when the join drops most rows)
+        # columnar: fetch Arrow batches, join and insert them column-wise (needs pyarrow); batches
+        #           keep their first size since fetch_df_batches takes a fixed one
         self.src_conn = oracledb.connect(**src_config)
         self.dst_conn = oracledb.connect(**dst_config)
         self.batch_size = batch_size
-        self.excel_df = pd.read_excel(excel_path)
+        self.target_batch_bytes = target_batch_bytes
+        self.load_strategy = LoadStrategy.named(load_strategy)
+        self.excel_lookup = ExcelLookup.load(excel_path, sheet_name, lookup_cache_dir, key_columns=excel_key)
+        self.excel_df = self.excel_lookup.df
         self.excel_key = excel_key
+        self.join_in_database = join_in_database
+        self.columnar = columnar
+        self.lookup_table = None
+
+    def _lookup_table(self):
+        """The sheet as a global temporary table on the source connection, loaded once."""
+        if self.lookup_table is None:
+            self.lookup_table = self.excel_lookup.load_temp_table(self.src_conn)
+        return self.lookup_table
 
     def transfer_with_excel_join(self, src_table, join_key, dst_table=None, how='inner'):
+        # join_key / excel_key: one column name or a list of them for multi-column keys
         if dst_table is None:
             dst_table = src_table
 
         src_cursor = self.src_conn.cursor()
         dst_cursor = self.dst_conn.cursor()
 
-        # Get column names dynamically from source
-        src_cursor.execute(f"SELECT * FROM {src_table} WHERE ROWNUM = 1")
-        col_names = [desc[0] for desc in src_cursor.description]
-
-        # Insert placeholders
-        placeholders = ", ".join([f":{i+1}" for i in range(len(col_names))])
-        insert_sql = f"INSERT INTO {dst_table} ({', '.join(col_names)}) VALUES ({placeholders})"
-
-        # Fetch data in batches
-        src_cursor.execute(f"SELECT * FROM {src_table}")
+        source_sql = f"SELECT * FROM {src_table}"
+        join = None
+        if self.join_in_database:
+            # Oracle joins the table to the sheet's temporary table; only joined rows are fetched
+            description, _ = sample_source(self.src_conn, source_sql, rows=1)
+            plan = JoinColumns(self.excel_df.columns, self.excel_key, [d[0] for d in description], join_key, how)
+            source_sql = pushdown_join_sql(plan, source_sql, self._lookup_table())
+            out_columns = plan.columns
+
+        # Get column names and row width from a small sample of the source
+        sizer = AdaptiveBatchSizer.for_source(
+            self.src_conn, source_sql, self.batch_size, self.target_batch_bytes, label=src_table
+        )
+        if self.columnar:
+            from arrow_batches import ArrowHashJoin, fetch_arrow_batches  # pyarrow only for this path
+        if not self.join_in_database:
+            # Hash the Excel keys once; batches only probe the index
+            join_class = ArrowHashJoin if self.columnar else StreamingHashJoin
+            join = join_class(self.excel_lookup, self.excel_key, sizer.columns, join_key, how=how)
+            out_columns = join.columns
+
+        # Insert statement for the destination (or its staging table): source plus Excel columns
+        load_table = self.load_strategy.prepare(self.dst_conn, dst_table)
+        insert_sql = self.load_strategy.insert_sql(load_table, out_columns)
+        committer = self.load_strategy.committer(self.dst_conn)
+
+        # Fetch data in batches: Arrow tables, or lists of row tuples
+        if self.columnar:
+            batches = fetch_arrow_batches(self.src_conn, source_sql, sizer.rows)
+        else:
+            sizer.tune_cursor(src_cursor)
+            src_cursor.execute(source_sql)
+            batches = iter(lambda: src_cursor.fetchmany(sizer.rows), [])
         total_rows = 0
 
-        while True:
-            rows = src_cursor.fetchmany(self.batch_size)
-            if not rows:
-                break
-
-            # Convert chunk to DataFrame
-            chunk_df = pd.DataFrame(rows, columns=col_names)
-
-            # Merge with Excel data
-            merged_df = chunk_df.merge(self.excel_df, how=how, left_on=join_key, right_on=self.excel_key)
-
-            # Insert merged data
-            dst_cursor.executemany(insert_sql, merged_df.values.tolist())
-            self.dst_conn.commit()
-
-            total_rows += len(merged_df)
-            print(f"[{src_table}] Processed & inserted {len(merged_df)} rows... Total: {total_rows}")
-
+        try:
+            while True:
+                started = time.monotonic()
+                rows = next(batches, None)
+                if rows is None or not len(rows):
+                    break
+
+                # Join with Excel data (unless Oracle already did) and insert; executemany binds
+                # Arrow tables column-wise
+                joined = join.probe(rows) if join else rows
+                if len(joined):
+                    dst_cursor.executemany(insert_sql, joined)
+                    committer.batch_done(len(joined))
+
+                total_rows += len(joined)
+                if not self.columnar:
+                    sizer.record(len(rows), time.monotonic() - started, src_cursor)
+                print(f"[{src_table}] Processed & inserted {len(joined)} rows... Total: {total_rows}")
+
+            # right/outer joins: Excel rows no source row matched, once
+            unmatched = join.unmatched_right() if join else []
+            for start in range(0, len(unmatched), sizer.rows):
+                batch = unmatched[start:start + sizer.rows]
+                dst_cursor.executemany(insert_sql, batch)
+                committer.batch_done(len(batch))
+            total_rows += len(unmatched)
+            committer.flush()
+            self.load_strategy.publish(self.dst_conn, dst_table, load_table, out_columns)
+        except oracledb.DatabaseError:
+            committer.rollback()
+            self.load_strategy.abandon(self.dst_conn, dst_table, load_table)
+            raise
+
+        if join:
+            print(f"[{src_table}] {join.summary()}")
+        print(f"[{src_table}] {sizer.summary()}")
+        print(f"[{src_table}] {self.load_strategy.describe()}: {committer.commits} commit(s)")
         src_cursor.close()
         dst_cursor.close()
         print(f"✅ Transfer complete for table: {src_table} ({total_rows} rows)")
@@ -72,10 +139,11 @@ transfer = OracleExcelTransfer(
     src_config,
     dst_config,
     excel_path="lookup_data.xlsx",
-    excel_key="Excel_Column_Name",
-    batch_size=50_000
+    excel_key="Excel_Column_Name"
 )
 
+# join_in_database=True loads the sheet into a temporary table on the source and runs the join in
+# Oracle, so only joined rows cross the network
 # Join source table column "CUSTOMER_ID" with Excel column "Excel_Column_Name"
 transfer.transfer_with_excel_join("CUSTOMERS", join_key="CUSTOMER_ID", dst_table="CUSTOMERS_WITH_EXTRA")
 transfer.close()
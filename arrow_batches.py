@@ -0,0 +1,132 @@
+import numpy as np
+import pyarrow as pa
+import pyarrow.compute as pc
+
+from excel_lookup import ExcelLookup, JoinColumns, _is_missing
+
+# Columnar batches for the Excel-join transfers. python-oracledb can fetch a query as Arrow record
+# batches (Connection.fetch_df_batches) and bind an Arrow table straight into executemany, so with
+# the join done on Arrow arrays a batch goes from the source to the destination without a Python
+# object per value. The join resolves keys to (source row, lookup row) index pairs with Arrow's
+# hash join and gathers the output columns with take(); the result matches StreamingHashJoin row
+# for row, including the pandas-style column names of JoinColumns.
+
+
+def fetch_arrow_batches(conn, source_sql, rows, parameters=None):
+    """Yield source_sql as pyarrow Tables of up to `rows` rows, wrapping the driver's buffers."""
+    for batch in conn.fetch_df_batches(statement=source_sql, parameters=parameters, size=rows):
+        yield pa.table(batch)  # Arrow PyCapsule stream, no copy
+
+
+def _arrow_column(series):
+    """A lookup column as an Arrow array; mixed-type object columns become strings."""
+    try:
+        return pa.array(series, from_pandas=True)
+    except (pa.ArrowInvalid, pa.ArrowTypeError):
+        return pa.array([None if _is_missing(v) else str(v) for v in series], pa.string())
+
+
+def _is_numeric(arrow_type):
+    return pa.types.is_integer(arrow_type) or pa.types.is_floating(arrow_type) or pa.types.is_decimal(arrow_type)
+
+
+def _key_types(left_type, right):
+    """(cast for the source key or None, lookup key array) such that equal keys hash alike."""
+    if right.type == left_type:
+        return None, right
+    try:
+        return None, pc.cast(right, left_type)  # safe cast: fails rather than change a value
+    except (pa.ArrowInvalid, pa.ArrowNotImplementedError):
+        pass
+    common = pa.float64() if _is_numeric(left_type) and _is_numeric(right.type) else pa.string()
+    return common, pc.cast(right, common, safe=False)
+
+
+class ArrowHashJoin:
+    """StreamingHashJoin over pyarrow Tables: probe() takes and returns Tables.
+
+    Output columns are those of JoinColumns. Keys with a NULL part never match, as in SQL.
+    """
+
+    def __init__(self, lookup, lookup_keys, left_columns, left_keys, how="inner", right_columns=None):
+        lookup_df = lookup.df if isinstance(lookup, ExcelLookup) else lookup
+        plan = JoinColumns(lookup_df.columns, lookup_keys, left_columns, left_keys, how, right_columns)
+        self.how = how
+        self.columns = plan.columns
+        self.left_columns = plan.left_columns
+        self.left_key_index = plan.left_key_index
+        self.folded = [(plan.lookup_keys.index(right), left_index) for right, left_index in plan.folded.items()]
+
+        # Build side, converted once: carried columns, key columns and a row number to join back on
+        self.right = [_arrow_column(lookup_df[col]) for col in plan.carried]
+        self.right_keys = [_arrow_column(lookup_df[col]) for col in plan.lookup_keys]
+        self.right_rows = len(lookup_df)
+        self.key_table = None
+        self.left_casts = None
+        self.left_schema = None
+        self.matched = np.zeros(self.right_rows, dtype=bool)
+        self.unmatched_emitted = False
+        self.probed = 0
+        self.emitted = 0
+
+    def _prepare(self, batch):
+        """Match lookup key types to the source's on the first batch."""
+        self.left_schema = batch.schema
+        casts, keys = [], {}
+        for i, (left_index, right) in enumerate(zip(self.left_key_index, self.right_keys)):
+            cast, keys[f"k{i}"] = _key_types(batch.schema.field(left_index).type, right)
+            casts.append(cast)
+        keys["__right"] = pa.array(np.arange(self.right_rows, dtype=np.int64))
+        self.left_casts = casts
+        self.key_table = pa.table(keys)
+
+    def probe(self, batch):
+        """Joined output Table for one batch of source rows (columns in left_columns order)."""
+        if self.key_table is None:
+            self._prepare(batch)
+        keys = {}
+        for i, (left_index, cast) in enumerate(zip(self.left_key_index, self.left_casts)):
+            column = batch.column(left_index)
+            keys[f"k{i}"] = column if cast is None else pc.cast(column, cast, safe=False)
+        keys["__left"] = pa.array(np.arange(batch.num_rows, dtype=np.int64))
+        key_names = [f"k{i}" for i in range(len(self.left_key_index))]
+        pairs = pa.table(keys).join(
+            self.key_table, key_names, join_type="left outer" if self.how in ("left", "outer") else "inner",
+            use_threads=False
+        ).sort_by([("__left", "ascending"), ("__right", "ascending")])  # source order, as the row path
+
+        left_rows, right_rows = pairs.column("__left"), pairs.column("__right")
+        if right_rows.null_count < len(right_rows):
+            self.matched[right_rows.drop_null().to_numpy()] = True
+        out = [batch.column(i).take(left_rows) for i in range(len(self.left_columns))]
+        out += [column.take(right_rows) for column in self.right]
+        self.probed += batch.num_rows
+        self.emitted += pairs.num_rows
+        return pa.Table.from_arrays(out, names=self.columns)
+
+    def unmatched_right(self):
+        """Lookup rows no batch matched, for right/outer joins, as one Table; first call only."""
+        if self.unmatched_emitted or self.how not in ("right", "outer"):
+            return pa.table({col: pa.array([], pa.null()) for col in self.columns})
+        self.unmatched_emitted = True
+        positions = pa.array(np.flatnonzero(~self.matched))
+        left = []
+        for i in range(len(self.left_columns)):
+            # Types of a batch that never arrived are unknown; NULLs bind to any column type
+            left_type = self.left_schema.field(i).type if self.left_schema is not None else pa.null()
+            left.append(pa.nulls(len(positions), left_type))
+        for key_position, left_index in self.folded:
+            values = self.right_keys[key_position].take(positions)
+            try:
+                left[left_index] = pc.cast(values, left[left_index].type) if self.left_schema else values
+            except (pa.ArrowInvalid, pa.ArrowNotImplementedError):
+                left[left_index] = values
+        out = left + [column.take(positions) for column in self.right]
+        self.emitted += len(positions)
+        return pa.Table.from_arrays(out, names=self.columns)
+
+    def summary(self):
+        return (
+            f"{self.how} join (Arrow): {self.probed} source rows probed against {self.right_rows} lookup rows "
+            f"({int(self.matched.sum())} matched), {self.emitted} rows out"
+        )
@@ -0,0 +1,171 @@
+import datetime
+import os
+
+import oracledb
+
+# Batch sizing for the Oracle transfer scripts. A fixed row count under-batches narrow tables
+# (many round trips) and over-batches wide or LOB tables (memory), so batches are sized to a
+# byte budget from the column types plus a few sampled rows, then tuned from measured rows/sec.
+DEFAULT_TARGET_BYTES = int(float(os.getenv("TRANSFER_BATCH_MB", "32")) * 1024 * 1024)
+MIN_BATCH_ROWS = 500
+MAX_BATCH_ROWS = 500_000
+SAMPLE_ROWS = 200
+LOB_ESTIMATE_BYTES = 64 * 1024  # per LOB column when no sample is available
+
+_LOB_TYPES = {
+    getattr(oracledb, name) for name in
+    ("DB_TYPE_CLOB", "DB_TYPE_NCLOB", "DB_TYPE_BLOB", "DB_TYPE_BFILE", "DB_TYPE_LONG", "DB_TYPE_LONG_RAW")
+    if hasattr(oracledb, name)
+}
+_NUMBER_TYPES = {
+    getattr(oracledb, name) for name in
+    ("DB_TYPE_NUMBER", "DB_TYPE_BINARY_DOUBLE", "DB_TYPE_BINARY_FLOAT", "DB_TYPE_BINARY_INTEGER")
+    if hasattr(oracledb, name)
+}
+_DATE_TYPES = {
+    getattr(oracledb, name) for name in
+    ("DB_TYPE_DATE", "DB_TYPE_TIMESTAMP", "DB_TYPE_TIMESTAMP_TZ", "DB_TYPE_TIMESTAMP_LTZ")
+    if hasattr(oracledb, name)
+}
+
+
+def declared_row_bytes(description):
+    """Upper-bound row width from cursor.description (VARCHAR2 columns count at their declared size)."""
+    total = 0
+    for _, db_type, _, internal_size, *_ in description:
+        if db_type in _LOB_TYPES:
+            total += LOB_ESTIMATE_BYTES
+        elif db_type in _NUMBER_TYPES:
+            total += 22
+        elif db_type in _DATE_TYPES:
+            total += 13
+        else:
+            total += internal_size or 100
+    return max(total, 1)
+
+
+def _value_bytes(value):
+    if value is None:
+        return 1
+    if isinstance(value, (str, bytes)):
+        return len(value)
+    if isinstance(value, (int, float)):
+        return 22
+    if isinstance(value, (datetime.date, datetime.datetime)):
+        return 13
+    if hasattr(value, "size"):  # LOB locator: what reading it will cost
+        return value.size()
+    return len(str(value))
+
+
+def sampled_row_bytes(rows):
+    if not rows:
+        return None
+    return max(sum(sum(_value_bytes(value) for value in row) for row in rows) // len(rows), 1)
+
+
+def estimate_row_bytes(description, sample=None):
+    """Average row width from sampled rows when there are any, else the declared upper bound."""
+    sampled = sampled_row_bytes(sample)
+    if sampled is None:
+        return declared_row_bytes(description)
+    return int(sampled * 1.25)  # headroom for rows wider than the sample
+
+
+def sample_source(conn, source_sql, rows=SAMPLE_ROWS):
+    """cursor.description and the first few rows of a table name or query."""
+    if not source_sql.lstrip().upper().startswith(("SELECT", "WITH")):
+        source_sql = f"SELECT * FROM {source_sql}"
+    cursor = conn.cursor()
+    cursor.execute(f"SELECT * FROM ({source_sql}) WHERE ROWNUM <= :n", n=rows)
+    description = cursor.description
+    sample = cursor.fetchall()
+    cursor.close()
+    return description, sample
+
+
+class AdaptiveBatchSizer:
+    """Batch row count for one transfer: starts at the byte budget, then hill-climbs on rows/sec.
+
+    Each overshoot turns the climb around with a finer step; once the step is under 10% the sizer
+    settles on the best size seen. The climb stays between MIN_BATCH_ROWS and four times the budget, so memory stays bounded
+    whatever throughput does. A fixed_rows value turns adaptation off (the old batch_size).
+    """
+
+    def __init__(self, row_bytes, target_bytes=DEFAULT_TARGET_BYTES, fixed_rows=None, step=1.5):
+        self.row_bytes = max(int(row_bytes), 1)
+        self.fixed = fixed_rows is not None
+        if self.fixed:
+            self.rows = self.min_rows = self.max_rows = int(fixed_rows)
+        else:
+            self.min_rows = MIN_BATCH_ROWS
+            self.max_rows = self._clamp(4 * target_bytes // self.row_bytes, MIN_BATCH_ROWS, MAX_BATCH_ROWS)
+            self.rows = self._clamp(target_bytes // self.row_bytes, self.min_rows, self.max_rows)
+        self.step = step
+        self.direction = 1
+        self.last_rate = None
+        self.best_rate = 0.0
+        self.best_rows = self.rows
+        self.settled = False
+        self.adjustments = 0
+        self.columns = None  # set by for_source()
+        self.description = None
+
+    @staticmethod
+    def _clamp(value, low, high):
+        return int(max(low, min(high, value)))
+
+    @classmethod
+    def for_source(cls, conn, source_sql, batch_size=None, target_bytes=DEFAULT_TARGET_BYTES, label=None):
+        """Sample a table or query and build its sizer; batch_size pins a fixed row count."""
+        description, sample = sample_source(conn, source_sql)
+        sizer = cls(estimate_row_bytes(description, sample), target_bytes, fixed_rows=batch_size)
+        sizer.columns = [desc[0] for desc in description]
+        sizer.description = description
+        print(
+            f"[{label or source_sql}] ~{sizer.row_bytes} bytes/row -> batches of {sizer.rows} rows "
+            f"({'fixed' if sizer.fixed else f'adaptive {sizer.min_rows}-{sizer.max_rows}'})"
+        )
+        return sizer
+
+    def tune_cursor(self, cursor):
+        """Match round trips to the batch size; call before execute() so prefetchrows applies."""
+        cursor.arraysize = self.rows
+        cursor.prefetchrows = self.rows + 1  # +1 lets the first round trip also detect end of data
+
+    def record(self, rows, seconds, cursor=None):
+        """Feed one full batch's timing back; returns the row count for the next batch."""
+        if self.fixed or self.settled or rows < self.rows or seconds <= 0:
+            return self.rows  # partial (last) batches say nothing about throughput
+        rate = rows / seconds
+        if rate > self.best_rate:
+            self.best_rate, self.best_rows = rate, self.rows
+        if self.last_rate is not None:
+            if rate < self.last_rate * 0.95:
+                # Overshot: turn around with a finer step, and settle on the best size once fine enough
+                self.direction = -self.direction
+                self.step = 1 + (self.step - 1) / 2
+                if self.step < 1.1:
+                    self.settled = True
+                    return self._resize(self.best_rows, cursor)
+            elif rate <= self.last_rate * 1.05:
+                self.last_rate = rate
+                return self.rows  # flat: hold the current size
+        self.last_rate = rate
+        factor = self.step if self.direction > 0 else 1 / self.step
+        return self._resize(self.rows * factor, cursor)
+
+    def _resize(self, rows, cursor):
+        new_rows = self._clamp(rows, self.min_rows, self.max_rows)
+        if new_rows != self.rows:
+            self.rows = new_rows
+            self.adjustments += 1
+            if cursor is not None:
+                cursor.arraysize = new_rows
+        return self.rows
+
+    def summary(self):
+        return (
+            f"batch {self.rows} rows (~{self.rows * self.row_bytes / 1024 / 1024:.1f} MB), "
+            f"best {self.best_rate:,.0f} rows/s, {self.adjustments} adjustment(s)"
+        )
@@ -1,49 +1,154 @@
-from flask import Blueprint, render_template, jsonify, send_from_directory
+from flask import Blueprint, render_template, render_template_string, jsonify, send_from_directory, send_file, request
 from .. import engines, logger
+from ..report_engine import REPORT_PAGES, render_dashboard_report
 from sqlalchemy.sql import text
+from io import BytesIO
+import hmac
+import os
+import threading
+import time
 
 dashboard_bp = Blueprint('dashboard', __name__)
 
+
+class _InFlightLoad:
+    def __init__(self, generation):
+        self.generation = generation
+        self.done = threading.Event()
+        self.value = None
+        self.error = None
+
+
+class SingleFlightTTLCache:
+    """Process-wide result cache; concurrent misses for a key share one load."""
+
+    def __init__(self, ttl_seconds):
+        self.ttl_seconds = ttl_seconds
+        self._lock = threading.Lock()
+        self._entries = {}  # key -> (expires_at, value)
+        self._in_flight = {}  # key -> _InFlightLoad
+        self._generation = 0
+        self.hits = 0
+        self.misses = 0
+        self.stale = 0
+        self.coalesced = 0
+
+    def get_or_load(self, key, loader):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry and entry[0] > time.monotonic():
+                self.hits += 1
+                return entry[1]
+            load = self._in_flight.get(key)
+            is_leader = load is None
+            if is_leader:
+                if entry:
+                    self.stale += 1
+                else:
+                    self.misses += 1
+                load = _InFlightLoad(self._generation)
+                self._in_flight[key] = load
+            else:
+                self.coalesced += 1
+
+        if not is_leader:
+            load.done.wait()
+            if load.error is not None:
+                raise load.error
+            return load.value
+
+        try:
+            load.value = loader()
+        except Exception as e:
+            load.error = e
+            raise
+        else:
+            with self._lock:
+                # Skip storing results that started before an invalidate()
+                if load.generation == self._generation:
+                    self._entries[key] = (time.monotonic() + self.ttl_seconds, load.value)
+            return load.value
+        finally:
+            with self._lock:
+                if self._in_flight.get(key) is load:
+                    del self._in_flight[key]
+            load.done.set()
+
+    def invalidate(self, key=None):
+        with self._lock:
+            self._generation += 1
+            if key is None:
+                self._entries.clear()
+            else:
+                self._entries.pop(key, None)
+
+    def stats(self):
+        with self._lock:
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "stale": self.stale,
+                "coalesced": self.coalesced,
+                "entries": len(self._entries),
+                "in_flight": len(self._in_flight),
+                "ttl_seconds": self.ttl_seconds
+            }
+
+
+query_cache = SingleFlightTTLCache(float(os.getenv('DASHBOARD_CACHE_TTL', '300')))
+# Shared secret for /api/cache/invalidate (X-Cache-Admin-Token header); unset disables the route
+CACHE_ADMIN_TOKEN = os.getenv('DASHBOARD_CACHE_ADMIN_TOKEN', '')
+
+
+def invalidate_dashboard_cache(key=None):
+    """Drop cached query results, e.g. after metrics_time_series is refreshed."""
+    query_cache.invalidate(key)
+    logger.info(f"Dashboard cache invalidated ({key or 'all keys'})")
+
+
+def _query_time_series():
+    with engines['db1'].connect() as connection:
+        query = """
+            SELECT 
+                TO_CHAR(month_end, 'Mon YY') AS month_end,
+                count_id,
+                count_gf,
+                count_gfc,
+                total_tf,
+                ocm_overall,
+                tasks_completed,
+                avg_completion_time,
+                efficiency_rate,
+                total_fte,
+                utilization,
+                overtime_hours
+            FROM metrics_time_series
+            WHERE month_end >= ADD_MONTHS(SYSDATE, -12)
+            ORDER BY month_end DESC
+        """
+        result = connection.execute(text(query)).fetchall()
+        data = [
+            {
+                "month_end": row[0],
+                "count_id": int(row[1]),
+                "count_gf": int(row[2]),
+                "count_gfc": int(row[3]),
+                "total_tf": round(float(row[4]), 2),
+                "ocm_overall": round(float(row[5]), 2),
+                "tasks_completed": int(row[6]),
+                "avg_completion_time": float(row[7]),
+                "efficiency_rate": float(row[8]),
+                "total_fte": float(row[9]),
+                "utilization": float(row[10]),
+                "overtime_hours": float(row[11])
+            }
+            for row in result
+        ]
+        return data
+
 def generate_time_series():
     try:
-        with engines['db1'].connect() as connection:
-            query = """
-                SELECT 
-                    TO_CHAR(month_end, 'Mon YY') AS month_end,
-                    count_id,
-                    count_gf,
-                    count_gfc,
-                    total_tf,
-                    ocm_overall,
-                    tasks_completed,
-                    avg_completion_time,
-                    efficiency_rate,
-                    total_fte,
-                    utilization,
-                    overtime_hours
-                FROM metrics_time_series
-                WHERE month_end >= ADD_MONTHS(SYSDATE, -12)
-                ORDER BY month_end DESC
-            """
-            result = connection.execute(text(query)).fetchall()
-            data = [
-                {
-                    "month_end": row[0],
-                    "count_id": int(row[1]),
-                    "count_gf": int(row[2]),
-                    "count_gfc": int(row[3]),
-                    "total_tf": round(float(row[4]), 2),
-                    "ocm_overall": round(float(row[5]), 2),
-                    "tasks_completed": int(row[6]),
-                    "avg_completion_time": float(row[7]),
-                    "efficiency_rate": float(row[8]),
-                    "total_fte": float(row[9]),
-                    "utilization": float(row[10]),
-                    "overtime_hours": float(row[11])
-                }
-                for row in result
-            ]
-            return data
+        return query_cache.get_or_load('time_series', _query_time_series)
     except Exception as e:
         logger.error(f"Error fetching time series data from DB1: {e}")
         return []
@@ -112,36 +217,8 @@ def generate_sankey_data():
         logger.error(f"Error fetching Sankey data from DB2: {e}")
         return {"nodes": [], "links": [], "metrics": []}
 
-@dashboard_bp.route('/')
-def index():
-    return render_template('index.html')
-
-@dashboard_bp.route('/productivity')
-def productivity():
-    return render_template('productivity.html')
-
-@dashboard_bp.route('/fte')
-def fte():
-    return render_template('fte.html')
-
-@dashboard_bp.route('/sankey')
-def sankey():
-    return render_template('sankey.html')
-
-@dashboard_bp.route('/combined')
-def combined():
-    return render_template('combined.html')
-
-@dashboard_bp.route('/static/<path:filename>')
-def static_files(filename):
-    return send_from_directory('static', filename)
-
-@dashboard_bp.route('/api/data')
-def get_data():
-    data = generate_time_series()
-    if not data:
-        logger.error("No data available for /api/data")
-        return jsonify({"error": "No data available"}), 500
+def build_data_payload(data):
+    """Home dashboard API payload from generate_time_series() rows (newest first)."""
     current_month = data[0]
     prev_month = data[1] if len(data) > 1 else None
     trends = {
@@ -166,15 +243,10 @@ def get_data():
             }
         }
     }
-    logger.info(f"/api/data response generated")
-    return jsonify(response)
+    return response
 
-@dashboard_bp.route('/api/productivity_data')
-def get_productivity_data():
-    data = generate_time_series()
-    if not data:
-        logger.error("No data available for /api/productivity_data")
-        return jsonify({"error": "No data available"}), 500
+def build_productivity_payload(data):
+    """Productivity dashboard API payload from generate_time_series() rows (newest first)."""
     current_month = data[0]
     prev_month = data[1] if len(data) > 1 else None
     trends = {
@@ -198,15 +270,10 @@ def get_productivity_data():
             }
         }
     }
-    logger.info(f"/api/productivity_data response generated")
-    return jsonify(response)
+    return response
 
-@dashboard_bp.route('/api/fte_data')
-def get_fte_data():
-    data = generate_time_series()
-    if not data:
-        logger.error("No data available for /api/fte_data")
-        return jsonify({"error": "No data available"}), 500
+def build_fte_payload(data):
+    """FTE dashboard API payload from generate_time_series() rows (newest first)."""
     current_month = data[0]
     prev_month = data[1] if len(data) > 1 else None
     trends = {
@@ -230,6 +297,125 @@ def get_fte_data():
             }
         }
     }
+    return response
+
+def build_report_pages(paths=None):
+    """(path, API payload or None) pairs for the browserless PDF report, one per dashboard page."""
+    payload_builders = {
+        '/': build_data_payload,
+        '/productivity': build_productivity_payload,
+        '/fte': build_fte_payload
+    }
+    paths = paths or list(REPORT_PAGES)
+    data = generate_time_series() if any(path != '/sankey' for path in paths) else []
+    pages = []
+    for path in paths:
+        if path == '/sankey':
+            sankey = generate_sankey_data()
+            pages.append((path, sankey if sankey["nodes"] and sankey["links"] else None))
+        else:
+            pages.append((path, payload_builders[path](data) if data else None))
+    return pages
+
+@dashboard_bp.route('/')
+def index():
+    return render_template('index.html')
+
+@dashboard_bp.route('/productivity')
+def productivity():
+    return render_template('productivity.html')
+
+@dashboard_bp.route('/fte')
+def fte():
+    return render_template('fte.html')
+
+@dashboard_bp.route('/sankey')
+def sankey():
+    return render_template('sankey.html')
+
+@dashboard_bp.route('/combined')
+def combined():
+    return render_template('combined.html')
+
+# /print stacks every dashboard in one document, one sheet per printed page, so an exporter can
+# load once, wait for one render signal and print the whole report in a single printToPdf call.
+# The frame ids are the ones render_signal.py waits on.
+PRINT_SHEETS = [
+    ('/', 'home-iframe', 'Home Dashboard'),
+    ('/productivity', 'productivity-iframe', 'Productivity Dashboard'),
+    ('/fte', 'fte-iframe', 'FTE Dashboard'),
+    ('/sankey', 'sankey-iframe', 'Sankey Dashboard')
+]
+
+PRINT_TEMPLATE = """<!DOCTYPE html>
+<html>
+<head>
+    <meta charset="utf-8">
+    <title>InsightDash Report</title>
+    <style>
+        html, body { margin: 0; padding: 0; background: #fff; }
+        .print-sheet {
+            width: 1920px;
+            height: 1080px;
+            overflow: hidden;
+            break-inside: avoid;
+            page-break-inside: avoid;
+            break-after: page;
+            page-break-after: always;
+        }
+        .print-sheet:last-child { break-after: auto; page-break-after: auto; }
+        .print-sheet iframe { display: block; width: 1920px; height: 1080px; border: 0; }
+    </style>
+</head>
+<body>
+{% for path, frame_id, title in sheets %}
+    <section class="print-sheet">
+        <iframe id="{{ frame_id }}" title="{{ title }}" src="{{ path }}?export=1" scrolling="no"></iframe>
+    </section>
+{% endfor %}
+</body>
+</html>
+"""
+
+@dashboard_bp.route('/print')
+def print_report():
+    paths = request.args.getlist('page')
+    sheets = [sheet for sheet in PRINT_SHEETS if not paths or sheet[0] in paths]
+    if not sheets:
+        return jsonify({"error": "No known dashboard pages requested"}), 400
+    return render_template_string(PRINT_TEMPLATE, sheets=sheets)
+
+@dashboard_bp.route('/static/<path:filename>')
+def static_files(filename):
+    return send_from_directory('static', filename)
+
+@dashboard_bp.route('/api/data')
+def get_data():
+    data = generate_time_series()
+    if not data:
+        logger.error("No data available for /api/data")
+        return jsonify({"error": "No data available"}), 500
+    response = build_data_payload(data)
+    logger.info(f"/api/data response generated")
+    return jsonify(response)
+
+@dashboard_bp.route('/api/productivity_data')
+def get_productivity_data():
+    data = generate_time_series()
+    if not data:
+        logger.error("No data available for /api/productivity_data")
+        return jsonify({"error": "No data available"}), 500
+    response = build_productivity_payload(data)
+    logger.info(f"/api/productivity_data response generated")
+    return jsonify(response)
+
+@dashboard_bp.route('/api/fte_data')
+def get_fte_data():
+    data = generate_time_series()
+    if not data:
+        logger.error("No data available for /api/fte_data")
+        return jsonify({"error": "No data available"}), 500
+    response = build_fte_payload(data)
     logger.info(f"/api/fte_data response generated")
     return jsonify(response)
 
@@ -242,3 +428,35 @@ def get_sankey_data():
     response = {"nodes": data["nodes"], "links": data["links"], "metrics": data["metrics"]}
     logger.info(f"/api/sankey_data response generated")
     return jsonify(response)
+
+
+@dashboard_bp.route('/api/cache/stats')
+def get_cache_stats():
+    return jsonify(query_cache.stats())
+
+@dashboard_bp.route('/api/cache/invalidate', methods=['POST'])
+def invalidate_cache():
+    # Unauthenticated flushes would defeat the single-flight cache. The caller's address proves
+    # nothing behind a reverse proxy (every request comes from it), so callers present a token
+    token = request.headers.get('X-Cache-Admin-Token', '')
+    if not CACHE_ADMIN_TOKEN or not hmac.compare_digest(token.encode(), CACHE_ADMIN_TOKEN.encode()):
+        logger.warning(f"Refused cache invalidation from {request.remote_addr}")
+        return jsonify({"error": "Cache invalidation needs a valid X-Cache-Admin-Token"}), 403
+    invalidate_dashboard_cache()
+    return jsonify({"message": "Cache invalidated", "stats": query_cache.stats()})
+
+@dashboard_bp.route('/api/report_pdf')
+def get_report_pdf():
+    paths = request.args.getlist('page')
+    unknown = [path for path in paths if path not in REPORT_PAGES]
+    if unknown:
+        return jsonify({"error": f"Unknown report pages: {', '.join(unknown)}"}), 400
+    started = time.monotonic()
+    pdf_bytes = render_dashboard_report(build_report_pages(paths or None))
+    logger.info(f"/api/report_pdf rendered in {(time.monotonic() - started) * 1000:.0f} ms ({len(pdf_bytes)} bytes)")
+    return send_file(
+        BytesIO(pdf_bytes),
+        mimetype='application/pdf',
+        as_attachment=True,
+        download_name='InsightDash_Report.pdf'
+    )
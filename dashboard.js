@@ -19,6 +19,61 @@ const chartConfig = {
     }
 };
 
+// Export/print mode: every chart is drawn straight to its final state, without transitions or
+// particle loops. Enabled by ?export=1 or by window.customDashboard.exportMode = true set before
+// this script runs (the PDF exporters inject it at document creation).
+const isExportMode = () => {
+    const fromQuery = (search) => {
+        const value = new URLSearchParams(search).get('export');
+        return value !== null && value !== '0' && value !== 'false';
+    };
+    if (window.customDashboard?.exportMode === true || fromQuery(window.location.search)) return true;
+    try {
+        // Dashboards embedded as iframes follow the page hosting them
+        return window.parent !== window &&
+            (window.parent.customDashboard?.exportMode === true || fromQuery(window.parent.location.search));
+    } catch (error) {
+        return false; // cross-origin parent
+    }
+};
+const exportMode = isExportMode();
+if (exportMode) chartConfig.animationDuration = 0;
+
+// Stand-in for d3 transitions in export mode: attrs, styles and tweens are applied at their end value at once
+const instantTransition = (selection) => {
+    const applyTween = (setValue) => (name, factory) => {
+        selection.each(function (d, i, nodes) {
+            const interpolate = factory.call(this, d, i, nodes);
+            if (interpolate) setValue(this, name, interpolate(1));
+        });
+        return transition;
+    };
+    const transition = {
+        duration: () => transition,
+        delay: () => transition,
+        ease: () => transition,
+        tween: () => transition,
+        on: () => transition, // nothing is pending, so 'end' handlers (e.g. particle loops) never fire
+        attr: (name, value) => { selection.attr(name, value); return transition; },
+        style: (name, value, priority) => { selection.style(name, value, priority); return transition; },
+        text: (value) => { selection.text(value); return transition; },
+        attrTween: applyTween((node, name, value) => node.setAttribute(name, value)),
+        styleTween: applyTween((node, name, value) => node.style.setProperty(name, value)),
+        each: (callback) => { selection.each(callback); return transition; },
+        remove: () => { selection.remove(); return transition; },
+        transition: () => transition,
+        selection: () => selection,
+        end: () => Promise.resolve()
+    };
+    return transition;
+};
+
+const enableInstantTransitions = () => {
+    if (!exportMode || typeof d3 === 'undefined' || d3.selection.prototype.instantTransitions) return;
+    d3.selection.prototype.transition = function () { return instantTransition(this); };
+    d3.selection.prototype.instantTransitions = true;
+};
+
 const getCSSVariable = (variable) =>
     getComputedStyle(document.documentElement).getPropertyValue(variable).trim();
 
@@ -442,6 +497,48 @@ const createScatterLegend = (svg, width, colors, fontScale) => {
 let isRendering = false;
 let renderingTimeout = null;
 
+// Render-complete signal: headless exporters wait for 'charts-rendered' instead of sleeping
+window.customDashboard = window.customDashboard || {};
+window.customDashboard.exportMode = exportMode;
+let renderGeneration = 0;
+
+const hasActiveTransitions = (selectors) => selectors.some(selector => {
+    const container = document.querySelector(selector);
+    if (!container) return false;
+    // d3 keeps pending transitions on node.__transition until they end; particle loops never end
+    return Array.from(container.querySelectorAll('*'))
+        .some(el => el.__transition && !el.classList.contains('sankey-particle'));
+});
+
+const waitForChartTransitions = (selectors, timeoutMs = chartConfig.animationDuration * 2) => new Promise(resolve => {
+    const startedAt = performance.now();
+    const check = () => {
+        if (!hasActiveTransitions(selectors) || performance.now() - startedAt > timeoutMs) {
+            resolve();
+        } else {
+            setTimeout(check, 100);
+        }
+    };
+    check();
+});
+
+const signalChartsRendered = async (generation, expected, rendered, failed) => {
+    if (!exportMode) await waitForChartTransitions(expected); // export mode draws final state synchronously
+    if (generation !== renderGeneration) return; // a newer draw superseded this one
+    const detail = {
+        path: window.location.pathname,
+        generation,
+        expected,
+        rendered,
+        failed,
+        missing: expected.filter(id => !rendered.includes(id)),
+        exportMode
+    };
+    window.customDashboard.renderState = { status: 'rendered', detail };
+    window.dispatchEvent(new CustomEvent('charts-rendered', { detail }));
+    console.log(`[ChartsRendered] ${JSON.stringify(detail)}`);
+};
+
 const drawCharts = async () => {
     if (isRendering) {
         console.log('[DrawCharts] Rendering in progress, skipping');
@@ -453,7 +550,13 @@ const drawCharts = async () => {
         console.warn('[DrawCharts] Rendering took too long, resetting isRendering flag');
     }, 10000);
 
-    console.log(`[DrawCharts] Starting chart rendering for path: ${window.location.pathname}`);
+    console.log(`[DrawCharts] Starting chart rendering for path: ${window.location.pathname}${exportMode ? ' (export mode)' : ''}`);
+    enableInstantTransitions();
+    const generation = ++renderGeneration;
+    window.customDashboard.renderState = { status: 'rendering', generation };
+    let expectedCharts = [];
+    const renderedCharts = [];
+    const failedCharts = [];
     try {
         const data = await fetchData();
         const primaryColorStart = getCSSVariable('--chart-gradient-start');
@@ -484,6 +587,7 @@ const drawCharts = async () => {
         const charts = chartConfigs[window.location.pathname] || chartConfigs['/'];
 
         console.log(`[DrawCharts] Chart configurations:`, charts);
+        expectedCharts = charts.map(chart => chart.id);
 
         ['#line-chart', '#bar-chart', '#area-chart', '#scatter-chart', '#sankey-chart'].forEach(selector => {
             const container = document.querySelector(selector);
@@ -524,9 +628,12 @@ const drawCharts = async () => {
                         break;
                     default:
                         console.warn(`Unknown chart type: ${chart.type}`);
+                        continue;
                 }
+                renderedCharts.push(chart.id);
             } catch (error) {
                 console.error(`Error rendering chart ${chart.title}:`, error);
+                failedCharts.push(chart.id);
                 const container = document.querySelector(chart.id);
                 if (container) {
                     container.innerHTML = `<div class="error">Error loading chart: ${error.message}</div>`;
@@ -537,6 +644,7 @@ const drawCharts = async () => {
         isRendering = false;
         clearTimeout(renderingTimeout);
     }
+    await signalChartsRendered(generation, expectedCharts, renderedCharts, failedCharts);
 };
 
 const areChartContainersReady = () => {
@@ -1557,7 +1665,8 @@ const drawSankeyChart = (containerId, data, title, color) => {
         .style('stroke-width', d => Math.max(4, Math.min(d.width, 12)));
 
     const isLowPerformance = window.innerWidth < 1366 || navigator.hardwareConcurrency < 4;
-    const maxParticlesPerLink = isLowPerformance ? 1 : 2;
+    // No particles in export mode: their transition loop never ends and adds nothing to a static page
+    const maxParticlesPerLink = exportMode ? 0 : isLowPerformance ? 1 : 2;
 
     links.each(function (d) {
         const path = d3.select(this).node();
@@ -1566,6 +1675,7 @@ const drawSankeyChart = (containerId, data, title, color) => {
 
         for (let i = 0; i < particleCount; i++) {
             const particle = svg.append('circle')
+                .attr('class', 'sankey-particle')
                 .attr('r', 2.5) // Slightly larger particles
                 .attr('fill', '#ffffff')
                 .attr('opacity', 0.6)
@@ -1607,7 +1717,7 @@ const drawSankeyChart = (containerId, data, title, color) => {
         .attr('filter', 'url(#glow)')
         .style('opacity', 0)
         .style('transform', 'scale(0.9) translateY(-5px)')
-        .style('animation', 'pulse 2.5s infinite')
+        .style('animation', exportMode ? 'none' : 'pulse 2.5s infinite')
         .transition()
         .delay((d, i) => i * 70)
         .duration(700)
@@ -0,0 +1,383 @@
+import datetime
+import hashlib
+import json
+import os
+import shutil
+import tempfile
+from operator import itemgetter
+
+import numpy as np
+import oracledb
+import pandas as pd
+import pyarrow as pa
+import pyarrow.feather as feather
+
+# Excel lookup sheets for the transfer jobs. Parsing a large workbook takes far longer than the
+# copy it feeds, so a parsed sheet is cached on disk keyed by path, mtime/size and sheet:
+# fixed-width columns as .npy files that later loads memory-map, other columns in an Arrow file,
+# plus the hash index per key-column set, also as Arrow. Nothing in the cache is pickled, so a
+# tampered entry cannot run code; the cache directory is still private to its user (0700). Fetched Oracle batches are then joined by probing that index
+# instead of running a pandas merge per chunk; matched lookup rows are tracked so right/outer
+# joins emit the unmatched ones exactly once, after the last batch. For big joins the sheet can
+# instead be bulk-loaded into a global temporary table so the join runs inside Oracle.
+JOIN_TYPES = ("inner", "left", "right", "outer")
+SQL_JOINS = {"inner": "JOIN", "left": "LEFT JOIN", "right": "RIGHT JOIN", "outer": "FULL OUTER JOIN"}
+TEMP_TABLE_BATCH_ROWS = 50_000
+DEFAULT_LOOKUP_CACHE_DIR = os.getenv("EXCEL_LOOKUP_CACHE_DIR") or os.path.join(
+    os.getenv("XDG_CACHE_HOME") or os.path.join(os.path.expanduser("~"), ".cache"), "insightdash", "lookup"
+)
+CACHE_FORMAT = "arrow-1"  # part of every entry name; entries of an older format are replaced
+UNCACHEABLE = (TypeError, ValueError, pa.ArrowException)  # mixed-type column, odd column name
+
+
+def _as_list(columns):
+    return [columns] if isinstance(columns, str) else list(columns)
+
+
+def _python_rows(df):
+    """DataFrame rows as tuples of plain Python values, NaN/NaT as None (what the driver binds)."""
+    return list(df.astype(object).where(df.notna(), None).itertuples(index=False, name=None))
+
+
+def _is_missing(value):
+    return value is None or value != value  # NaN is the only value not equal to itself
+
+
+def _sha256(value):
+    return hashlib.sha256(json.dumps(value, default=str).encode("utf-8")).hexdigest()
+
+
+def build_key_index(df, key_columns):
+    """{key: [row positions]} over key_columns; single keys are scalars, NULL keys are left out."""
+    index = {}
+    for position, key in enumerate(_python_rows(df[key_columns])):
+        if any(_is_missing(part) for part in key):
+            continue
+        index.setdefault(key[0] if len(key) == 1 else key, []).append(position)
+    return index
+
+
+def _quote(name):
+    return f'"{name}"'
+
+
+def _oracle_column(series):
+    """(column type, bind type, value converter) for one lookup column."""
+    values = series.dropna()
+    kind = series.dtype.kind if isinstance(series.dtype, np.dtype) else "O"
+    if kind == "b":
+        return "NUMBER(1)", oracledb.DB_TYPE_NUMBER, int
+    if kind in "iuf" or (len(values) and all(
+            isinstance(v, (int, float, np.number)) and not isinstance(v, bool) for v in values)):
+        return "NUMBER", oracledb.DB_TYPE_NUMBER, None
+    if kind == "M" or (len(values) and all(isinstance(v, datetime.datetime) for v in values)):
+        return "TIMESTAMP", oracledb.DB_TYPE_TIMESTAMP, None
+    width = max((len(str(v).encode("utf-8")) for v in values), default=1)
+    if width > 4000:
+        return "CLOB", oracledb.DB_TYPE_CLOB, str
+    return f"VARCHAR2({max(width, 1)} BYTE)", max(width, 1), str
+
+
+def pushdown_join_sql(plan, source_sql, lookup_table):
+    """SELECT joining source_sql to the loaded lookup table inside Oracle; its columns are plan.columns."""
+    folded_into = {left_index: right for right, left_index in plan.folded.items()}
+    select = []
+    for i, (col, name) in enumerate(zip(plan.left_columns, plan.columns)):
+        expr = f"s.{_quote(col)}"
+        if i in folded_into and plan.how in ("right", "outer"):
+            expr = f"COALESCE({expr}, l.{_quote(folded_into[i])})"  # unmatched lookup rows keep their key
+        select.append(f"{expr} AS {_quote(name)}")
+    for col, name in zip(plan.carried, plan.columns[len(plan.left_columns):]):
+        select.append(f"l.{_quote(col)} AS {_quote(name)}")
+    on = " AND ".join(
+        f"s.{_quote(plan.left_columns[index])} = l.{_quote(right)}"
+        for index, right in zip(plan.left_key_index, plan.lookup_keys)
+    )
+    return f"SELECT {', '.join(select)} FROM ({source_sql}) s {SQL_JOINS[plan.how]} {lookup_table} l ON ({on})"
+
+
+def _private_dir(path):
+    """Create path for the current user only (0700); refuse a link or a directory others can use."""
+    os.makedirs(path, mode=0o700, exist_ok=True)
+    info = os.lstat(path)
+    if os.path.islink(path) or (hasattr(os, "getuid") and (info.st_uid != os.getuid() or info.st_mode & 0o077)):
+        raise RuntimeError(
+            f"Lookup cache directory {path} must be a directory owned by this user with mode 0700 "
+            "(set EXCEL_LOOKUP_CACHE_DIR or pass cache_dir=None to disable the cache)"
+        )
+    return path
+
+
+def _write_frame(directory, df):
+    """The frame as .npy files (fixed-width columns) and one Arrow file (the rest) plus meta.json."""
+    columns, objects = [], {}
+    for i, (name, series) in enumerate(df.items()):
+        if isinstance(series.dtype, np.dtype) and series.dtype.kind in "biufcmM":
+            np.save(os.path.join(directory, f"col{i}.npy"), series.to_numpy(), allow_pickle=False)
+            columns.append([name, "npy"])
+        else:
+            objects[f"col{i}"] = pa.array(series.to_numpy(dtype=object), from_pandas=True)
+            columns.append([name, "arrow"])
+    feather.write_feather(pa.table(objects), os.path.join(directory, "objects.arrow"), compression="uncompressed")
+    with open(os.path.join(directory, "meta.json"), "w") as f:
+        json.dump({"columns": columns, "rows": len(df)}, f)  # column names must be JSON values
+
+
+def _read_frame(directory):
+    with open(os.path.join(directory, "meta.json")) as f:
+        meta = json.load(f)
+    objects = feather.read_table(os.path.join(directory, "objects.arrow"), memory_map=True)
+    data = {}
+    for i, (name, kind) in enumerate(meta["columns"]):
+        if kind == "npy":
+            # pages in on demand, shared between workers
+            data[name] = np.load(os.path.join(directory, f"col{i}.npy"), mmap_mode="r", allow_pickle=False)
+        else:
+            values = np.empty(meta["rows"], dtype=object)
+            values[:] = objects.column(f"col{i}").to_pylist()  # plain Python values, None for NULL
+            data[name] = values
+    return pd.DataFrame(data, columns=[name for name, _ in meta["columns"]], copy=False)
+
+
+def _write_index(path, index, width):
+    keys = list(index)
+    parts = [keys] if width == 1 else [[key[i] for key in keys] for i in range(width)]
+    table = pa.table({
+        **{f"k{i}": pa.array(part) for i, part in enumerate(parts)},
+        "positions": pa.array(list(index.values()), type=pa.list_(pa.int64())),
+    })
+    fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path), suffix=".tmp")
+    os.close(fd)
+    try:
+        feather.write_feather(table, tmp_path, compression="uncompressed")
+        os.replace(tmp_path, path)
+    finally:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+
+
+def _read_index(path, width):
+    table = feather.read_table(path, memory_map=True)
+    parts = [table.column(f"k{i}").to_pylist() for i in range(width)]
+    keys = parts[0] if width == 1 else zip(*parts)
+    return dict(zip(keys, table.column("positions").to_pylist()))
+
+
+class ExcelLookup:
+    """A parsed lookup sheet backed by the on-disk cache, with cached key indexes.
+
+    Rewriting the workbook changes its mtime/size, so stale entries are never read; they are
+    removed when the new version is cached. Cache writes go to a temporary directory renamed into
+    place, so parallel workers loading the same sheet never see a partial entry.
+    """
+
+    def __init__(self, df, directory=None):
+        self.df = df
+        self.directory = directory
+        self._indexes = {}
+
+    @classmethod
+    def load(cls, excel_path, sheet_name=0, cache_dir=DEFAULT_LOOKUP_CACHE_DIR, key_columns=None):
+        """Cached parse of one sheet; key_columns prebuilds (and caches) that key index."""
+        if cache_dir is None:
+            lookup = cls(pd.read_excel(excel_path, sheet_name=sheet_name))
+        else:
+            _private_dir(cache_dir)
+            stat = os.stat(excel_path)
+            source = _sha256([os.path.abspath(excel_path), sheet_name])[:16]
+            version = _sha256([CACHE_FORMAT, stat.st_mtime_ns, stat.st_size])[:16]
+            directory = os.path.join(cache_dir, f"{source}-{version}")
+            if os.path.exists(os.path.join(directory, "meta.json")):
+                lookup = cls(_read_frame(directory), directory)
+                print(f"📄 {excel_path} [{sheet_name}]: {len(lookup.df)} rows from cache")
+            else:
+                lookup = cls(pd.read_excel(excel_path, sheet_name=sheet_name))
+                lookup.directory = cls._store(cache_dir, source, directory, lookup.df)
+                cached = "cached" if lookup.directory else "not cacheable"
+                print(f"📄 {excel_path} [{sheet_name}]: parsed {len(lookup.df)} rows, {cached}")
+        if key_columns is not None:
+            lookup.key_index(key_columns)
+        return lookup
+
+    @staticmethod
+    def _store(cache_dir, source, directory, df):
+        tmp_dir = tempfile.mkdtemp(dir=cache_dir, prefix=".tmp-")
+        try:
+            _write_frame(tmp_dir, df)
+        except UNCACHEABLE:
+            shutil.rmtree(tmp_dir, ignore_errors=True)  # e.g. a column mixing numbers and text
+            return None
+        try:
+            os.rename(tmp_dir, directory)
+        except OSError:
+            shutil.rmtree(tmp_dir, ignore_errors=True)  # another worker cached it first
+            if not os.path.exists(directory):
+                return None
+        for name in os.listdir(cache_dir):
+            if name.startswith(source + "-") and os.path.join(cache_dir, name) != directory:
+                shutil.rmtree(os.path.join(cache_dir, name), ignore_errors=True)  # older workbook versions
+        return directory
+
+    def key_index(self, key_columns):
+        """The hash index over key_columns, built once per cached sheet version."""
+        key_columns = _as_list(key_columns)
+        name = tuple(key_columns)
+        if name in self._indexes:
+            return self._indexes[name]
+        path = os.path.join(self.directory, f"index-{_sha256(key_columns)[:16]}.arrow") if self.directory else None
+        if path and os.path.exists(path):
+            index = _read_index(path, len(key_columns))
+        else:
+            index = build_key_index(self.df, key_columns)
+            if path:
+                try:
+                    _write_index(path, index, len(key_columns))
+                except UNCACHEABLE:
+                    pass  # keys of mixed types: rebuilt from the cached frame next time
+        self._indexes[name] = index
+        return index
+
+    def load_temp_table(self, conn, table_name=None, batch_rows=TEMP_TABLE_BATCH_ROWS):
+        """Copy the sheet into a global temporary table on conn with array DML; returns its name.
+
+        The table (ON COMMIT PRESERVE ROWS) is created once per sheet layout and left in place;
+        every session sees only its own rows, which this call replaces.
+        """
+        columns = [str(col) for col in self.df.columns]
+        specs = [_oracle_column(self.df[col]) for col in self.df.columns]
+        table_name = table_name or f"XL_{_sha256([columns, [spec[0] for spec in specs]])[:12].upper()}"
+        cursor = conn.cursor()
+        try:
+            cursor.execute(
+                f"CREATE GLOBAL TEMPORARY TABLE {table_name} "
+                f"({', '.join(f'{_quote(col)} {spec[0]}' for col, spec in zip(columns, specs))}) "
+                f"ON COMMIT PRESERVE ROWS"
+            )
+        except oracledb.DatabaseError as e:
+            if e.args[0].code != 955:  # ORA-00955: already exists
+                raise
+        cursor.execute(f"DELETE FROM {table_name}")
+
+        rows = _python_rows(self.df)
+        converters = [spec[2] for spec in specs]
+        if any(converters):
+            rows = [
+                tuple(v if v is None or convert is None else convert(v) for v, convert in zip(row, converters))
+                for row in rows
+            ]
+        insert_sql = (
+            f"INSERT INTO {table_name} ({', '.join(_quote(col) for col in columns)}) "
+            f"VALUES ({', '.join(f':{i+1}' for i in range(len(columns)))})"
+        )
+        cursor.setinputsizes(*[spec[1] for spec in specs])
+        for start in range(0, len(rows), batch_rows):
+            cursor.executemany(insert_sql, rows[start:start + batch_rows])
+        conn.commit()
+        cursor.close()
+        print(f"📥 Loaded {len(rows)} lookup rows into {table_name}")
+        return table_name
+
+
+class JoinColumns:
+    """Output columns of a source (left) x lookup (right) join, named the way pandas merge names them.
+
+    Left columns come first, then the carried lookup columns (right_columns, default all). A
+    lookup key with the same name as its left key is folded into the left column; other clashing
+    names get _x/_y suffixes.
+    """
+
+    def __init__(self, lookup_columns, lookup_keys, left_columns, left_keys, how="inner", right_columns=None):
+        if how not in JOIN_TYPES:
+            raise ValueError(f"Unsupported join type: {how} (choose from {', '.join(JOIN_TYPES)})")
+        self.lookup_keys, self.left_keys = _as_list(lookup_keys), _as_list(left_keys)
+        if len(self.lookup_keys) != len(self.left_keys):
+            raise ValueError(f"{len(self.left_keys)} join key(s) but {len(self.lookup_keys)} lookup key(s)")
+        upper = [col.upper() for col in left_columns]
+        missing = [key for key in self.left_keys if key.upper() not in upper]
+        if missing:
+            raise ValueError(f"Join key column(s) {', '.join(missing)} not in the source columns")
+        self.how = how
+        self.left_columns = list(left_columns)
+        self.left_key_index = [upper.index(key.upper()) for key in self.left_keys]
+        # lookup key -> position of the left column it is folded into
+        self.folded = {
+            right: self.left_key_index[i]
+            for i, (left, right) in enumerate(zip(self.left_keys, self.lookup_keys)) if left.upper() == right.upper()
+        }
+        self.carried = [
+            col for col in (lookup_columns if right_columns is None else right_columns) if col not in self.folded
+        ]
+        clashes = {str(col).upper() for col in self.carried} & set(upper)
+        self.columns = [f"{col}_x" if col.upper() in clashes else col for col in self.left_columns]
+        self.columns += [f"{col}_y" if str(col).upper() in clashes else str(col) for col in self.carried]
+
+
+class StreamingHashJoin:
+    """Hash join of streamed batches (left) against a lookup DataFrame or ExcelLookup (right).
+
+    Output columns are those of JoinColumns. Keys with a NULL part never match, as in SQL.
+    """
+
+    def __init__(self, lookup, lookup_keys, left_columns, left_keys, how="inner", right_columns=None):
+        lookup_df = lookup.df if isinstance(lookup, ExcelLookup) else lookup
+        plan = JoinColumns(lookup_df.columns, lookup_keys, left_columns, left_keys, how, right_columns)
+        lookup_keys, carried = plan.lookup_keys, plan.carried
+        self.how = how
+        self.columns = plan.columns
+        self.left_columns = plan.left_columns
+        self.left_key = itemgetter(*plan.left_key_index)  # scalar for one key, tuple for several
+        self.right_width = len(carried)
+
+        # Build side: key -> lookup row positions, plus the carried values of every lookup row
+        self.right_rows = _python_rows(lookup_df[carried]) if carried else [()] * len(lookup_df)
+        self.folded_keys = [(lookup_keys.index(right), left_index) for right, left_index in plan.folded.items()]
+        self.right_key_rows = _python_rows(lookup_df[lookup_keys]) if self.folded_keys else None
+        if isinstance(lookup, ExcelLookup):
+            self.index = lookup.key_index(lookup_keys)
+        else:
+            self.index = build_key_index(lookup_df, lookup_keys)
+        self.matched = bytearray(len(self.right_rows))
+        self.unmatched_emitted = False
+        self.probed = 0
+        self.emitted = 0
+
+    def probe(self, rows):
+        """Joined output rows for one batch of left rows (tuples in left_columns order)."""
+        out = []
+        index, right_rows, matched = self.index, self.right_rows, self.matched
+        keep_unmatched = self.how in ("left", "outer")
+        no_match = (None,) * self.right_width
+        for row in rows:
+            positions = index.get(self.left_key(row))
+            if positions:
+                for position in positions:
+                    matched[position] = 1
+                    out.append(tuple(row) + right_rows[position])
+            elif keep_unmatched:
+                out.append(tuple(row) + no_match)
+        self.probed += len(rows)
+        self.emitted += len(out)
+        return out
+
+    def unmatched_right(self):
+        """Lookup rows no batch matched, for right/outer joins; returned by the first call only."""
+        if self.unmatched_emitted or self.how not in ("right", "outer"):
+            return []
+        self.unmatched_emitted = True
+        out = []
+        for position, was_matched in enumerate(self.matched):
+            if was_matched:
+                continue
+            left = [None] * len(self.left_columns)
+            for key_position, left_index in self.folded_keys:
+                left[left_index] = self.right_key_rows[position][key_position]
+            out.append(tuple(left) + self.right_rows[position])
+        self.emitted += len(out)
+        return out
+
+    def summary(self):
+        matched = sum(self.matched)
+        return (
+            f"{self.how} join: {self.probed} source rows probed against {len(self.right_rows)} lookup rows "
+            f"({len(self.index)} keys, {matched} matched), {self.emitted} rows out"
+        )
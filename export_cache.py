@@ -0,0 +1,164 @@
+import hashlib
+import json
+import os
+import tempfile
+import threading
+import urllib.request
+from urllib.parse import urlsplit, urlunsplit
+
+# Rendered PDFs only change when the data behind a page changes, so finished documents and
+# single-page fragments are stored under a hash of the page's API payload plus everything else
+# that affects the print (page URL, theme, layout, the dashboard.js/template version). Only pages
+# whose key is new get rendered.
+DEFAULT_CACHE_DIR = os.getenv("PDF_EXPORT_CACHE_DIR", os.path.join(tempfile.gettempdir(), "insightdash_pdf_cache"))
+DEFAULT_CACHE_BYTES = int(float(os.getenv("PDF_EXPORT_CACHE_MB", "256")) * 1024 * 1024)
+DEFAULT_THEME = "light-theme"
+APP_DIR = os.path.dirname(os.path.abspath(__file__))
+# Files that decide how a page draws; the cache directory outlives deploys, so their hash is in every key
+TEMPLATE_PATHS = [os.path.join(APP_DIR, path) for path in ("dashboard.js", "static", "templates")]
+
+# Same page -> endpoint mapping as fetchData() in dashboard.js; other pages are never cached
+PAGE_API_ENDPOINTS = {
+    "/": "/api/data",
+    "/productivity": "/api/productivity_data",
+    "/fte": "/api/fte_data",
+    "/sankey": "/api/sankey_data",
+}
+
+
+def _sha256(value):
+    return hashlib.sha256(value.encode("utf-8")).hexdigest()
+
+
+def fetch_payload_digest(page_url, timeout=10):
+    """Hash of the API payload a dashboard page renders, or None if the page or payload is unknown."""
+    parts = urlsplit(page_url)
+    endpoint = PAGE_API_ENDPOINTS.get(parts.path or "/")
+    if endpoint is None:
+        return None
+    api_url = urlunsplit((parts.scheme, parts.netloc, endpoint, "", ""))
+    try:
+        with urllib.request.urlopen(api_url, timeout=timeout) as response:
+            payload = json.loads(response.read())
+    except (OSError, ValueError) as e:
+        print(f"Could not fetch {api_url} for the export cache key: {e}")
+        return None
+    return _sha256(json.dumps(payload, sort_keys=True, separators=(",", ":")))
+
+
+def template_version(paths=TEMPLATE_PATHS):
+    """Hash of dashboard.js and the templates/static files; PDF_EXPORT_TEMPLATE_VERSION overrides it."""
+    override = os.getenv("PDF_EXPORT_TEMPLATE_VERSION")
+    if override:
+        return override
+    digest = hashlib.sha256()
+    for path in paths:
+        if os.path.isfile(path):
+            files = [path]
+        else:
+            files = sorted(os.path.join(root, name) for root, _, names in os.walk(path) for name in names)
+        for file_path in files:
+            try:
+                with open(file_path, "rb") as f:
+                    data = f.read()
+            except OSError:
+                continue
+            digest.update(os.path.relpath(file_path, APP_DIR).encode("utf-8"))
+            digest.update(data)
+    return digest.hexdigest()
+
+
+def page_cache_key(page_url, theme, layout, payload_digest=None, version=None):
+    """theme must be the one the page is rendered with (see resolve_theme), never None."""
+    payload_digest = payload_digest or fetch_payload_digest(page_url)
+    if payload_digest is None:
+        return None
+    return _sha256(json.dumps([page_url, payload_digest, theme, layout, version or template_version()]))
+
+
+def resolve_theme(theme):
+    """The theme a job renders with: without one, the default is pinned rather than the profile's stored theme."""
+    return theme or DEFAULT_THEME
+
+
+def document_cache_key(page_keys):
+    """Key of the merged document; None unless every page has a key."""
+    if not page_keys or not all(page_keys):
+        return None
+    return _sha256("|".join(page_keys))
+
+
+class ExportCache:
+    """Size-bounded on-disk store of PDF bytes; the least recently used files are evicted first."""
+
+    def __init__(self, directory=DEFAULT_CACHE_DIR, max_bytes=DEFAULT_CACHE_BYTES):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self.lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        os.makedirs(directory, exist_ok=True)
+
+    def _path(self, kind, key):
+        return os.path.join(self.directory, f"{kind}-{key}.pdf")
+
+    def get(self, kind, key):
+        if key is None:
+            return None
+        path = self._path(kind, key)
+        with self.lock:
+            try:
+                with open(path, "rb") as f:
+                    data = f.read()
+                os.utime(path)  # mtime doubles as the LRU clock
+            except OSError:
+                self.misses += 1
+                return None
+            self.hits += 1
+            return data
+
+    def put(self, kind, key, data):
+        if key is None or not data or len(data) > self.max_bytes:
+            return
+        path = self._path(kind, key)
+        with self.lock:
+            fd, tmp_path = tempfile.mkstemp(dir=self.directory, suffix=".tmp")
+            with os.fdopen(fd, "wb") as f:
+                f.write(data)
+            os.replace(tmp_path, path)  # readers never see a half-written file
+            self._evict()
+
+    def _evict(self):
+        entries = []
+        for name in os.listdir(self.directory):
+            if not name.endswith(".pdf"):
+                continue
+            try:
+                stat = os.stat(os.path.join(self.directory, name))
+            except OSError:
+                continue
+            entries.append((stat.st_mtime, stat.st_size, name))
+        total = sum(size for _, size, _ in entries)
+        for _, size, name in sorted(entries):
+            if total <= self.max_bytes:
+                break
+            try:
+                os.remove(os.path.join(self.directory, name))
+            except OSError:
+                continue
+            total -= size
+            self.evictions += 1
+
+    def stats(self):
+        with self.lock:
+            files = [name for name in os.listdir(self.directory) if name.endswith(".pdf")]
+            size = sum(os.path.getsize(os.path.join(self.directory, name)) for name in files)
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "entries": len(files),
+                "bytes": size,
+                "max_bytes": self.max_bytes
+            }
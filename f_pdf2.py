@@ -1,11 +1,10 @@
-from flask import Flask, send_file, jsonify
+from flask import Flask, send_file, jsonify, request
 from flask_socketio import SocketIO
 from flask_sqlalchemy import SQLAlchemy
-from PyQt5.QtWidgets import QApplication
-import sys
 import os
+from io import BytesIO
 # ... (other imports from your original app.py)
-from pdf_exporter import PDFExporter  # Import the modified PDFExporter
+from render_service import RenderService, DEFAULT_URLS, dashboard_pages
 
 app = Flask(__name__)
 app.config['SECRET_KEY'] = os.getenv('SECRET_KEY', 'your-secret-key')
@@ -14,40 +13,52 @@ app.config['SQLALCHEMY_TRACK_MODIFICATIONS'] = False
 socketio = SocketIO(app)
 db = SQLAlchemy(app)
 
-# Initialize QApplication once at startup
-qt_app = QApplication(sys.argv)
+# The render worker process owns the QApplication; Flask only queues jobs
+render_service = RenderService(socketio=socketio)
 
 # ... (your existing Comment model, data generation functions, and routes)
 
-@app.route('/api/export_pdf', methods=['GET'])
+@app.route('/api/export_pdf', methods=['POST'])
 def export_pdf():
     try:
-        # Define URLs to export (same as in your original pdf_exporter.py)
-        urls = [
-            ("http://127.0.0.1:5000/", "Home Dashboard"),
-            ("http://127.0.0.1:5000/productivity", "Productivity Dashboard"),
-            ("http://127.0.0.1:5000/fte", "FTE Dashboard"),
-            ("http://127.0.0.1:5000/sankey", "Sankey Dashboard")
-        ]
-        output_file = "InsightDash_Dashboard.pdf"
-        
-        # Initialize PDFExporter with the shared QApplication instance
-        exporter = PDFExporter(urls, output_file, qt_app)
-        exporter.start()
-        
-        # Wait for the PDF to be generated (blocking, but can be made async if needed)
-        while not os.path.exists(output_file):
-            import time
-            time.sleep(1)
-        
-        # Serve the PDF file
-        return send_file(output_file, as_attachment=True, download_name="InsightDash_Dashboard.pdf")
+        payload = request.get_json(silent=True) or {}
+        # Pages are chosen by path and their URLs built here: the renderer loads whatever it is given
+        try:
+            urls = dashboard_pages(payload['pages']) if payload.get('pages') else DEFAULT_URLS
+        except ValueError as e:
+            return jsonify({"error": str(e)}), 400
+        job_id = render_service.submit(urls, theme=payload.get('theme'))
+        return jsonify({
+            "job_id": job_id,
+            "status_url": f"/api/export_pdf/{job_id}",
+            "download_url": f"/api/export_pdf/{job_id}/download"
+        }), 202
     except Exception as e:
-        return jsonify({"error": f"Failed to generate PDF: {str(e)}"}), 500
+        return jsonify({"error": f"Failed to queue PDF export: {str(e)}"}), 500
+
+@app.route('/api/export_pdf/<job_id>', methods=['GET'])
+def export_pdf_status(job_id):
+    job = render_service.get(job_id)
+    if job is None:
+        return jsonify({"error": "Unknown export job"}), 404
+    job.pop('pdf', None)
+    return jsonify(job)
+
+@app.route('/api/export_pdf/<job_id>/download', methods=['GET'])
+def export_pdf_download(job_id):
+    job = render_service.get(job_id)
+    if job is None:
+        return jsonify({"error": "Unknown export job"}), 404
+    if job['status'] != 'done':
+        return jsonify({"error": "PDF not ready", "status": job['status']}), 409
+    return send_file(BytesIO(job['pdf']), mimetype='application/pdf', as_attachment=True,
+                     download_name="InsightDash_Dashboard.pdf")
 
 # ... (rest of your existing app.py code)
 
 if __name__ == '__main__':
     with app.app_context():
         db.create_all()
-    socketio.run(app, debug=True, host='0.0.0.0', port=5000)
+    render_service.start()
+    # The reloader would start a second render worker from its watcher process
+    socketio.run(app, debug=True, use_reloader=False, host='0.0.0.0', port=5000)
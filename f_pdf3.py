@@ -1,10 +1,9 @@
 from flask import Flask, send_file, jsonify
-from pdf_exporter import PDFExporter
-import threading
-import os
+from render_service import RenderService
+from io import BytesIO
 
 app = Flask(__name__)
-output_path = "static/InsightDash_Dashboard.pdf"
+render_service = RenderService()
 
 @app.route("/generate_pdf", methods=["GET"])
 def generate_pdf():
@@ -13,21 +12,22 @@ def generate_pdf():
         ("http://127.0.0.1:5000/productivity", "Productivity Dashboard")
     ]
 
-    def run_export():
-        exporter = PDFExporter(urls, output_path)
-        exporter.start()
+    # Each job keeps its own document, so concurrent requests no longer overwrite each other
+    job_id = render_service.submit(urls)
 
-    thread = threading.Thread(target=run_export)
-    thread.start()
+    return jsonify({"message": "PDF generation started", "job_id": job_id, "download": f"/download_pdf/{job_id}"})
 
-    return jsonify({"message": "PDF generation started", "download": "/download_pdf"})
-
-@app.route("/download_pdf", methods=["GET"])
-def download_pdf():
-    if os.path.exists(output_path):
-        return send_file(output_path, as_attachment=True)
+@app.route("/download_pdf/<job_id>", methods=["GET"])
+def download_pdf(job_id):
+    job = render_service.get(job_id)
+    if job is None:
+        return jsonify({"error": "Unknown export job"}), 404
+    if job["status"] == "done":
+        return send_file(BytesIO(job["pdf"]), mimetype="application/pdf", as_attachment=True,
+                         download_name="InsightDash_Dashboard.pdf")
     else:
-        return jsonify({"error": "PDF not ready"}), 404
+        return jsonify({"error": "PDF not ready", "status": job["status"]}), 404
 
 if __name__ == "__main__":
+    render_service.start()
     app.run(host="0.0.0.0", port=5000)
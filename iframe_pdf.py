@@ -3,14 +3,17 @@ from PyQt5.QtWidgets import QApplication
 from PyQt5.QtWebEngineWidgets import QWebEnginePage, QWebEngineView
 from PyQt5.QtCore import QUrl, QTimer, QMarginsF, QSize
 from PyQt5.QtGui import QPageSize, QPageLayout
-import os
-from PyPDF2 import PdfMerger
 import time
+from render_signal import RENDER_SIGNAL_SCRIPT, install_export_mode, parse_render_signal
+from pdf_exporter import merge_pdf_pages
+from vendor_assets import install_vendor_assets
 
 
 class PDFExporter:
     def __init__(self, urls, output_file="InsightDash_Dashboard.pdf"):
         self.app = QApplication(sys.argv)
+        install_vendor_assets()  # CDN scripts are served from static/vendor in memory
+        install_export_mode()  # dashboard.js draws final state, no transitions
         self.urls = urls
         self.output_file = output_file
         self.current = 0
@@ -22,6 +25,13 @@ class PDFExporter:
         self.view.show()  # Show browser for debugging
         self.pdf_data = []
         self.page.loadFinished.connect(self.handle_load_finished)
+        self.page.titleChanged.connect(self.handle_title_changed)
+        # Hard fallback only; printing normally starts on dashboard.js's render signal
+        self.render_timeout_ms = 60000
+        self.waiting_for_render = False
+        self.render_timer = QTimer()
+        self.render_timer.setSingleShot(True)
+        self.render_timer.timeout.connect(self.handle_render_timeout)
         self.page_layout = QPageLayout(
             QPageSize(QPageSize.Tabloid), QPageLayout.Landscape, QMarginsF(5, 5, 5, 5)
         )
@@ -185,10 +195,37 @@ class PDFExporter:
     });
 })();
 """
-        self.page.runJavaScript(
-            inject_script,
-            lambda _: QTimer.singleShot(60000, self.check_charts_rendered)
+        self.page.runJavaScript(inject_script, self.wait_for_render_signal)
+
+    def wait_for_render_signal(self, _=None):
+        self.waiting_for_render = True
+        self.render_started = time.monotonic()
+        self.render_timer.start(self.render_timeout_ms)
+        self.page.runJavaScript(RENDER_SIGNAL_SCRIPT)
+
+    def handle_title_changed(self, title):
+        report = parse_render_signal(title)
+        if report is None or not self.waiting_for_render:
+            return
+        self.waiting_for_render = False
+        self.render_timer.stop()
+        elapsed = time.monotonic() - self.render_started
+        if report["missing"]:
+            print(
+                f"Render signal for {self.urls[self.current][1]} after {elapsed:.1f}s, missing charts: {', '.join(report['missing'])}. Exporting page as-is."
+            )
+        else:
+            print(f"Charts rendered for {self.urls[self.current][1]} in {elapsed:.1f}s")
+        self.export_pdf(None)
+
+    def handle_render_timeout(self):
+        if not self.waiting_for_render:
+            return
+        self.waiting_for_render = False
+        print(
+            f"No render signal for {self.urls[self.current][1]} after {self.render_timeout_ms} ms, falling back to DOM check"
         )
+        self.check_charts_rendered()
 
     def check_charts_rendered(self):
         js_check = """
@@ -264,14 +301,11 @@ class PDFExporter:
         ]
 
         if self.iframe_index >= len(iframe_configs):
-            self.iframe_index = 0
-            self.current += 1
-            QTimer.singleShot(2000, self.load_next)
+            self.next_page()
             return
 
         config = iframe_configs[self.iframe_index]
-        filename = f"page_{self.current}_{self.iframe_index}.pdf"
-        print(f"Exporting iframe {config['name']} to {filename}")
+        print(f"Printing iframe {config['name']}")
 
         js_set_layout = """
         (function() {
@@ -330,48 +364,37 @@ class PDFExporter:
         """ % {'id': config['id'], 'path': config['path']}
 
         self.page.runJavaScript(
-            js_set_layout, lambda _: self.page.printToPdf(filename, self.page_layout)
+            js_set_layout,
+            lambda _: self.page.printToPdf(
+                lambda pdf_bytes: self.handle_page_printed(pdf_bytes, lambda: self.export_pdf(iframe_results)),
+                self.page_layout,
+            ),
         )
-        self.pdf_data.append(filename)
         self.iframe_index += 1
-        QTimer.singleShot(2000, lambda: self.export_pdf(iframe_results))
 
-    def combine_pdf(self):
-        merger = PdfMerger()
-        for i, temp_file in enumerate(self.pdf_data):
-            if temp_file and os.path.exists(temp_file):
-                print(f"Adding {temp_file} to final PDF")
-                merger.append(temp_file)
-            else:
-                print(f"Skipping page {i} due to load or render failure")
+    def next_page(self):
+        self.iframe_index = 0
+        self.current += 1
+        self.load_next()
 
-        if merger.pages:
-            merger.write(self.output_file)
+    def handle_page_printed(self, pdf_bytes, next_step):
+        page_bytes = bytes(pdf_bytes)
+        if not page_bytes:
+            print(f"Printing failed for {self.urls[self.current][1]}")
+        self.pdf_data.append(page_bytes or None)
+        next_step()
+
+    def combine_pdf(self):
+        pdf_bytes = merge_pdf_pages(self.pdf_data)
+        if pdf_bytes:
+            with open(self.output_file, "wb") as f:
+                f.write(pdf_bytes)
             print(f"Combined PDF saved as {self.output_file}")
         else:
             print("No pages were successfully rendered. PDF not created.")
 
-        merger.close()
         self.page.triggerAction(QWebEnginePage.Stop)
         self.view.close()
-        time.sleep(5)
-
-        for temp_file in self.pdf_data:
-            if temp_file and os.path.exists(temp_file):
-                for attempt in range(5):
-                    try:
-                        os.remove(temp_file)
-                        print(f"Deleted temporary file {temp_file}")
-                        break
-                    except Exception as e:
-                        print(
-                            f"Failed to delete temporary file {temp_file} (attempt {attempt + 1}/5): {e}"
-                        )
-                        time.sleep(3)
-                    if attempt == 4:
-                        print(
-                            f"Max deletion attempts reached for {temp_file}, leaving file intact"
-                        )
 
 
 if __name__ == "__main__":
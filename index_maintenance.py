@@ -0,0 +1,296 @@
+import contextlib
+import time
+
+import oracledb
+
+# Index and key-constraint handling around bulk loads. Loading a table with its indexes in place
+# pays index maintenance on every row; taking them offline first and rebuilding once at the end
+# (PARALLEL n, NOLOGGING) turns that into a few sorted builds. Non-unique indexes are marked
+# UNUSABLE (sessions skip them, skip_unusable_indexes defaults to TRUE) and rebuilt; unique
+# indexes cannot be skipped by DML, so they, and the indexes behind primary/unique keys, are
+# dropped and recreated from their captured columns before the keys are enabled again. Foreign
+# keys on the table and those referencing its keys are disabled for the load and re-enabled after.
+# Indexes it cannot rebuild this way (domain, global partitioned, unique function-based, IOT) stay
+# in place and are listed.
+REBUILDABLE_INDEX_TYPES = ("NORMAL", "NORMAL/REV", "BITMAP", "FUNCTION-BASED NORMAL", "FUNCTION-BASED BITMAP")
+
+
+def _split_owner(table, default_owner):
+    owner, _, name = table.rpartition(".")
+    return (owner or default_owner).upper(), name.upper()
+
+
+class IndexRebuild:
+    """The indexes and key constraints of one table, taken offline for a load and rebuilt after it.
+
+    degree:   PARALLEL degree of the rebuilds; each index gets its original degree and logging back
+    validate: re-enable constraints with VALIDATE (checks the loaded rows) or NOVALIDATE
+    """
+
+    def __init__(self, conn, table, degree=4, validate=True):
+        self.conn = conn
+        self.owner, self.name = _split_owner(table, conn.username)
+        self.table = f"{self.owner}.{self.name}"
+        self.degree = degree
+        self.validate = validate
+        self.unusable = []        # non-unique indexes: UNUSABLE, then REBUILD
+        self.recreate = []        # unique indexes, and indexes behind keys: DROP, then CREATE
+        self.keys = []            # enabled primary/unique key constraints
+        self.foreign_keys = []    # enabled foreign keys on the table and referencing its keys
+        self.kept = []            # indexes left as they are, with the reason
+        self.timings = {}
+        # what disable() actually took offline, so a rebuild after a partial disable restores only that
+        self.disabled_foreign_keys = []
+        self.disabled_keys = []
+        self.dropped = []
+        self.made_unusable = []
+
+    def _query(self, sql, **binds):
+        cursor = self.conn.cursor()
+        cursor.execute(sql, binds)
+        rows = cursor.fetchall()
+        cursor.close()
+        return rows
+
+    def _execute(self, sql):
+        cursor = self.conn.cursor()
+        try:
+            cursor.execute(sql)
+        finally:
+            cursor.close()
+
+    @classmethod
+    def capture(cls, conn, table, degree=4, validate=True):
+        """Read the table's index and constraint definitions from the data dictionary."""
+        started = time.monotonic()
+        rebuild = cls(conn, table, degree, validate)
+        owner, name = rebuild.owner, rebuild.name
+        key_indexes = {}
+        for constraint, index_owner, index_name in rebuild._query("""
+            SELECT constraint_name, index_owner, index_name
+            FROM all_constraints
+            WHERE owner = :owner AND table_name = :name AND constraint_type IN ('P', 'U') AND status = 'ENABLED'
+        """, owner=owner, name=name):
+            rebuild.keys.append(constraint)
+            if index_name:
+                key_indexes[(index_owner or owner, index_name)] = constraint
+        foreign_keys = rebuild._query("""
+            SELECT owner, table_name, constraint_name, r_owner, r_constraint_name
+            FROM all_constraints
+            WHERE constraint_type = 'R' AND status = 'ENABLED'
+              AND ((owner = :owner AND table_name = :name)
+                   OR (r_owner = :owner AND r_constraint_name IN (
+                          SELECT constraint_name FROM all_constraints
+                          WHERE owner = :owner AND table_name = :name AND constraint_type IN ('P', 'U'))))
+        """, owner=owner, name=name)
+
+        columns = {}
+        for index_owner, index_name, column, descend in rebuild._query("""
+            SELECT index_owner, index_name, column_name, descend
+            FROM all_ind_columns
+            WHERE table_owner = :owner AND table_name = :name
+            ORDER BY index_owner, index_name, column_position
+        """, owner=owner, name=name):
+            columns.setdefault((index_owner, index_name), []).append(f'"{column}"{" DESC" if descend == "DESC" else ""}')
+        for index in rebuild._query("""
+            SELECT i.owner, i.index_name, i.index_type, i.uniqueness, i.partitioned, i.tablespace_name,
+                   TRIM(i.degree), i.logging, p.locality, p.subpartitioning_type, t.iot_type
+            FROM all_indexes i
+            JOIN all_tables t ON t.owner = i.table_owner AND t.table_name = i.table_name
+            LEFT JOIN all_part_indexes p ON p.owner = i.owner AND p.index_name = i.index_name
+            WHERE i.table_owner = :owner AND i.table_name = :name AND i.index_type <> 'LOB'
+        """, owner=owner, name=name):
+            (index_owner, index_name, index_type, uniqueness, partitioned, tablespace,
+             degree_was, logging, locality, subpartitioning, iot_type) = index
+            spec = {
+                "name": f"{index_owner}.{index_name}",
+                "type": index_type,
+                "unique": uniqueness == "UNIQUE",
+                "local": partitioned == "YES",
+                "tablespace": tablespace,
+                "degree": degree_was,
+                "logging": logging,
+                "columns": columns.get((index_owner, index_name), []),
+                "constraint": key_indexes.get((index_owner, index_name)),
+                "partitions": []
+            }
+            reason = None
+            if iot_type:
+                reason = "index-organized table"
+            elif index_type not in REBUILDABLE_INDEX_TYPES:
+                reason = f"{index_type.lower()} index"
+            elif partitioned == "YES" and locality != "LOCAL":
+                reason = "global partitioned index"
+            elif partitioned == "YES" and subpartitioning not in (None, "NONE"):
+                reason = "subpartitioned index"
+            elif (spec["unique"] or spec["constraint"]) and index_type.startswith("FUNCTION-BASED"):
+                reason = "unique function-based index"
+            if reason:
+                rebuild.kept.append((spec["name"], reason))
+                if spec["constraint"]:
+                    rebuild.keys.remove(spec["constraint"])  # its key must stay enabled with it
+            elif spec["unique"] or spec["constraint"]:
+                rebuild.recreate.append(spec)
+            else:
+                if spec["local"]:
+                    spec["partitions"] = [row[0] for row in rebuild._query(
+                        "SELECT partition_name FROM all_ind_partitions WHERE index_owner = :owner AND index_name = :name",
+                        owner=index_owner, name=index_name
+                    )]
+                rebuild.unusable.append(spec)
+        # The table's own foreign keys, and those of other tables that reference a key being disabled
+        rebuild.foreign_keys = [
+            (f"{fk_owner}.{fk_table}", constraint)
+            for fk_owner, fk_table, constraint, r_owner, r_constraint in foreign_keys
+            if (fk_owner, fk_table) == (owner, name) or (r_owner == owner and r_constraint in rebuild.keys)
+        ]
+        rebuild.timings["capture"] = time.monotonic() - started
+        return rebuild
+
+    def describe(self):
+        return (
+            f"{len(self.unusable)} index(es) to rebuild, {len(self.recreate)} to recreate, "
+            f"{len(self.keys)} key(s) and {len(self.foreign_keys)} foreign key(s) to re-enable, "
+            f"PARALLEL {self.degree} NOLOGGING"
+            + (f"; kept: {', '.join(f'{name} ({reason})' for name, reason in self.kept)}" if self.kept else "")
+        )
+
+    @property
+    def offline(self):
+        return bool(self.disabled_foreign_keys or self.disabled_keys or self.dropped or self.made_unusable)
+
+    def disable(self):
+        """Take foreign keys, keys and indexes offline before the load, recording each step done."""
+        started = time.monotonic()
+        for table, constraint in self.foreign_keys:
+            self._execute(f"ALTER TABLE {table} DISABLE CONSTRAINT {constraint}")
+            self.disabled_foreign_keys.append((table, constraint))
+        for constraint in self.keys:
+            self._execute(f"ALTER TABLE {self.table} DISABLE CONSTRAINT {constraint}")  # drops a key-owned index
+            self.disabled_keys.append(constraint)
+        for spec in self.recreate:
+            try:
+                self._execute(f"DROP INDEX {spec['name']}")
+            except oracledb.DatabaseError as e:
+                if e.args[0].code != 1418:  # ORA-01418: already dropped with its constraint
+                    raise
+            self.dropped.append(spec)
+        for spec in self.unusable:
+            self._execute(f"ALTER INDEX {spec['name']} UNUSABLE")
+            self.made_unusable.append(spec)
+        self.timings["disable"] = time.monotonic() - started
+        print(f"[{self.table}] Indexes offline for the load ({self.timings['disable']:.1f}s): {self.describe()}")
+
+    @staticmethod
+    def _attributes_sql(spec):
+        degree = spec["degree"]
+        parallel = "NOPARALLEL" if degree in (None, "1") else ("PARALLEL" if degree == "DEFAULT" else f"PARALLEL {degree}")
+        return f"ALTER INDEX {spec['name']} {parallel}{' LOGGING' if spec['logging'] == 'YES' else ''}"
+
+    def rebuild(self):
+        """Rebuild and recreate the indexes, then re-enable the keys and foreign keys.
+
+        Only what disable() took offline is restored, so this is also safe after a disable()
+        that failed part way. Every step is attempted; failures (e.g. duplicate keys loaded) are
+        collected and raised together so nothing is silently left offline.
+        """
+        if not self.offline:
+            return
+        started = time.monotonic()
+        errors = []
+
+        def step(label, sql, present=()):
+            step_started = time.monotonic()
+            try:
+                self._execute(sql)
+            except oracledb.DatabaseError as e:
+                if e.args[0].code in present:
+                    return True  # the object is still in place
+                errors.append(f"{label}: {e}")
+                return False
+            self.timings[label] = time.monotonic() - step_started
+            return True
+
+        options = f"PARALLEL {self.degree} NOLOGGING"
+        for spec in self.made_unusable:
+            if spec["partitions"]:
+                ok = all([
+                    step(f"rebuild {spec['name']}:{partition}",
+                         f"ALTER INDEX {spec['name']} REBUILD PARTITION {partition} {options}")
+                    for partition in spec["partitions"]
+                ])
+            else:
+                ok = step(f"rebuild {spec['name']}", f"ALTER INDEX {spec['name']} REBUILD {options}")
+            if ok:
+                step(f"attributes {spec['name']}", self._attributes_sql(spec))
+        # A disabled key may have taken its index with it before the DROP INDEX step was reached
+        recreate = [spec for spec in self.recreate if spec in self.dropped or spec["constraint"] in self.disabled_keys]
+        for spec in recreate:
+            kind = "UNIQUE " if spec["unique"] else ("BITMAP " if spec["type"] == "BITMAP" else "")
+            sql = (
+                f"CREATE {kind}INDEX {spec['name']} ON {self.table} ({', '.join(spec['columns'])})"
+                f"{' REVERSE' if spec['type'] == 'NORMAL/REV' else ''}{' LOCAL' if spec['local'] else ''}"
+            )
+            if spec["tablespace"] and not spec["local"]:
+                sql += f" TABLESPACE {spec['tablespace']}"
+            # ORA-00955 / ORA-01408: the index (or one on the same columns) was never dropped
+            if step(f"create {spec['name']}", f"{sql} {options}", present=(955, 1408)):
+                step(f"attributes {spec['name']}", self._attributes_sql(spec))
+        index_for = {spec["constraint"]: spec["name"] for spec in self.recreate if spec["constraint"]}
+        validate = "VALIDATE" if self.validate else "NOVALIDATE"
+        for constraint in self.disabled_keys:
+            using = f" USING INDEX {index_for[constraint]}" if constraint in index_for else ""
+            step(f"enable {constraint}", f"ALTER TABLE {self.table} ENABLE {validate} CONSTRAINT {constraint}{using}")
+        for table, constraint in self.disabled_foreign_keys:
+            step(f"enable {constraint}", f"ALTER TABLE {table} ENABLE {validate} CONSTRAINT {constraint}")
+        rebuilt = bool(self.made_unusable or recreate)
+        self.disabled_foreign_keys, self.disabled_keys, self.dropped, self.made_unusable = [], [], [], []
+        self.timings["rebuild"] = time.monotonic() - started
+
+        print(f"[{self.table}] Indexes and constraints rebuilt in {self.timings['rebuild']:.1f}s")
+        for label, seconds in self.timings.items():
+            if label not in ("capture", "disable", "load", "rebuild") and not label.startswith("attributes "):
+                print(f"   [{self.table}] {label}: {seconds:.1f}s")
+        if rebuilt:
+            print(f"⚠️ [{self.table}] Indexes were built NOLOGGING; take a backup before relying on media recovery")
+        if errors:
+            raise RuntimeError(f"Rebuilding indexes/constraints of {self.table} failed: {'; '.join(errors)}")
+
+    def summary(self, load_seconds=None):
+        """Phase timings: capture, disable, the load in between (when given or timed by offline_indexes) and rebuild."""
+        phases = [("capture", self.timings.get("capture", 0)), ("disable", self.timings.get("disable", 0))]
+        load_seconds = self.timings.get("load") if load_seconds is None else load_seconds
+        if load_seconds is not None:
+            phases.append(("load", load_seconds))
+        phases.append(("rebuild", self.timings.get("rebuild", 0)))
+        return ", ".join(f"{phase} {seconds:.1f}s" for phase, seconds in phases)
+
+
+@contextlib.contextmanager
+def offline_indexes(conn, table, degree, validate=True):
+    """Take table's indexes and keys offline for the with-block and rebuild them after it.
+
+    Yields the IndexRebuild, or None when degree is not set. The rebuild also runs when disable()
+    or the block fails; a rebuild error then is printed rather than raised, so the load's own
+    error is the one that propagates.
+    """
+    if not degree:
+        yield None
+        return
+    rebuild = IndexRebuild.capture(conn, table, degree, validate)
+    load_started = None
+    try:
+        rebuild.disable()
+        load_started = time.monotonic()
+        yield rebuild
+    except BaseException:
+        if load_started is not None:
+            rebuild.timings["load"] = time.monotonic() - load_started
+        try:
+            rebuild.rebuild()
+        except (RuntimeError, oracledb.DatabaseError) as e:
+            print(f"❌ [{rebuild.table}] Restoring indexes after the failed load also failed: {e}")
+        raise
+    rebuild.timings["load"] = time.monotonic() - load_started
+    rebuild.rebuild()
+    print(f"[{rebuild.table}] Phases: {rebuild.summary()}")
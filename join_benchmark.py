@@ -0,0 +1,143 @@
+import multiprocessing
+import resource
+import sys
+import time
+
+import oracledb
+
+from batch_sizing import AdaptiveBatchSizer, sample_source
+from excel_lookup import ExcelLookup, StreamingHashJoin
+
+# Compares the two Excel-join transfer paths on the same rows: "rows" fetches tuples, probes
+# StreamingHashJoin and binds Python rows; "arrow" fetches Arrow batches, joins them with
+# ArrowHashJoin and binds the tables column-wise. Each path runs in a fresh process, so its peak
+# RSS above the point where the sheet is loaded is its own, and inserts into a scratch copy of the
+# destination with a commit per batch.
+JOIN_PATHS = ("rows", "arrow")
+
+
+def _peak_rss_mb():
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024  # KiB on Linux
+
+
+def _run_path(path, src_config, dst_config, excel_path, excel_key, source_sql, join_key, how, batch_rows, table):
+    lookup = ExcelLookup.load(excel_path, key_columns=excel_key)
+    src_conn = oracledb.connect(**src_config)
+    dst_conn = oracledb.connect(**dst_config)
+    description, _ = sample_source(src_conn, source_sql, rows=1)
+    columns = [d[0] for d in description]
+    baseline = _peak_rss_mb()
+    started = time.monotonic()
+
+    src_cursor = src_conn.cursor()
+    if path == "arrow":
+        from arrow_batches import ArrowHashJoin, fetch_arrow_batches
+        join = ArrowHashJoin(lookup, excel_key, columns, join_key, how=how)
+        batches = fetch_arrow_batches(src_conn, source_sql, batch_rows)
+    else:
+        join = StreamingHashJoin(lookup, excel_key, columns, join_key, how=how)
+        src_cursor.arraysize = batch_rows
+        src_cursor.prefetchrows = batch_rows + 1
+        src_cursor.execute(source_sql)
+        batches = iter(lambda: src_cursor.fetchmany(batch_rows), [])
+
+    insert_sql = (
+        f"INSERT INTO {table} ({', '.join(join.columns)}) "
+        f"VALUES ({', '.join(f':{i+1}' for i in range(len(join.columns)))})"
+    )
+    dst_cursor = dst_conn.cursor()
+    rows_out = 0
+    for rows in batches:
+        joined = join.probe(rows)
+        if len(joined):
+            dst_cursor.executemany(insert_sql, joined)
+            dst_conn.commit()
+        rows_out += len(joined)
+    unmatched = join.unmatched_right()
+    for start in range(0, len(unmatched), batch_rows):
+        dst_cursor.executemany(insert_sql, unmatched[start:start + batch_rows])
+    dst_conn.commit()
+    rows_out += len(unmatched)
+    seconds = time.monotonic() - started
+
+    src_cursor.close()
+    dst_cursor.close()
+    src_conn.close()
+    dst_conn.close()
+    return {
+        "path": path,
+        "rows_in": join.probed,
+        "rows_out": rows_out,
+        "seconds": seconds,
+        "rows_per_s": join.probed / seconds if seconds else 0,
+        "peak_mb": _peak_rss_mb() - baseline
+    }
+
+
+def benchmark_excel_join(src_config, dst_config, excel_path, excel_key, src_table, join_key, template_table,
+                         how="inner", rows=200_000, batch_size=None, paths=None):
+    """
+    Join the first `rows` rows of src_table with the sheet on each path; report rows/sec and peak memory.
+
+    template_table: destination table whose structure the scratch tables copy (it is not written)
+    batch_size:     rows per batch, default sized once from the byte budget so both paths match
+    paths:          names from JOIN_PATHS, default both
+    """
+    paths = paths or list(JOIN_PATHS)
+    source_sql = f"SELECT * FROM {src_table} WHERE ROWNUM <= {int(rows)}"
+    ExcelLookup.load(excel_path, key_columns=excel_key)  # parse and cache once, outside the timings
+
+    src_conn = oracledb.connect(**src_config)
+    batch_rows = AdaptiveBatchSizer.for_source(src_conn, source_sql, batch_size, label=src_table).rows
+    src_conn.close()
+    print(f"Benchmarking {len(paths)} join path(s) on up to {rows} rows of {src_table}, {batch_rows} rows per batch")
+
+    owner, _, name = template_table.rpartition(".")
+    dst_conn = oracledb.connect(**dst_config)
+    cursor = dst_conn.cursor()
+    results = []
+    context = multiprocessing.get_context("spawn")  # a fresh interpreter per path for a clean peak RSS
+    for i, path in enumerate(paths, start=1):
+        if path not in JOIN_PATHS:
+            raise ValueError(f"Unknown join path: {path} (choose from {', '.join(JOIN_PATHS)})")
+        scratch = f"{owner + '.' if owner else ''}{name[:22]}_JB{i}"
+        try:
+            cursor.execute(f"DROP TABLE {scratch} PURGE")
+        except oracledb.DatabaseError:
+            pass
+        cursor.execute(f"CREATE TABLE {scratch} AS SELECT * FROM {template_table} WHERE 1 = 0")
+        try:
+            with context.Pool(1) as pool:
+                results.append(pool.apply(_run_path, (
+                    path, src_config, dst_config, excel_path, excel_key, source_sql, join_key, how, batch_rows, scratch
+                )))
+        finally:
+            cursor.execute(f"DROP TABLE {scratch} PURGE")
+    cursor.close()
+    dst_conn.close()
+
+    print(f"{'path':<8}{'rows in':>10}{'rows out':>10}{'seconds':>10}{'rows/s':>12}{'peak MB':>10}")
+    for r in results:
+        print(f"{r['path']:<8}{r['rows_in']:>10}{r['rows_out']:>10}{r['seconds']:>10.2f}"
+              f"{r['rows_per_s']:>12,.0f}{r['peak_mb']:>10.1f}")
+    return results
+
+
+if __name__ == "__main__":
+    # python join_benchmark.py SRC_TABLE JOIN_KEY EXCEL_PATH EXCEL_KEY TEMPLATE_TABLE [how] [rows]
+    src_config = {
+        "user": "src_user",
+        "password": "src_pass",
+        "dsn": "src_host:1521/src_service"
+    }
+
+    dst_config = {
+        "user": "dst_user",
+        "password": "dst_pass",
+        "dsn": "dst_host:1521/dst_service"
+    }
+
+    src_table, join_key, excel_path, excel_key, template_table = sys.argv[1:6]
+    how = sys.argv[6] if len(sys.argv) > 6 else "inner"
+    rows = int(sys.argv[7]) if len(sys.argv) > 7 else 200_000
+    benchmark_excel_join(src_config, dst_config, excel_path, excel_key, src_table, join_key, template_table, how, rows)
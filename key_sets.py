@@ -0,0 +1,162 @@
+import itertools
+
+import oracledb
+
+# Key sets carried from one database into another, for "aggregate in B excluding (or only) the
+# keys found in A". Generating one "SELECT :n FROM dual UNION ALL" row per key gives a statement
+# whose text changes with the key count, so it is hard-parsed every run and stops working past
+# the bind limit. Here the keys are streamed from A in chunks and array-bound into a global
+# temporary table on B (or, for small sets, bound as one SYS.ODCI*LIST collection), and the
+# aggregate refers to them by a fixed subquery, so its text never changes and B parses it once.
+KEY_SET_CHUNK_ROWS = 50_000
+KEY_SET_PLACEHOLDER = "__EXCLUDED_IDS_CTE__"
+COLLECTION_MAX_KEYS = 32767  # the SYS.ODCI*LIST types are VARRAY(32767)
+
+# key kind -> (temporary table, column type, bind type, collection type)
+KEY_KINDS = {
+    "number": ("KEYSET_NUMBER", "NUMBER", oracledb.DB_TYPE_NUMBER, "SYS.ODCINUMBERLIST"),
+    "string": ("KEYSET_STRING", "VARCHAR2(4000)", 4000, "SYS.ODCIVARCHAR2LIST"),
+    "date": ("KEYSET_DATE", "TIMESTAMP", oracledb.DB_TYPE_TIMESTAMP, "SYS.ODCIDATELIST"),
+}
+
+
+def key_kind(type_code):
+    """KEY_KINDS entry for a cursor.description type code."""
+    if type_code in (oracledb.DB_TYPE_NUMBER, oracledb.DB_TYPE_BINARY_DOUBLE,
+                     oracledb.DB_TYPE_BINARY_FLOAT, oracledb.DB_TYPE_BINARY_INTEGER):
+        return "number"
+    if type_code in (oracledb.DB_TYPE_DATE, oracledb.DB_TYPE_TIMESTAMP,
+                     oracledb.DB_TYPE_TIMESTAMP_TZ, oracledb.DB_TYPE_TIMESTAMP_LTZ):
+        return "date"
+    return "string"
+
+
+def stream_keys(conn, key_sql, parameters=None, chunk_rows=KEY_SET_CHUNK_ROWS):
+    """(kind, iterator of key lists) for the first column of key_sql; NULL keys are dropped."""
+    cursor = conn.cursor()
+    cursor.arraysize = chunk_rows
+    cursor.prefetchrows = chunk_rows + 1
+    cursor.execute(key_sql, parameters or {})
+
+    def chunks():
+        try:
+            while True:
+                rows = cursor.fetchmany(chunk_rows)
+                if not rows:
+                    break
+                yield [row[0] for row in rows if row[0] is not None]  # one NULL would empty NOT IN
+        finally:
+            cursor.close()
+
+    return key_kind(cursor.description[0][1]), chunks()
+
+
+class TempTableKeySet:
+    """Keys in a global temporary table (ON COMMIT PRESERVE ROWS) on the target connection.
+
+    The table is created once per key kind and left in place; each session sees only its own
+    rows, which load() replaces.
+    """
+
+    def __init__(self, conn, kind):
+        self.conn = conn
+        self.kind = kind
+        self.table, self.column_type, self.bind_type, _ = KEY_KINDS[kind]
+        self.binds = {}
+        self.rows = 0
+
+    @property
+    def select_sql(self):
+        return f"SELECT k FROM {self.table}"
+
+    def load(self, chunks):
+        cursor = self.conn.cursor()
+        try:
+            cursor.execute(f"CREATE GLOBAL TEMPORARY TABLE {self.table} (k {self.column_type}) ON COMMIT PRESERVE ROWS")
+        except oracledb.DatabaseError as e:
+            if e.args[0].code != 955:  # ORA-00955: already exists
+                raise
+        cursor.execute(f"DELETE FROM {self.table}")
+        cursor.setinputsizes(self.bind_type)
+        self.rows = 0
+        for keys in chunks:
+            if keys:
+                cursor.executemany(f"INSERT INTO {self.table} (k) VALUES (:1)", [(key,) for key in keys])
+                self.rows += len(keys)
+        self.conn.commit()
+        cursor.close()
+        return self
+
+
+class CollectionKeySet:
+    """Keys bound as one SYS.ODCI*LIST collection: no DDL, but held in memory and at most COLLECTION_MAX_KEYS."""
+
+    def __init__(self, conn, kind):
+        self.conn = conn
+        self.kind = kind
+        self.collection_type = KEY_KINDS[kind][3]
+        self.binds = {}
+        self.rows = 0
+
+    @property
+    def select_sql(self):
+        return "SELECT column_value AS k FROM TABLE(:key_set)"
+
+    def load(self, chunks):
+        keys = [key for chunk in chunks for key in chunk]
+        if len(keys) > COLLECTION_MAX_KEYS:
+            raise ValueError(f"{len(keys)} keys exceed the {self.collection_type} limit of {COLLECTION_MAX_KEYS}")
+        self.binds = {"key_set": self.conn.gettype(self.collection_type).newobject(keys)}
+        self.rows = len(keys)
+        return self
+
+
+def copy_key_set(src_conn, key_sql, dst_conn, parameters=None, collection=False, chunk_rows=KEY_SET_CHUNK_ROWS):
+    """Stream the keys key_sql returns on src_conn into a key set on dst_conn.
+
+    collection: bind the keys as one collection instead of loading a temporary table, for up to
+                COLLECTION_MAX_KEYS keys or where the target schema allows no DDL; larger sets
+                fall back to the temporary table
+    """
+    kind, chunks = stream_keys(src_conn, key_sql, parameters, chunk_rows)
+    if collection:
+        # Read up to one chunk past the limit; only a set that fits is bound as a collection
+        head, total = [], 0
+        for chunk in chunks:
+            head.append(chunk)
+            total += len(chunk)
+            if total > COLLECTION_MAX_KEYS:
+                break
+        if total <= COLLECTION_MAX_KEYS:
+            key_set = CollectionKeySet(dst_conn, kind).load(head)
+        else:
+            print(f"🔑 More than {COLLECTION_MAX_KEYS} keys; loading the temporary table instead of a collection")
+            key_set = TempTableKeySet(dst_conn, kind).load(itertools.chain(head, chunks))
+    else:
+        key_set = TempTableKeySet(dst_conn, kind).load(chunks)
+    print(f"🔑 Copied {key_set.rows} {kind} keys into {type(key_set).__name__}")
+    return key_set
+
+
+def with_key_set(sql, key_set, name="excluded_ids", column="id", placeholder=KEY_SET_PLACEHOLDER):
+    """sql with the placeholder replaced by WITH name AS (the key set, its column called column)."""
+    return sql.replace(placeholder, f"WITH {name} AS (SELECT k AS {column} FROM ({key_set.select_sql}))")
+
+
+def aggregate_with_key_set(conn, table, aggregates, key_column, key_set, exclude=True, where=None, parameters=None):
+    """One row of aggregates over table, skipping (exclude=True) or keeping only rows whose key is in key_set.
+
+    aggregates: SELECT-list expressions, e.g. ["SUM(col1)", "SUM(col2)"]
+    where:      optional extra condition with its binds in parameters
+    """
+    sql = (
+        f"SELECT {', '.join(aggregates)} FROM {table} t "
+        f"WHERE {'NOT ' if exclude else ''}EXISTS (SELECT 1 FROM ({key_set.select_sql}) ks WHERE ks.k = t.{key_column})"
+    )
+    if where:
+        sql += f" AND ({where})"
+    cursor = conn.cursor()
+    cursor.execute(sql, {**key_set.binds, **(parameters or {})})
+    row = cursor.fetchone()
+    cursor.close()
+    return row
@@ -0,0 +1,137 @@
+import sys
+import time
+
+import oracledb
+
+from batch_sizing import AdaptiveBatchSizer
+from load_strategy import LOAD_STRATEGIES, LoadStrategy
+
+# Compares the load strategies on identical data: the rows are fetched from the source once and
+# held in memory, then loaded into a fresh scratch copy of the destination table per strategy, so
+# only the destination side (insert path, commits, redo) differs between runs.
+
+
+def session_redo_bytes(conn):
+    """Redo generated by this session so far, or None without SELECT on V$MYSTAT/V$STATNAME."""
+    cursor = conn.cursor()
+    try:
+        cursor.execute("""
+            SELECT s.value
+            FROM v$mystat s
+            JOIN v$statname n ON n.statistic# = s.statistic#
+            WHERE n.name = 'redo size'
+        """)
+        return cursor.fetchone()[0]
+    except oracledb.DatabaseError:
+        return None
+    finally:
+        cursor.close()
+
+
+def _load(dst_conn, strategy, table, col_names, batches):
+    load_table = strategy.prepare(dst_conn, table)
+    cursor = dst_conn.cursor()
+    committer = strategy.committer(dst_conn)
+    insert_sql = strategy.insert_sql(load_table, col_names)
+    try:
+        for rows in batches:
+            cursor.executemany(insert_sql, rows)
+            committer.batch_done(len(rows))
+        committer.flush()
+        strategy.publish(dst_conn, table, load_table, col_names)
+    except oracledb.DatabaseError:
+        committer.rollback()
+        strategy.abandon(dst_conn, table, load_table)
+        raise
+    finally:
+        cursor.close()
+    return committer.commits
+
+
+def benchmark_load_strategies(src_config, dst_config, src_table, template_table, rows=200_000,
+                              strategies=None, batch_size=None):
+    """
+    Load the first `rows` rows of src_table with each strategy and report rows/sec, commits and redo.
+
+    template_table: destination table whose structure the scratch tables copy (it is not written)
+    strategies:     names from LOAD_STRATEGIES, default all of them
+    batch_size:     rows per batch, default sized once from the byte budget and kept fixed so
+                    every strategy sees the same batches
+    """
+    strategies = strategies or list(LOAD_STRATEGIES)
+    src_conn = oracledb.connect(**src_config)
+    dst_conn = oracledb.connect(**dst_config)
+
+    sizer = AdaptiveBatchSizer.for_source(src_conn, src_table, batch_size, label=src_table)
+    col_names = sizer.columns
+    src_cursor = src_conn.cursor()
+    sizer.tune_cursor(src_cursor)
+    src_cursor.execute(f"SELECT * FROM {src_table} WHERE ROWNUM <= :n", n=rows)
+    batches = []
+    while True:
+        batch = src_cursor.fetchmany(sizer.rows)
+        if not batch:
+            break
+        batches.append(batch)
+    src_cursor.close()
+    src_conn.close()
+    loaded = sum(len(batch) for batch in batches)
+    print(f"Benchmarking {len(strategies)} strategies on {loaded} rows of {src_table} in {len(batches)} batch(es)")
+
+    owner, _, name = template_table.rpartition(".")
+    results = []
+    cursor = dst_conn.cursor()
+    for i, strategy_name in enumerate(strategies, start=1):
+        strategy = LoadStrategy.named(strategy_name)
+        scratch = f"{owner + '.' if owner else ''}{name[:22]}_LB{i}"
+        try:
+            cursor.execute(f"DROP TABLE {scratch} PURGE")
+        except oracledb.DatabaseError:
+            pass
+        cursor.execute(f"CREATE TABLE {scratch} AS SELECT * FROM {template_table} WHERE 1 = 0")
+
+        redo_before = session_redo_bytes(dst_conn)
+        started = time.monotonic()
+        commits = _load(dst_conn, strategy, scratch, col_names, batches)
+        seconds = time.monotonic() - started
+        redo_after = session_redo_bytes(dst_conn)
+
+        cursor.execute(f"SELECT COUNT(*) FROM {scratch}")
+        count = cursor.fetchone()[0]
+        cursor.execute(f"DROP TABLE {scratch} PURGE")
+        results.append({
+            "strategy": strategy_name,
+            "rows": count,
+            "seconds": seconds,
+            "rows_per_s": count / seconds if seconds else 0,
+            "commits": commits,
+            "redo_bytes": redo_after - redo_before if redo_before is not None else None
+        })
+    cursor.close()
+    dst_conn.close()
+
+    print(f"{'strategy':<20}{'rows':>10}{'seconds':>10}{'rows/s':>12}{'commits':>9}{'redo MB':>10}")
+    for r in results:
+        redo = f"{r['redo_bytes'] / 1024 / 1024:.1f}" if r["redo_bytes"] is not None else "n/a"
+        print(f"{r['strategy']:<20}{r['rows']:>10}{r['seconds']:>10.2f}{r['rows_per_s']:>12,.0f}{r['commits']:>9}{redo:>10}")
+    return results
+
+
+if __name__ == "__main__":
+    # python load_benchmark.py SRC_TABLE TEMPLATE_TABLE [rows] [strategy ...]
+    src_config = {
+        "user": "src_user",
+        "password": "src_pass",
+        "dsn": "src_host:1521/src_service"
+    }
+
+    dst_config = {
+        "user": "dst_user",
+        "password": "dst_pass",
+        "dsn": "dst_host:1521/dst_service"
+    }
+
+    src_table = sys.argv[1] if len(sys.argv) > 1 else "ORDERS"
+    template_table = sys.argv[2] if len(sys.argv) > 2 else src_table
+    rows = int(sys.argv[3]) if len(sys.argv) > 3 else 200_000
+    benchmark_load_strategies(src_config, dst_config, src_table, template_table, rows, sys.argv[4:] or None)
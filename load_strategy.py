@@ -0,0 +1,146 @@
+import oracledb
+
+# Load strategies for the transfer scripts. Committing every executemany batch with a conventional
+# INSERT makes big copies redo- and commit-bound; these trade that for fewer commits, direct-path
+# inserts or a NOLOGGING staging table, selected per transfer.
+LOAD_STRATEGIES = {
+    "conventional": {},                                      # INSERT ... VALUES, commit every batch
+    "commit_every_10": {"commit_every": 10},
+    "single_commit": {"commit_every": 0},                    # all-or-nothing per writer
+    "direct_path": {"direct_path": True},                    # APPEND_VALUES
+    "nologging_staging": {"staging": True},                  # APPEND_VALUES into NOLOGGING copy, publish once
+}
+
+
+def staging_table_name(dst_table):
+    owner, _, name = dst_table.rpartition(".")
+    return f"{owner + '.' if owner else ''}{name[:26]}_STG"  # stays within 30-character identifiers
+
+
+def _drop_table(conn, table):
+    cursor = conn.cursor()
+    try:
+        cursor.execute(f"DROP TABLE {table} PURGE")
+    except oracledb.DatabaseError:
+        pass  # ORA-00942: nothing to drop
+    finally:
+        cursor.close()
+
+
+class BatchCommitter:
+    """Commits one connection every N batches (N=0: only on flush) and counts committed rows.
+
+    checkpoint: optional transfer_checkpoint.TableCheckpoint saved around every commit
+    """
+
+    def __init__(self, conn, every, checkpoint=None):
+        self.conn = conn
+        self.every = every
+        self.checkpoint = checkpoint
+        self.pending = 0
+        self.pending_rows = 0
+        self.committed_rows = 0
+        self.commits = 0
+
+    def batch_done(self, rows):
+        self.pending += 1
+        self.pending_rows += rows
+        if self.every and self.pending >= self.every:
+            self.flush()
+
+    def flush(self):
+        if self.pending:
+            if self.checkpoint:
+                self.checkpoint.before_commit(self.conn)
+            self.conn.commit()
+            if self.checkpoint:
+                self.checkpoint.after_commit(self.conn)
+            self.commits += 1
+            self.committed_rows += self.pending_rows
+            self.pending = self.pending_rows = 0
+
+    def rollback(self):
+        """Drop uncommitted batches after a failure; returns how many rows were lost."""
+        lost, self.pending, self.pending_rows = self.pending_rows, 0, 0
+        if self.checkpoint:
+            self.checkpoint.rollback()
+        self.conn.rollback()
+        return lost
+
+
+class LoadStrategy:
+    """How batches are written to the destination: insert path, commit cadence and staging.
+
+    direct_path:  INSERT /*+ APPEND_VALUES */ writes above the high-water mark with minimal undo.
+                  Oracle will not let the session touch the table again before a commit
+                  (ORA-12838), so every batch is committed, and direct-path writers to the same
+                  table queue on its exclusive lock.
+    commit_every: commit every N batches; 0 commits once at the end. Conventional inserts only.
+    staging:      direct-path load into a NOLOGGING copy of the destination, then publish it with
+                  one INSERT /*+ APPEND */ ... SELECT, so readers see all rows or none. Staged rows
+                  are not in the redo stream until published.
+    """
+
+    def __init__(self, direct_path=False, commit_every=1, staging=False):
+        self.staging = staging
+        self.direct_path = direct_path or staging
+        self.commit_every = 1 if self.direct_path else max(0, int(commit_every or 0))
+
+    @classmethod
+    def named(cls, strategy=None):
+        """Accept a LoadStrategy, a LOAD_STRATEGIES name or None (conventional)."""
+        if isinstance(strategy, cls):
+            return strategy
+        if strategy is None:
+            return cls()
+        if strategy not in LOAD_STRATEGIES:
+            raise ValueError(f"Unknown load strategy: {strategy} (choose from {', '.join(LOAD_STRATEGIES)})")
+        return cls(**LOAD_STRATEGIES[strategy])
+
+    def describe(self):
+        if self.staging:
+            return "direct path into NOLOGGING staging, one publish"
+        if self.direct_path:
+            return "direct path (APPEND_VALUES), commit every batch"
+        if self.commit_every == 0:
+            return "conventional, single commit"
+        return f"conventional, commit every {self.commit_every} batch(es)"
+
+    def insert_sql(self, table, col_names):
+        hint = "/*+ APPEND_VALUES */ " if self.direct_path else ""
+        placeholders = ", ".join([f":{i+1}" for i in range(len(col_names))])
+        return f"INSERT {hint}INTO {table} ({', '.join(col_names)}) VALUES ({placeholders})"
+
+    def committer(self, conn, checkpoint=None):
+        return BatchCommitter(conn, self.commit_every, checkpoint)
+
+    def prepare(self, dst_conn, dst_table):
+        """Return the table batches go into: the destination, or a fresh NOLOGGING staging copy."""
+        if not self.staging:
+            return dst_table
+        load_table = staging_table_name(dst_table)
+        _drop_table(dst_conn, load_table)  # leftover from an interrupted run
+        cursor = dst_conn.cursor()
+        cursor.execute(f"CREATE TABLE {load_table} NOLOGGING AS SELECT * FROM {dst_table} WHERE 1 = 0")
+        cursor.close()
+        print(f"📦 Staging into {load_table} (NOLOGGING)")
+        return load_table
+
+    def publish(self, dst_conn, dst_table, load_table, col_names):
+        """Move staged rows into the destination in one transaction and drop the staging table."""
+        if load_table == dst_table:
+            return None
+        columns = ", ".join(col_names)
+        cursor = dst_conn.cursor()
+        cursor.execute(f"INSERT /*+ APPEND */ INTO {dst_table} ({columns}) SELECT {columns} FROM {load_table}")
+        published = cursor.rowcount
+        dst_conn.commit()
+        cursor.close()
+        _drop_table(dst_conn, load_table)
+        print(f"✅ Published {published} staged rows from {load_table} into {dst_table}")
+        return published
+
+    def abandon(self, dst_conn, dst_table, load_table):
+        """After a failed load: drop the staging table; the destination itself is left alone."""
+        if load_table != dst_table:
+            _drop_table(dst_conn, load_table)
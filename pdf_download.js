@@ -1,8 +1,8 @@
-function exportToPDF() {
-    fetch('/api/export_pdf')
+function downloadExportedPDF(downloadUrl) {
+    return fetch(downloadUrl)
         .then(response => {
             if (!response.ok) {
-                throw new Error('Failed to generate PDF');
+                throw new Error('Failed to download PDF');
             }
             return response.blob();
         })
@@ -15,7 +15,80 @@ function exportToPDF() {
             a.click();
             a.remove();
             window.URL.revokeObjectURL(url);
+        });
+}
+
+// Give up on an export that has not finished by then (a stuck or lost job would otherwise poll forever)
+const EXPORT_TIMEOUT_MS = 10 * 60 * 1000;
+
+function waitForExportJob(job) {
+    return new Promise((resolve, reject) => {
+        let socket = null;
+        let pollTimer = null;
+        let timeoutTimer = null;
+        const stop = () => {
+            clearInterval(pollTimer);
+            clearTimeout(timeoutTimer);
+            if (socket) socket.disconnect();
+        };
+        const finish = (status) => {
+            stop();
+            if (status.status === 'done') resolve(job.download_url);
+            else reject(new Error(status.error || 'PDF export failed'));
+        };
+        const fail = (error) => {
+            stop();
+            reject(error);
+        };
+
+        // Progress events arrive over Socket.IO; polling the status endpoint is the fallback
+        if (typeof io !== 'undefined') {
+            socket = io('/exports');
+            socket.on('export_progress', status => {
+                if (status.job_id !== job.job_id) return;
+                console.log(`PDF export ${status.status}: ${status.completed}/${status.total} pages`);
+                if (status.status === 'done' || status.status === 'failed') finish(status);
+            });
+        }
+        pollTimer = setInterval(() => {
+            fetch(job.status_url)
+                .then(response => {
+                    // 404 (unknown or expired job) and 5xx never turn into done/failed: stop here
+                    if (!response.ok) {
+                        throw Object.assign(new Error(`PDF export status check failed (HTTP ${response.status})`), { fatal: true });
+                    }
+                    return response.json();
+                })
+                .then(status => {
+                    if (status.status === 'done' || status.status === 'failed') finish(status);
+                })
+                .catch(error => {
+                    if (error.fatal) fail(error);
+                    else console.warn('PDF export status check failed:', error);  // network blip, retried
+                });
+        }, 2000);
+        timeoutTimer = setTimeout(
+            () => fail(new Error(`PDF export did not finish within ${EXPORT_TIMEOUT_MS / 60000} minutes`)),
+            EXPORT_TIMEOUT_MS
+        );
+    });
+}
+
+function exportToPDF() {
+    // The theme is part of the export cache key, so exports match what the user is looking at
+    fetch('/api/export_pdf', {
+        method: 'POST',
+        headers: { 'Content-Type': 'application/json' },
+        body: JSON.stringify({ theme: localStorage.getItem('theme') || 'light-theme' })
+    })
+        .then(response => {
+            if (!response.ok) {
+                throw new Error('Failed to start PDF export');
+            }
+            return response.json();
         })
+        .then(job => waitForExportJob(job))
+        .then(downloadUrl => downloadExportedPDF(downloadUrl))
         .catch(error => {
             console.error('PDF export failed:', error);
             showNotification('Failed to generate PDF: ' + error.message);
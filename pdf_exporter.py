@@ -2,56 +2,13 @@ from PyQt5.QtWidgets import QApplication
 from PyQt5.QtWebEngineWidgets import QWebEnginePage, QWebEngineView
 from PyQt5.QtCore import QUrl, QTimer, QMarginsF, QSize
 from PyQt5.QtGui import QPageSize, QPageLayout
-import os
+from io import BytesIO
 from PyPDF2 import PdfMerger
 import time
+from render_signal import RENDER_SIGNAL_SCRIPT, install_export_mode, parse_render_signal
+from vendor_assets import install_vendor_assets
 
-class PDFExporter:
-    def __init__(self, urls, output_file="InsightDash_Dashboard.pdf", qt_app=None):
-        self.app = qt_app  # Use provided QApplication instance
-        self.urls = urls
-        self.output_file = output_file
-        self.current = 0
-        self.max_retries = 5
-        self.retry_count = 0
-        self.page = QWebEnginePage()
-        self.view = QWebEngineView()
-        self.view.setPage(self.page)
-        # self.view.show()  # Comment out for headless operation
-        self.pdf_data = []
-        self.page.loadFinished.connect(self.handle_load_finished)
-        self.page_layout = QPageLayout(
-            QPageSize(QPageSize.Tabloid), QPageLayout.Landscape, QMarginsF(5, 5, 5, 5)
-        )
-        self.view.resize(QSize(1920, 1080))
-        # Log JavaScript console messages
-        self.page.javaScriptConsoleMessage = lambda level, msg, line, source: print(
-            f"JS Console [{source}:{line}]: {msg}"
-        )
-
-    def start(self):
-        self.load_next()
-
-    def load_next(self):
-        if self.current < len(self.urls):
-            print(f"Loading: {self.urls[self.current][1]}")
-            self.retry_count = 0
-            self.page.load(QUrl(self.urls[self.current][0]))
-        else:
-            print("Combining pages into single PDF...")
-            self.combine_pdf()
-            print("PDF export complete.")
-            # Do not call self.app.quit() to keep Flask running
-
-    def handle_load_finished(self, ok):
-        if not ok:
-            print(f"Failed to load {self.urls[self.current][0]}")
-            self.pdf_data.append(None)
-            self.current += 1
-            self.load_next()
-            return
-
-        inject_script = """
+INJECT_SCRIPT = """
 (function() {
     window.customDashboard = window.customDashboard || {};
 
@@ -140,12 +97,133 @@ class PDFExporter:
 })();
 """
 
-        self.page.runJavaScript(
-            inject_script,
-            lambda _: QTimer.singleShot(
-                40000, self.check_charts_rendered
+PRINT_LAYOUT_SCRIPT = """
+    document.body.style.height = '1080px';
+    document.documentElement.style.height = '1080px';
+    document.body.style.overflow = 'hidden';
+"""
+
+EXPORT_VIEWPORT = QSize(1920, 1080)
+
+
+def export_page_layout():
+    return QPageLayout(QPageSize(QPageSize.Tabloid), QPageLayout.Landscape, QMarginsF(5, 5, 5, 5))
+
+
+def layout_signature(page_layout):
+    """Print settings that change the rendered pages; part of the export cache key."""
+    margins = page_layout.margins()
+    return "|".join(str(part) for part in (
+        page_layout.pageSize().key(), int(page_layout.orientation()),
+        margins.left(), margins.top(), margins.right(), margins.bottom(),
+        EXPORT_VIEWPORT.width(), EXPORT_VIEWPORT.height(), PRINT_LAYOUT_SCRIPT.strip()
+    ))
+
+
+def merge_pdf_pages(pages):
+    """Merge per-page PDF bytes in order, skipping failed (None) pages; returns bytes or None."""
+    merger = PdfMerger()
+    for i, page_bytes in enumerate(pages):
+        if page_bytes:
+            merger.append(BytesIO(page_bytes))
+        else:
+            print(f"Skipping page {i} due to load or render failure")
+    if not merger.pages:
+        merger.close()
+        return None
+    output = BytesIO()
+    merger.write(output)
+    merger.close()
+    return output.getvalue()
+
+
+class PDFExporter:
+    def __init__(self, urls, output_file="InsightDash_Dashboard.pdf", qt_app=None, finished_callback=None):
+        self.app = qt_app  # Use provided QApplication instance
+        self.urls = urls
+        self.output_file = output_file  # None keeps the document in memory only (self.pdf_bytes)
+        self.finished_callback = finished_callback
+        self.pdf_bytes = None
+        install_vendor_assets()  # CDN scripts are served from static/vendor in memory
+        install_export_mode()  # dashboard.js draws final state, no transitions
+        self.current = 0
+        self.max_retries = 5
+        self.retry_count = 0
+        self.page = QWebEnginePage()
+        self.view = QWebEngineView()
+        self.view.setPage(self.page)
+        # self.view.show()  # Comment out for headless operation
+        self.pdf_data = []
+        self.page.loadFinished.connect(self.handle_load_finished)
+        self.page.titleChanged.connect(self.handle_title_changed)
+        # Hard fallback only; printing normally starts on dashboard.js's render signal
+        self.render_timeout_ms = 40000
+        self.waiting_for_render = False
+        self.render_timer = QTimer()
+        self.render_timer.setSingleShot(True)
+        self.render_timer.timeout.connect(self.handle_render_timeout)
+        self.page_layout = QPageLayout(
+            QPageSize(QPageSize.Tabloid), QPageLayout.Landscape, QMarginsF(5, 5, 5, 5)
+        )
+        self.view.resize(QSize(1920, 1080))
+        # Log JavaScript console messages
+        self.page.javaScriptConsoleMessage = lambda level, msg, line, source: print(
+            f"JS Console [{source}:{line}]: {msg}"
+        )
+
+    def start(self):
+        self.load_next()
+
+    def load_next(self):
+        if self.current < len(self.urls):
+            print(f"Loading: {self.urls[self.current][1]}")
+            self.retry_count = 0
+            self.page.load(QUrl(self.urls[self.current][0]))
+        else:
+            print("Combining pages into single PDF...")
+            self.combine_pdf()
+            print("PDF export complete.")
+            # Do not call self.app.quit() to keep Flask running
+
+    def handle_load_finished(self, ok):
+        if not ok:
+            print(f"Failed to load {self.urls[self.current][0]}")
+            self.pdf_data.append(None)
+            self.current += 1
+            self.load_next()
+            return
+
+        self.page.runJavaScript(INJECT_SCRIPT, self.wait_for_render_signal)
+
+    def wait_for_render_signal(self, _=None):
+        self.waiting_for_render = True
+        self.render_started = time.monotonic()
+        self.render_timer.start(self.render_timeout_ms)
+        self.page.runJavaScript(RENDER_SIGNAL_SCRIPT)
+
+    def handle_title_changed(self, title):
+        report = parse_render_signal(title)
+        if report is None or not self.waiting_for_render:
+            return
+        self.waiting_for_render = False
+        self.render_timer.stop()
+        elapsed = time.monotonic() - self.render_started
+        if report["missing"]:
+            print(
+                f"Render signal for {self.urls[self.current][1]} after {elapsed:.1f}s, missing charts: {', '.join(report['missing'])}. Exporting page as-is."
             )
+        else:
+            print(f"Charts rendered for {self.urls[self.current][1]} in {elapsed:.1f}s")
+        self.export_pdf()
+
+    def handle_render_timeout(self):
+        if not self.waiting_for_render:
+            return
+        self.waiting_for_render = False
+        print(
+            f"No render signal for {self.urls[self.current][1]} after {self.render_timeout_ms} ms, falling back to DOM check"
         )
+        self.check_charts_rendered()
 
     def check_charts_rendered(self):
         js_check = """
@@ -195,52 +273,206 @@ class PDFExporter:
             self.export_pdf()
 
     def export_pdf(self):
-        filename = f"page_{self.current}.pdf"
-        print(f"Exporting to temporary file {filename}")
-        js_set_height = """
-            document.body.style.height = '1080px';
-            document.documentElement.style.height = '1080px';
-            document.body.style.overflow = 'hidden';
-        """
+        print(f"Printing {self.urls[self.current][1]}")
         self.page.runJavaScript(
-            js_set_height, lambda _: self.page.printToPdf(filename, self.page_layout)
+            PRINT_LAYOUT_SCRIPT, lambda _: self.page.printToPdf(self.handle_pdf_printed, self.page_layout)
         )
-        self.pdf_data.append(filename)
+
+    def handle_pdf_printed(self, pdf_bytes):
+        page_bytes = bytes(pdf_bytes)
+        if not page_bytes:
+            print(f"Printing failed for {self.urls[self.current][1]}")
+        self.pdf_data.append(page_bytes or None)
         self.current += 1
-        QTimer.singleShot(2000, self.load_next)
+        self.load_next()
 
     def combine_pdf(self):
-        merger = PdfMerger()
-        for i, temp_file in enumerate(self.pdf_data):
-            if temp_file and os.path.exists(temp_file):
-                print(f"Adding {temp_file} to final PDF")
-                merger.append(temp_file)
-            else:
-                print(f"Skipping page {i} due to load or render failure")
-
-        if merger.pages:
-            merger.write(self.output_file)
+        self.pdf_bytes = merge_pdf_pages(self.pdf_data)
+        if self.pdf_bytes is None:
+            print("No pages were successfully rendered. PDF not created.")
+        elif self.output_file:
+            with open(self.output_file, "wb") as f:
+                f.write(self.pdf_bytes)
             print(f"Combined PDF saved as {self.output_file}")
+        if self.finished_callback:
+            self.finished_callback(self.pdf_bytes)
+
+
+class PageRenderSlot:
+    """One QWebEnginePage of a PooledPDFExporter; renders one URL at a time."""
+
+    def __init__(self, pool, slot_id):
+        self.pool = pool
+        self.slot_id = slot_id
+        self.index = None
+        self.timing = None
+        self.waiting_for_render = False
+        self.page = QWebEnginePage()
+        self.view = QWebEngineView()
+        self.view.setPage(self.page)
+        self.view.resize(EXPORT_VIEWPORT)
+        self.page.loadFinished.connect(self.handle_load_finished)
+        self.page.titleChanged.connect(self.handle_title_changed)
+        self.render_timer = QTimer()
+        self.render_timer.setSingleShot(True)
+        self.render_timer.timeout.connect(self.handle_render_timeout)
+        self.page.javaScriptConsoleMessage = lambda level, msg, line, source: print(
+            f"JS Console [slot {slot_id}] [{source}:{line}]: {msg}"
+        )
+
+    def render(self, index):
+        url, name = self.pool.urls[index]
+        self.index = index
+        self.timing = {"index": index, "name": name, "slot": self.slot_id, "status": "loading"}
+        self.started = self.last_mark = time.monotonic()
+        print(f"[slot {self.slot_id}] Loading: {name}")
+        self.page.load(QUrl(url))
+
+    def _mark(self, phase):
+        now = time.monotonic()
+        self.timing[phase] = round(now - self.last_mark, 2)
+        self.last_mark = now
+
+    def handle_load_finished(self, ok):
+        if self.index is None:
+            return
+        self._mark("load_s")
+        if not ok:
+            print(f"[slot {self.slot_id}] Failed to load {self.pool.urls[self.index][0]}")
+            self._finish(None, "load_failed")
+            return
+        self.page.runJavaScript(INJECT_SCRIPT, self.wait_for_render_signal)
+
+    def wait_for_render_signal(self, _=None):
+        self.waiting_for_render = True
+        self.render_timer.start(self.pool.render_timeout_ms)
+        self.page.runJavaScript(RENDER_SIGNAL_SCRIPT)
+
+    def handle_title_changed(self, title):
+        report = parse_render_signal(title)
+        if report is None or not self.waiting_for_render:
+            return
+        self.render_timer.stop()
+        self._print("rendered" if not report["missing"] else "partial")
+
+    def handle_render_timeout(self):
+        if not self.waiting_for_render:
+            return
+        print(f"[slot {self.slot_id}] No render signal for {self.timing['name']}, exporting page as-is")
+        self._print("render_timeout")
+
+    def _print(self, status):
+        self.waiting_for_render = False
+        self._mark("render_s")
+        self.timing["status"] = status
+        self.page.runJavaScript(
+            PRINT_LAYOUT_SCRIPT, lambda _: self.page.printToPdf(self.handle_pdf_printed, self.pool.page_layout)
+        )
+
+    def handle_pdf_printed(self, pdf_bytes):
+        if self.index is None:
+            return
+        self._mark("print_s")
+        page_bytes = bytes(pdf_bytes)
+        if page_bytes:
+            self._finish(page_bytes, self.timing["status"])
         else:
+            print(f"[slot {self.slot_id}] Printing failed for {self.timing['name']}")
+            self._finish(None, "print_failed")
+
+    def _finish(self, page_bytes, status):
+        index, timing = self.index, self.timing
+        timing["status"] = status
+        timing["total_s"] = round(time.monotonic() - self.started, 2)
+        self.index = None
+        self.pool.page_finished(self, index, page_bytes, timing)
+
+    def close(self):
+        self.render_timer.stop()
+        self.page.triggerAction(QWebEnginePage.Stop)
+        self.view.close()
+
+
+class PooledPDFExporter:
+    """Renders the URL list on a pool of pages in one QApplication and merges in URL order."""
+
+    def __init__(self, urls, output_file="InsightDash_Dashboard.pdf", qt_app=None, pool_size=3,
+                 render_timeout_ms=40000, progress_callback=None, finished_callback=None, theme=None):
+        self.app = qt_app  # Use provided QApplication instance
+        self.urls = urls
+        self.output_file = output_file
+        self.progress_callback = progress_callback
+        self.finished_callback = finished_callback
+        self.pdf_bytes = None
+        self.pool_size = max(1, min(pool_size, len(urls)))
+        self.render_timeout_ms = render_timeout_ms
+        self.theme = theme  # None keeps the theme stored in the profile's localStorage
+        self.page_layout = export_page_layout()
+        self.pdf_data = [None] * len(urls)
+        self.timings = [None] * len(urls)
+        self.slots = []
+        self.next_index = 0
+        self.completed = 0
+
+    def start(self):
+        self.started = time.monotonic()
+        install_vendor_assets()
+        install_export_mode(theme=self.theme)
+        print(f"Rendering {len(self.urls)} pages with a pool of {self.pool_size}")
+        self.slots = [PageRenderSlot(self, slot_id) for slot_id in range(self.pool_size)]
+        for slot in self.slots:
+            self.dispatch(slot)
+
+    def dispatch(self, slot):
+        if self.next_index < len(self.urls):
+            index = self.next_index
+            self.next_index += 1
+            slot.render(index)
+
+    def page_finished(self, slot, index, page_bytes, timing):
+        self.pdf_data[index] = page_bytes
+        self.timings[index] = timing
+        self.completed += 1
+        print(
+            f"[slot {slot.slot_id}] {timing['name']}: {timing['status']} in {timing['total_s']}s "
+            f"({self.completed}/{len(self.urls)})"
+        )
+        if self.progress_callback:
+            self.progress_callback(self.completed, len(self.urls), timing)
+        if self.completed == len(self.urls):
+            self.finish()
+        else:
+            self.dispatch(slot)
+
+    def finish(self):
+        print("Combining pages into single PDF...")
+        self.combine_pdf()
+        for slot in self.slots:
+            slot.close()
+        self.report_timings()
+        print("PDF export complete.")
+        if self.finished_callback:
+            self.finished_callback(self.pdf_bytes, self.timings)
+
+    def combine_pdf(self):
+        self.pdf_bytes = merge_pdf_pages(self.pdf_data)
+        if self.pdf_bytes is None:
             print("No pages were successfully rendered. PDF not created.")
+        elif self.output_file:
+            with open(self.output_file, "wb") as f:
+                f.write(self.pdf_bytes)
+            print(f"Combined PDF saved as {self.output_file}")
 
-        # Improved cleanup
-        for temp_file in self.pdf_data:
-            if temp_file and os.path.exists(temp_file):
-                for attempt in range(5):
-                    try:
-                        self.page.triggerAction(QWebEnginePage.Stop)
-                        time.sleep(2)
-                        os.remove(temp_file)
-                        print(f"Deleted temporary file {temp_file}")
-                        break
-                    except Exception as e:
-                        print(
-                            f"Failed to delete temporary file {temp_file} (attempt {attempt + 1}/5): {e}"
-                        )
-                        time.sleep(3)
-                    if attempt == 4:
-                        print(
-                            f"Max deletion attempts reached for {temp_file}, leaving file intact"
-                        )
-        merger.close()
+    def report_timings(self):
+        wall = time.monotonic() - self.started
+        busy = sum(t["total_s"] for t in self.timings)
+        print(f"{'page':<28}{'slot':>5}{'load':>8}{'render':>8}{'print':>8}{'total':>8}  status")
+        for t in self.timings:
+            print(
+                f"{t['name']:<28}{t['slot']:>5}{t.get('load_s', '-'):>8}{t.get('render_s', '-'):>8}"
+                f"{t.get('print_s', '-'):>8}{t['total_s']:>8}  {t['status']}"
+            )
+        print(
+            f"Wall time {wall:.2f}s for {busy:.2f}s of page work "
+            f"(pool_size={self.pool_size}, effective parallelism {busy / wall if wall else 0:.2f})"
+        )
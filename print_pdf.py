@@ -0,0 +1,132 @@
+import sys
+import json
+from PyQt5.QtWidgets import QApplication
+from PyQt5.QtWebEngineWidgets import QWebEnginePage, QWebEngineView
+from PyQt5.QtCore import QUrl, QTimer
+import time
+from render_signal import RENDER_SIGNAL_SCRIPT, install_export_mode, parse_render_signal
+from pdf_exporter import INJECT_SCRIPT, EXPORT_VIEWPORT, export_page_layout
+from vendor_assets import install_vendor_assets
+
+# Runs the usual dependency/initialisation script inside every dashboard sheet of /print
+# (same-origin frames, so eval in the frame's own window is allowed).
+PRINT_INJECT_SCRIPT = """
+document.querySelectorAll('.print-sheet iframe').forEach(function(frame) {
+    if (frame.contentWindow) {
+        frame.contentWindow.eval(%s);
+    }
+});
+""" % json.dumps(INJECT_SCRIPT)
+
+
+class PrintDocumentExporter:
+    """Exports /print in one pass: one load, one render signal and one printToPdf for all sheets.
+
+    The route puts a CSS page break after every dashboard, so the printed document already has one
+    page per dashboard and there is nothing to merge.
+    """
+
+    def __init__(self, print_url="http://127.0.0.1:5000/print", output_file="InsightDash_Dashboard.pdf",
+                 qt_app=None, render_timeout_ms=60000, finished_callback=None):
+        self.app = qt_app or QApplication(sys.argv)
+        self.owns_app = qt_app is None
+        install_vendor_assets()  # CDN scripts are served from static/vendor in memory
+        install_export_mode()  # dashboard.js draws final state, no transitions
+        self.print_url = print_url
+        self.output_file = output_file  # None keeps the document in memory only (self.pdf_bytes)
+        self.render_timeout_ms = render_timeout_ms
+        self.finished_callback = finished_callback
+        self.pdf_bytes = None
+        self.timing = {}
+        self.waiting_for_render = False
+        self.page = QWebEnginePage()
+        self.view = QWebEngineView()
+        self.view.setPage(self.page)
+        self.view.resize(EXPORT_VIEWPORT)
+        self.page.loadFinished.connect(self.handle_load_finished)
+        self.page.titleChanged.connect(self.handle_title_changed)
+        self.render_timer = QTimer()
+        self.render_timer.setSingleShot(True)
+        self.render_timer.timeout.connect(self.handle_render_timeout)
+        self.page_layout = export_page_layout()
+        self.page.javaScriptConsoleMessage = lambda level, msg, line, source: print(
+            f"JS Console [{source}:{line}]: {msg}"
+        )
+
+    def start(self):
+        print(f"Loading: {self.print_url}")
+        self.started = self.last_mark = time.monotonic()
+        self.page.load(QUrl(self.print_url))
+
+    def _mark(self, phase):
+        now = time.monotonic()
+        self.timing[phase] = round(now - self.last_mark, 2)
+        self.last_mark = now
+
+    def handle_load_finished(self, ok):
+        self._mark("load_s")
+        if not ok:
+            print(f"Failed to load {self.print_url}")
+            self.finish(None, "load_failed")
+            return
+        self.page.runJavaScript(PRINT_INJECT_SCRIPT, self.wait_for_render_signal)
+
+    def wait_for_render_signal(self, _=None):
+        self.waiting_for_render = True
+        self.render_timer.start(self.render_timeout_ms)
+        self.page.runJavaScript(RENDER_SIGNAL_SCRIPT)
+
+    def handle_title_changed(self, title):
+        report = parse_render_signal(title)
+        if report is None or not self.waiting_for_render:
+            return
+        self.render_timer.stop()
+        if report["missing"]:
+            print(f"Render signal received, missing charts: {', '.join(report['missing'])}. Printing as-is.")
+        self.print_document("rendered" if not report["missing"] else "partial")
+
+    def handle_render_timeout(self):
+        if not self.waiting_for_render:
+            return
+        print(f"No render signal after {self.render_timeout_ms} ms, printing as-is")
+        self.print_document("render_timeout")
+
+    def print_document(self, status):
+        self.waiting_for_render = False
+        self._mark("render_s")
+        self.timing["status"] = status
+        self.page.printToPdf(self.handle_pdf_printed, self.page_layout)
+
+    def handle_pdf_printed(self, pdf_bytes):
+        self._mark("print_s")
+        pdf_bytes = bytes(pdf_bytes)
+        self.finish(pdf_bytes or None, self.timing["status"] if pdf_bytes else "print_failed")
+
+    def finish(self, pdf_bytes, status):
+        self.pdf_bytes = pdf_bytes
+        self.timing["status"] = status
+        self.timing["total_s"] = round(time.monotonic() - self.started, 2)
+        if pdf_bytes and self.output_file:
+            with open(self.output_file, "wb") as f:
+                f.write(pdf_bytes)
+            print(f"PDF saved as {self.output_file}")
+        elif not pdf_bytes:
+            print("Printing failed. PDF not created.")
+        print(
+            f"load {self.timing.get('load_s', '-')}s, render {self.timing.get('render_s', '-')}s, "
+            f"print {self.timing.get('print_s', '-')}s, total {self.timing['total_s']}s ({status})"
+        )
+        self.render_timer.stop()
+        self.view.close()
+        if self.finished_callback:
+            self.finished_callback(pdf_bytes, self.timing)
+        if self.owns_app:
+            self.app.quit()
+
+
+if __name__ == "__main__":
+    # Optional page filter, e.g. python print_pdf.py /fte /sankey
+    query = "&".join(f"page={path}" for path in sys.argv[1:])
+    exporter = PrintDocumentExporter(f"http://127.0.0.1:5000/print{'?' + query if query else ''}")
+    exporter.start()
+    sys.exit(exporter.app.exec_())
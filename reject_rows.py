@@ -0,0 +1,169 @@
+import datetime
+import json
+import os
+import re
+import threading
+
+import oracledb
+
+# Row-level error capture for the transfers. executemany runs with batcherrors=True, so a row that
+# fails (constraint violation, value too large, bad conversion) no longer fails its whole batch:
+# Oracle inserts the rest, the driver reports each failed row with its offset and error, and the
+# row is written to a reject file or table with that error. A reject limit stops the transfer when
+# rejects point at a systematic problem rather than a few bad rows. Rejects are kept outside the
+# batch's transaction, so they survive the rollback of the batch that trips the limit. Batch error
+# mode needs conventional inserts; direct-path (APPEND_VALUES) statements refuse it.
+DEFAULT_REJECT_DIR = os.getenv("TRANSFER_REJECT_DIR", "transfer_rejects")
+REJECT_TABLE = "TRANSFER_REJECTS"
+DEFAULT_REJECT_LIMIT = 1000
+
+
+class RejectLimitExceeded(RuntimeError):
+    pass
+
+
+def _row_values(rows, offset):
+    if hasattr(rows, "slice"):  # a pyarrow Table from the columnar path
+        return list(rows.slice(offset, 1).to_pylist()[0].values())
+    return list(rows[offset])
+
+
+class FileRejectStore:
+    """Rejected rows as JSON lines, one file per transfer in a local directory.
+
+    Lines are written as soon as Oracle reports the rows, so a batch that is later rolled back
+    can leave rejects behind that a rerun reports again.
+    """
+
+    def __init__(self, directory=DEFAULT_REJECT_DIR):
+        self.directory = directory
+
+    def _path(self, name):
+        return os.path.join(self.directory, re.sub(r"[^A-Za-z0-9_.-]+", "_", name) + ".rejects.jsonl")
+
+    def connect(self, config):
+        os.makedirs(self.directory, exist_ok=True)
+        return None  # nothing to connect to
+
+    def write(self, conn, name, rejects):
+        lines = "".join(json.dumps(reject, default=str) + "\n" for reject in rejects)
+        with open(self._path(name), "a") as f:
+            f.write(lines)  # one append per batch, so parallel workers do not interleave rows
+
+    def location(self, name):
+        return self._path(name)
+
+
+class TableRejectStore:
+    """Rejected rows in a destination table, written and committed on a connection of their own.
+
+    Like the file store, rejects of a batch that is later rolled back stay in the table.
+    """
+
+    def __init__(self, table=REJECT_TABLE):
+        self.table = table
+
+    def connect(self, config):
+        """A destination connection for the rejects, with the reject table created if needed."""
+        conn = oracledb.connect(**config)
+        cursor = conn.cursor()
+        try:
+            cursor.execute(f"""
+                CREATE TABLE {self.table} (
+                    transfer_name VARCHAR2(512) NOT NULL,
+                    error_code NUMBER,
+                    error_message VARCHAR2(4000),
+                    row_data CLOB,
+                    rejected_at TIMESTAMP DEFAULT SYSTIMESTAMP NOT NULL
+                )
+            """)
+        except oracledb.DatabaseError as e:
+            if e.args[0].code != 955:  # ORA-00955: already exists
+                raise
+        finally:
+            cursor.close()
+        return conn
+
+    def write(self, conn, name, rejects):
+        cursor = conn.cursor()
+        cursor.setinputsizes(None, None, 4000, oracledb.DB_TYPE_CLOB)
+        cursor.executemany(
+            f"INSERT INTO {self.table} (transfer_name, error_code, error_message, row_data) VALUES (:1, :2, :3, :4)",
+            [(name, r["code"], r["message"][:4000], json.dumps(r["row"], default=str)) for r in rejects]
+        )
+        cursor.close()
+        conn.commit()  # independent of the batch, which may still be rolled back
+
+    def location(self, name):
+        return f"{self.table} (transfer_name = '{name}')"
+
+
+class RejectHandler:
+    """executemany with batcherrors=True for one transfer; failed rows go to the store.
+
+    limit: rejected rows allowed before the transfer aborts (0: abort on the first, None: no limit).
+    Writer threads of one transfer share the handler and its store connection; with parallel
+    workers the limit is per worker.
+    """
+
+    def __init__(self, store, name, limit=DEFAULT_REJECT_LIMIT, conn=None):
+        self.store = store
+        self.name = name
+        self.limit = limit
+        self.conn = conn
+        self.rejected = 0
+        self._lock = threading.Lock()
+
+    @classmethod
+    def open(cls, store, config, name, limit=DEFAULT_REJECT_LIMIT, load_strategy=None):
+        """A handler for the transfer called name, or None without a store; config is the destination's."""
+        if store is None:
+            return None
+        if load_strategy is not None and load_strategy.direct_path:
+            raise ValueError("Reject capture needs conventional inserts; direct-path loads cannot use batch errors")
+        return cls(store, name.upper(), limit, store.connect(config))
+
+    def close(self):
+        if self.conn is not None:
+            self.conn.close()
+            self.conn = None
+
+    def executemany(self, cursor, sql, rows):
+        """Run one batch; returns the offsets of its rejected rows."""
+        cursor.executemany(sql, rows, batcherrors=True)
+        errors = cursor.getbatcherrors()
+        if not errors:
+            return []
+        now = datetime.datetime.now().isoformat(timespec="seconds")
+        rejects = [
+            {"transfer": self.name, "code": error.code, "message": error.message,
+             "row": _row_values(rows, error.offset), "rejected_at": now}
+            for error in errors
+        ]
+        with self._lock:
+            self.store.write(self.conn, self.name, rejects)
+            self.rejected += len(rejects)
+            rejected = self.rejected
+        if self.limit is not None and rejected > self.limit:
+            raise RejectLimitExceeded(
+                f"{self.name}: {rejected} rejected rows exceed the limit of {self.limit} "
+                f"(last: ORA-{errors[-1].code:05d}); see {self.store.location(self.name)}"
+            )
+        return [error.offset for error in errors]
+
+    def summary(self):
+        if not self.rejected:
+            return "no rows rejected"
+        return f"{self.rejected} row(s) rejected -> {self.store.location(self.name)}"
+
+
+def execute_batch(cursor, sql, rows, rejects=None):
+    """executemany for one batch, through the RejectHandler when there is one.
+
+    Returns (rows written, offsets of the rejected rows).
+    """
+    if rejects is None:
+        cursor.executemany(sql, rows)
+        return len(rows), []
+    rejected = rejects.executemany(cursor, sql, rows)
+    return len(rows) - len(rejected), rejected
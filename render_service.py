@@ -0,0 +1,240 @@
+import multiprocessing
+import queue
+import sys
+import threading
+import time
+import uuid
+from urllib.parse import urlsplit
+
+DEFAULT_URLS = [
+    ("http://127.0.0.1:5000/", "Home Dashboard"),
+    ("http://127.0.0.1:5000/productivity", "Productivity Dashboard"),
+    ("http://127.0.0.1:5000/fte", "FTE Dashboard"),
+    ("http://127.0.0.1:5000/sankey", "Sankey Dashboard")
+]
+# Exportable pages by path; request bodies name these paths, never URLs
+DASHBOARD_PAGES = {urlsplit(url).path or "/": (url, title) for url, title in DEFAULT_URLS}
+
+
+def dashboard_pages(paths):
+    """(url, title) pairs for page paths such as "/fte"; only the dashboard's own pages are accepted."""
+    if not isinstance(paths, list) or not all(isinstance(path, str) for path in paths):
+        raise ValueError("pages must be a list of page paths")
+    unknown = [path for path in paths if path not in DASHBOARD_PAGES]
+    if unknown:
+        raise ValueError(f"Unknown dashboard page(s): {', '.join(unknown)}; choose from {', '.join(DASHBOARD_PAGES)}")
+    return [DASHBOARD_PAGES[path] for path in paths]
+
+
+def render_worker_main(job_queue, event_queue, pool_size):
+    """Entry point of the render process: owns the only QApplication and runs jobs one at a time."""
+    from PyQt5.QtWidgets import QApplication
+    from PyQt5.QtCore import QTimer
+    from pdf_exporter import PooledPDFExporter, export_page_layout, layout_signature, merge_pdf_pages
+    from export_cache import ExportCache, document_cache_key, page_cache_key, resolve_theme, template_version
+
+    app = QApplication(sys.argv)
+    state = {"exporter": None}
+    cache = ExportCache()
+    layout = layout_signature(export_page_layout())
+
+    def run_job(job):
+        job_id = job["job_id"]
+        urls = job["urls"]
+        total = len(urls)
+        event_queue.put({"job_id": job_id, "status": "running", "completed": 0, "total": total})
+
+        # The same resolved theme keys the cache and is pinned for the render, so the two always agree
+        theme = resolve_theme(job.get("theme"))
+        # Unchanged data, theme, layout and dashboard.js/templates -> serve the document or pages from disk
+        version = template_version()
+        page_keys = [page_cache_key(url, theme, layout, version=version) for url, _ in urls]
+        doc_key = document_cache_key(page_keys)
+        cached_doc = cache.get("document", doc_key)
+        if cached_doc is not None:
+            print(f"Job {job_id}: document served from the export cache")
+            event_queue.put({
+                "job_id": job_id, "status": "done", "completed": total, "total": total,
+                "pdf": cached_doc, "cached_pages": total, "cache": cache.stats()
+            })
+            return
+        pages = [cache.get("page", key) for key in page_keys]
+        stale = [i for i, page in enumerate(pages) if page is None]
+        cached_pages = total - len(stale)
+        print(f"Job {job_id}: {cached_pages}/{total} pages from the export cache, rendering {len(stale)}")
+
+        def complete():
+            pdf_bytes = merge_pdf_pages(pages)
+            if pdf_bytes and all(pages):
+                cache.put("document", doc_key, pdf_bytes)
+            event_queue.put({
+                "job_id": job_id,
+                "status": "done" if pdf_bytes else "failed",
+                "completed": total,
+                "total": total,
+                "pdf": pdf_bytes,
+                "cached_pages": cached_pages,
+                "cache": cache.stats()
+            })
+
+        if not stale:
+            complete()
+            return
+
+        def on_progress(completed, _total, timing):
+            event_queue.put({
+                "job_id": job_id, "status": "running", "completed": cached_pages + completed,
+                "total": total, "page": timing
+            })
+
+        def on_finished(_pdf_bytes, timings):
+            exporter = state["exporter"]
+            state["exporter"] = None
+            for i, page_bytes, timing in zip(stale, exporter.pdf_data, timings):
+                pages[i] = page_bytes
+                # Only fully drawn pages are reusable; partial or timed-out ones are retried next time
+                if timing["status"] == "rendered":
+                    cache.put("page", page_keys[i], page_bytes)
+            complete()
+
+        try:
+            # output_file=None: pages come back as bytes and are merged with the cached ones
+            state["exporter"] = PooledPDFExporter(
+                [urls[i] for i in stale], None, app, pool_size=pool_size,
+                progress_callback=on_progress, finished_callback=on_finished, theme=theme
+            )
+            state["exporter"].start()
+        except Exception as e:
+            state["exporter"] = None
+            event_queue.put({"job_id": job_id, "status": "failed", "error": str(e)})
+
+    def poll_jobs():
+        if state["exporter"] is not None:
+            return
+        try:
+            job = job_queue.get_nowait()
+        except queue.Empty:
+            return
+        if job is None:
+            app.quit()
+            return
+        run_job(job)
+
+    timer = QTimer()
+    timer.timeout.connect(poll_jobs)
+    timer.start(200)
+    sys.exit(app.exec_())
+
+
+class RenderService:
+    """Flask-side handle to the render worker: job table, queue and Socket.IO progress events."""
+
+    def __init__(self, socketio=None, namespace="/exports", pool_size=3, max_finished_jobs=20):
+        self.socketio = socketio
+        self.namespace = namespace
+        self.pool_size = pool_size
+        self.max_finished_jobs = max_finished_jobs
+        self.jobs = {}
+        self.lock = threading.Lock()
+        # spawn keeps Qt out of any state forked from the Flask process
+        ctx = multiprocessing.get_context("spawn")
+        self.job_queue = ctx.Queue()
+        self.event_queue = ctx.Queue()
+        self.ctx = ctx
+        self.worker = None
+
+    def start(self):
+        self.worker = self.ctx.Process(
+            target=render_worker_main,
+            args=(self.job_queue, self.event_queue, self.pool_size),
+            name="pdf-render-worker",
+            daemon=True
+        )
+        self.worker.start()
+        if self.socketio is not None:
+            self.socketio.start_background_task(self._consume_events)
+        else:
+            threading.Thread(target=self._consume_events, daemon=True).start()
+        print(f"Render worker started (pid {self.worker.pid})")
+
+    def stop(self):
+        self.job_queue.put(None)
+
+    def submit(self, urls=None, theme=None):
+        job_id = uuid.uuid4().hex
+        urls = urls or DEFAULT_URLS
+        job = {
+            "job_id": job_id,
+            "status": "queued",
+            "completed": 0,
+            "total": len(urls),
+            "pdf": None,
+            "created_at": time.time(),
+            "error": None
+        }
+        with self.lock:
+            self.jobs[job_id] = job
+        self.job_queue.put({"job_id": job_id, "urls": urls, "theme": theme})
+        self._emit(job)
+        return job_id
+
+    def get(self, job_id):
+        with self.lock:
+            job = self.jobs.get(job_id)
+            return dict(job) if job else None
+
+    def _consume_events(self):
+        while True:
+            try:
+                event = self.event_queue.get(timeout=0.5)
+            except queue.Empty:
+                if self.worker is not None and not self.worker.is_alive():
+                    self._fail_unfinished("Render worker exited")
+                    return
+                continue
+            with self.lock:
+                job = self.jobs.get(event["job_id"])
+                if job is None:
+                    continue
+                job.update({k: v for k, v in event.items() if k != "page"})
+                if event.get("status") == "failed" and not job.get("error"):
+                    job["error"] = "No pages were rendered"
+                if event.get("status") in ("done", "failed"):
+                    job["finished_at"] = time.time()
+                    self._prune_finished()
+                snapshot = dict(job)
+            self._emit(snapshot, event.get("page"))
+
+    def _prune_finished(self):
+        # Finished documents are held in memory; keep only the most recent ones
+        finished = sorted(
+            (job for job in self.jobs.values() if job.get("finished_at")),
+            key=lambda job: job["finished_at"]
+        )
+        for job in finished[:-self.max_finished_jobs]:
+            del self.jobs[job["job_id"]]
+
+    def _fail_unfinished(self, reason):
+        with self.lock:
+            pending = [job for job in self.jobs.values() if job["status"] in ("queued", "running")]
+            for job in pending:
+                job["status"] = "failed"
+                job["error"] = reason
+        for job in pending:
+            self._emit(dict(job))
+
+    def _emit(self, job, page=None):
+        if self.socketio is None:
+            return
+        payload = {
+            "job_id": job["job_id"],
+            "status": job["status"],
+            "completed": job["completed"],
+            "total": job["total"],
+            "error": job.get("error")
+        }
+        if job.get("cached_pages") is not None:
+            payload["cached_pages"] = job["cached_pages"]
+        if page is not None:
+            payload["page"] = page
+        self.socketio.emit("export_progress", payload, namespace=self.namespace)
@@ -0,0 +1,91 @@
+import json
+
+from PyQt5.QtWebEngineWidgets import QWebEngineProfile, QWebEngineScript
+
+# dashboard.js dispatches 'charts-rendered' on every window once its charts reach their
+# final state. The bridge below collects that event from the page (or from each dashboard
+# iframe on /all) and reports it to Qt through a document.title sentinel, which the
+# exporters pick up via QWebEnginePage.titleChanged.
+RENDER_SIGNAL_PREFIX = "__charts_rendered__:"
+
+# Puts dashboard.js in export mode (no transitions or particle loops, render signal fired right
+# after the last draw). It has to exist before dashboard.js runs, so it is injected at document
+# creation into every frame rather than through runJavaScript after loadFinished.
+EXPORT_MODE_SCRIPT = "window.customDashboard = Object.assign(window.customDashboard || {}, { exportMode: true });"
+
+RENDER_SIGNAL_SCRIPT = """
+(function() {
+    const prefix = '%(prefix)s';
+    const quietPeriodMs = %(quiet_ms)d;
+    const iframeIds = ['home-iframe', 'productivity-iframe', 'fte-iframe', 'sankey-iframe'];
+    const frames = iframeIds
+        .map(id => document.getElementById(id))
+        .filter(frame => frame && frame.contentWindow);
+    const targets = frames.length ? frames.map(frame => frame.contentWindow) : [window];
+    const reports = new Array(targets.length).fill(null);
+
+    function publish() {
+        if (reports.some(report => report === null)) return;
+        const missing = [].concat(...reports.map(report => (report.missing || []).map(id => `${report.path}${id}`)));
+        document.title = prefix + JSON.stringify({ pages: reports, missing: missing });
+    }
+
+    targets.forEach((win, index) => {
+        win.addEventListener('charts-rendered', event => {
+            reports[index] = event.detail;
+            publish();
+        });
+        // The charts may already be drawn; accept that state only if no redraw starts
+        // during the quiet period (the exporter's inject script may trigger one).
+        const state = win.customDashboard && win.customDashboard.renderState;
+        if (state && state.status === 'rendered') {
+            const generation = state.detail.generation;
+            setTimeout(() => {
+                const current = win.customDashboard.renderState;
+                if (reports[index] === null && current.status === 'rendered' && current.detail.generation === generation) {
+                    reports[index] = current.detail;
+                    publish();
+                }
+            }, quietPeriodMs);
+        }
+    });
+})();
+""" % {"prefix": RENDER_SIGNAL_PREFIX, "quiet_ms": 500}
+
+
+def parse_render_signal(title):
+    """Return the render report carried by a page title, or None for ordinary titles."""
+    if not title or not title.startswith(RENDER_SIGNAL_PREFIX):
+        return None
+    try:
+        return json.loads(title[len(RENDER_SIGNAL_PREFIX):])
+    except ValueError:
+        return None
+
+
+_export_mode_scripts = {}
+
+
+def install_export_mode(profile=None, theme=None):
+    """Load every page of the profile, iframes included, in dashboard.js export mode (idempotent).
+
+    theme pins the dashboard theme (e.g. 'dark-theme') for later loads; None keeps the stored one.
+    """
+    profile = profile or QWebEngineProfile.defaultProfile()
+    installed = _export_mode_scripts.get(id(profile))
+    if installed is not None:
+        if installed[0] == theme:
+            return
+        profile.scripts().remove(installed[1])
+    source = EXPORT_MODE_SCRIPT
+    if theme:
+        # dashboard.js reads the theme from localStorage when it loads
+        source += " try { localStorage.setItem('theme', %s); } catch (e) {}" % json.dumps(theme)
+    script = QWebEngineScript()
+    script.setName("dashboard-export-mode")
+    script.setSourceCode(source)
+    script.setInjectionPoint(QWebEngineScript.DocumentCreation)
+    script.setWorldId(QWebEngineScript.MainWorld)
+    script.setRunsOnSubFrames(True)
+    profile.scripts().insert(script)
+    _export_mode_scripts[id(profile)] = (theme, script)
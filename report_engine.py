@@ -0,0 +1,505 @@
+import math
+import zlib
+
+# Browserless report renderer: draws the dashboard charts and metric cards from the same API
+# payloads dashboard.js consumes straight to vector PDF. No Qt, Xvfb or running Flask needed,
+# and no third-party packages, so scheduled and bulk reports can run on any worker.
+
+PAGE_WIDTH, PAGE_HEIGHT = 1224, 792  # Tabloid landscape in points, same paper as the browser exports
+PAGE_MARGIN = 28
+
+PRIMARY_COLOR = "#45B7D1"
+PRIMARY_COLOR_END = "#96CEB4"
+SCATTER_COLORS = ("#ff5555", "#5555ff")
+SANKEY_COLORS = ["#FF6B6B", "#4ECDC4", "#45B7D1", "#96CEB4", "#FFEEAD", "#D4A5A5"]
+FG_COLOR = "#333333"
+MUTED_COLOR = "#888888"
+GRID_COLOR = "#dddddd"
+CARD_COLOR = "#f7f9fb"
+CARD_BORDER = "#e1e5ea"
+TREND_UP_COLOR = "#2e9e5b"
+TREND_DOWN_COLOR = "#d9534f"
+
+# Mirrors the chartConfigs/updateMetric tables in dashboard.js
+REPORT_PAGES = {
+    "/": {
+        "title": "Home Dashboard",
+        "metrics": [("ID Count", "count_id", ""), ("GF Count", "count_gf", ""), ("GFC Count", "count_gfc", "")],
+        "charts": [
+            ("line", "lineData", "ID Count Trend"),
+            ("bar", "barData", "GF Count by Month", "count_gf_percent_change"),
+            ("lollipop", "areaData", "GFC Count Trend"),
+            ("scatter", "scatterData", "ID Distribution"),
+        ],
+    },
+    "/productivity": {
+        "title": "Productivity Dashboard",
+        "metrics": [
+            ("Tasks Completed", "tasks_completed", ""),
+            ("Avg Completion Time", "avg_completion_time", ""),
+            ("Efficiency Rate", "efficiency_rate", "%"),
+        ],
+        "charts": [
+            ("line", "lineData", "Tasks Completed Trend"),
+            ("bar", "barData", "Avg Completion Time by Month", "avg_completion_time_percent_change"),
+            ("lollipop", "areaData", "Efficiency Rate Trend"),
+        ],
+    },
+    "/fte": {
+        "title": "FTE Dashboard",
+        "metrics": [("Total FTE", "total_fte", ""), ("Utilization", "utilization", "%"), ("Overtime Hours", "overtime_hours", "")],
+        "charts": [
+            ("line", "lineData", "Total FTE Trend"),
+            ("bar", "barData", "Utilization by Month", "utilization_percent_change"),
+            ("lollipop", "areaData", "Overtime Hours Trend"),
+        ],
+    },
+    "/sankey": {
+        "title": "Sankey Dashboard",
+        "charts": [("sankey", None, "Client Flow Sankey Diagram")],
+    },
+}
+
+# Advance widths of the standard Helvetica font (1/1000 em) for printable ASCII, used to
+# centre and right-align text; other characters fall back to the digit width.
+_HELVETICA_WIDTHS = dict(zip(
+    map(chr, range(32, 127)),
+    [278, 278, 355, 556, 556, 889, 667, 191, 333, 333, 389, 584, 278, 333, 278, 278,
+     556, 556, 556, 556, 556, 556, 556, 556, 556, 556, 278, 278, 584, 584, 584, 556,
+     1015, 667, 667, 722, 722, 667, 611, 778, 722, 278, 500, 667, 556, 833, 722, 778,
+     667, 778, 722, 667, 611, 722, 667, 944, 667, 667, 611, 278, 278, 278, 469, 556,
+     333, 556, 556, 500, 556, 556, 278, 556, 556, 222, 222, 500, 222, 833, 556, 556,
+     556, 556, 333, 500, 278, 556, 500, 722, 500, 500, 500, 334, 260, 334, 584]
+))
+
+
+def text_width(text, size, bold=False):
+    width = sum(_HELVETICA_WIDTHS.get(char, 556) for char in str(text)) * size / 1000
+    return width * 1.06 if bold else width
+
+
+def _rgb(color):
+    color = color.lstrip("#")
+    return tuple(int(color[i:i + 2], 16) / 255 for i in (0, 2, 4))
+
+
+def _num(value):
+    return f"{value:.2f}".rstrip("0").rstrip(".") or "0"
+
+
+class PdfCanvas:
+    """Minimal vector PDF writer: paths, rectangles, circles and Helvetica text on a top-left origin."""
+
+    def __init__(self, width=PAGE_WIDTH, height=PAGE_HEIGHT):
+        self.width = width
+        self.height = height
+        self.pages = []
+        self.alpha_states = {}
+        self.ops = None
+
+    def new_page(self):
+        self.ops = []
+        self.pages.append(self.ops)
+
+    def _point(self, x, y):
+        return f"{_num(x)} {_num(self.height - y)}"
+
+    def _paint(self, path_ops, fill=None, stroke=None, width=1, opacity=1.0, dash=None):
+        if fill is None and stroke is None:
+            return
+        ops = ["q"]
+        if opacity < 1:
+            key = round(opacity, 2)
+            name = self.alpha_states.setdefault(key, f"GA{len(self.alpha_states)}")
+            ops.append(f"/{name} gs")
+        if fill is not None:
+            ops.append("%s %s %s rg" % tuple(map(_num, _rgb(fill))))
+        if stroke is not None:
+            ops.append("%s %s %s RG %s w" % (*map(_num, _rgb(stroke)), _num(width)))
+            if dash:
+                ops.append(f"[{' '.join(map(_num, dash))}] 0 d")
+        ops.extend(path_ops)
+        ops.append("B" if fill is not None and stroke is not None else "f" if fill is not None else "S")
+        ops.append("Q")
+        self.ops.append("\n".join(ops))
+
+    def path(self, commands, fill=None, stroke=None, width=1, opacity=1.0, dash=None):
+        """commands: ('M', x, y), ('L', x, y), ('C', x1, y1, x2, y2, x, y) and ('Z',)."""
+        path_ops = []
+        for command, *coords in commands:
+            points = " ".join(self._point(coords[i], coords[i + 1]) for i in range(0, len(coords), 2))
+            path_ops.append({"M": f"{points} m", "L": f"{points} l", "C": f"{points} c", "Z": "h"}[command])
+        self._paint(path_ops, fill, stroke, width, opacity, dash)
+
+    def line(self, x1, y1, x2, y2, color, width=1, opacity=1.0, dash=None):
+        self.path([("M", x1, y1), ("L", x2, y2)], stroke=color, width=width, opacity=opacity, dash=dash)
+
+    def polyline(self, points, color, width=1, opacity=1.0):
+        if len(points) < 2:
+            return
+        self.path([("M", *points[0])] + [("L", *point) for point in points[1:]], stroke=color, width=width, opacity=opacity)
+
+    def rect(self, x, y, w, h, fill=None, stroke=None, width=1, opacity=1.0):
+        self._paint([f"{self._point(x, y + h)} {_num(w)} {_num(h)} re"], fill, stroke, width, opacity)
+
+    def circle(self, x, y, r, fill=None, stroke=None, width=1, opacity=1.0):
+        k = 0.5523 * r  # cubic Bezier approximation of a quarter circle
+        self.path([
+            ("M", x + r, y),
+            ("C", x + r, y + k, x + k, y + r, x, y + r),
+            ("C", x - k, y + r, x - r, y + k, x - r, y),
+            ("C", x - r, y - k, x - k, y - r, x, y - r),
+            ("C", x + k, y - r, x + r, y - k, x + r, y),
+            ("Z",),
+        ], fill=fill, stroke=stroke, width=width, opacity=opacity)
+
+    def text(self, x, y, value, size=10, color=FG_COLOR, bold=False, anchor="start"):
+        value = str(value)
+        if anchor == "middle":
+            x -= text_width(value, size, bold) / 2
+        elif anchor == "end":
+            x -= text_width(value, size, bold)
+        encoded = value.encode("cp1252", errors="replace").decode("latin-1")
+        escaped = encoded.replace("\\", "\\\\").replace("(", "\\(").replace(")", "\\)")
+        self.ops.append(
+            "BT %s %s %s rg /%s %s Tf %s Td (%s) Tj ET"
+            % (*map(_num, _rgb(color)), "F2" if bold else "F1", _num(size), self._point(x, y), escaped)
+        )
+
+    def to_bytes(self):
+        objects = [None, None]  # catalog and page tree, filled in once page ids are known
+        objects.append(b"<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica /Encoding /WinAnsiEncoding >>")
+        objects.append(b"<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica-Bold /Encoding /WinAnsiEncoding >>")
+        alpha = " ".join(
+            f"/{name} << /Type /ExtGState /ca {_num(key)} /CA {_num(key)} >>" for key, name in self.alpha_states.items()
+        )
+        resources = f"<< /Font << /F1 3 0 R /F2 4 0 R >> /ExtGState << {alpha} >> >>"
+
+        page_ids = []
+        for ops in self.pages:
+            stream = zlib.compress("\n".join(ops).encode("latin-1"))
+            objects.append(b"<< /Length %d /Filter /FlateDecode >>\nstream\n" % len(stream) + stream + b"\nendstream")
+            content_id = len(objects)
+            objects.append((
+                f"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 {_num(self.width)} {_num(self.height)}] "
+                f"/Resources {resources} /Contents {content_id} 0 R >>"
+            ).encode("latin-1"))
+            page_ids.append(len(objects))
+        objects[0] = b"<< /Type /Catalog /Pages 2 0 R >>"
+        objects[1] = (
+            f"<< /Type /Pages /Kids [{' '.join(f'{page_id} 0 R' for page_id in page_ids)}] /Count {len(page_ids)} >>"
+        ).encode("latin-1")
+
+        out = bytearray(b"%PDF-1.4\n%\xe2\xe3\xcf\xd3\n")
+        offsets = []
+        for number, body in enumerate(objects, start=1):
+            offsets.append(len(out))
+            out += b"%d 0 obj\n" % number + body + b"\nendobj\n"
+        xref = len(out)
+        out += b"xref\n0 %d\n0000000000 65535 f \n" % (len(objects) + 1)
+        out += b"".join(b"%010d 00000 n \n" % offset for offset in offsets)
+        out += b"trailer\n<< /Size %d /Root 1 0 R >>\nstartxref\n%d\n%%%%EOF\n" % (len(objects) + 1, xref)
+        return bytes(out)
+
+
+def _nice_ticks(max_value, count=5):
+    """Rounded axis maximum and tick values, like d3's scale.nice()."""
+    if not max_value or max_value <= 0:
+        return 1, [0, 1]
+    raw_step = max_value / count
+    magnitude = 10 ** math.floor(math.log10(raw_step))
+    step = next(m * magnitude for m in (1, 2, 5, 10) if m * magnitude >= raw_step)
+    top = math.ceil(max_value / step) * step
+    return top, [i * step for i in range(int(round(top / step)) + 1)]
+
+
+def _format_value(value):
+    if isinstance(value, float) and not value.is_integer():
+        return f"{value:,.1f}"
+    return f"{value:,.0f}" if isinstance(value, (int, float)) else str(value)
+
+
+def _chart_card(canvas, box, title, subtitle=None):
+    """Draws the card frame and title; returns the plot area (x, y, w, h)."""
+    x, y, w, h = box
+    canvas.rect(x, y, w, h, fill=CARD_COLOR, stroke=CARD_BORDER)
+    canvas.text(x + 14, y + 22, title, size=13, bold=True)
+    if subtitle:
+        canvas.text(x + w - 14, y + 22, subtitle, size=9, color=MUTED_COLOR, anchor="end")
+    return x + 46, y + 40, w - 70, h - 70
+
+
+def _empty_chart(canvas, plot):
+    x, y, w, h = plot
+    canvas.text(x + w / 2, y + h / 2, "No data available", size=11, color=MUTED_COLOR, anchor="middle")
+
+
+def _value_axis(canvas, plot, max_value, side="left", color=MUTED_COLOR, grid=True):
+    """Draws ticks (and grid lines) for a 0..max axis; returns the value -> y scale."""
+    x, y, w, h = plot
+    top, ticks = _nice_ticks(max_value * 1.2)
+
+    def scale(value):
+        return y + h - (value or 0) / top * h
+
+    for tick in ticks:
+        ty = scale(tick)
+        if grid:
+            canvas.line(x, ty, x + w, ty, GRID_COLOR, width=0.5, dash=(2, 2))
+        if side == "left":
+            canvas.text(x - 6, ty + 3, _format_value(tick), size=8, color=color, anchor="end")
+        else:
+            canvas.text(x + w + 6, ty + 3, _format_value(tick), size=8, color=color)
+    return scale
+
+
+def _label_axis(canvas, plot, labels, positions):
+    x, y, w, h = plot
+    canvas.line(x, y + h, x + w, y + h, MUTED_COLOR, width=0.8)
+    every = max(1, math.ceil(len(labels) / 6))  # same thinning as the dashboard's x axis
+    for i, (label, position) in enumerate(zip(labels, positions)):
+        if i % every == 0:
+            canvas.text(position, y + h + 14, label, size=8, color=MUTED_COLOR, anchor="middle")
+
+
+def _point_positions(plot, count):
+    x, y, w, h = plot
+    if count == 1:
+        return [x + w / 2]
+    return [x + w * i / (count - 1) for i in range(count)]
+
+
+def _band_positions(plot, count, padding=0.25):
+    x, y, w, h = plot
+    step = w / max(count, 1)
+    bandwidth = step * (1 - padding)
+    return [x + step * i + (step - bandwidth) / 2 for i in range(count)], bandwidth
+
+
+def draw_line_chart(canvas, box, data, title, color=PRIMARY_COLOR):
+    plot = _chart_card(canvas, box, title)
+    if not data:
+        return _empty_chart(canvas, plot)
+    scale = _value_axis(canvas, plot, max(d["value"] for d in data))
+    xs = _point_positions(plot, len(data))
+    points = [(px, scale(d["value"])) for px, d in zip(xs, data)]
+    baseline = plot[1] + plot[3]
+    canvas.path(
+        [("M", xs[0], baseline)] + [("L", *point) for point in points] + [("L", xs[-1], baseline), ("Z",)],
+        fill=PRIMARY_COLOR_END, opacity=0.35
+    )
+    canvas.polyline(points, color, width=2.5)
+    for (px, py), d in zip(points, data):
+        canvas.circle(px, py, 4, fill=color, stroke="#ffffff", width=1.5)
+        canvas.text(px, py - 8, f"{d['value']:.0f}", size=8, anchor="middle")
+    _label_axis(canvas, plot, [d["label"] for d in data], xs)
+
+
+def draw_bar_chart(canvas, box, data, title, color=PRIMARY_COLOR, percent_change=None):
+    subtitle = f"{percent_change:+.2f}% vs previous month" if percent_change is not None else None
+    plot = _chart_card(canvas, box, title, subtitle)
+    if not data:
+        return _empty_chart(canvas, plot)
+    scale = _value_axis(canvas, plot, max(d["value"] for d in data))
+    xs, bandwidth = _band_positions(plot, len(data))
+    baseline = plot[1] + plot[3]
+    for bx, d in zip(xs, data):
+        top = scale(d["value"])
+        canvas.rect(bx, top, bandwidth, baseline - top, fill=color)
+        canvas.text(bx + bandwidth / 2, top - 4, _format_value(d["value"]), size=8, anchor="middle")
+    _label_axis(canvas, plot, [d["label"] for d in data], [bx + bandwidth / 2 for bx in xs])
+
+
+def draw_lollipop_chart(canvas, box, data, title, color=PRIMARY_COLOR):
+    plot = _chart_card(canvas, box, title)
+    if not data:
+        return _empty_chart(canvas, plot)
+    scale = _value_axis(canvas, plot, max(d["value"] for d in data))
+    xs, bandwidth = _band_positions(plot, len(data))
+    centers = [bx + bandwidth / 2 for bx in xs]
+    baseline = plot[1] + plot[3]
+    for cx, d in zip(centers, data):
+        top = scale(d["value"])
+        canvas.line(cx, baseline, cx, top, PRIMARY_COLOR_END, width=2)
+        canvas.circle(cx, top, 5, fill=color, stroke="#ffffff", width=1.5)
+        canvas.text(cx, top - 9, _format_value(d["value"]), size=8, anchor="middle")
+    _label_axis(canvas, plot, [d["label"] for d in data], centers)
+
+
+def draw_scatter_chart(canvas, box, data, title, colors=SCATTER_COLORS):
+    plot = _chart_card(canvas, box, title)
+    if not data:
+        return _empty_chart(canvas, plot)
+    # Total TF on the left axis, OCM Overall on its own right axis, as on the dashboard
+    tf_scale = _value_axis(canvas, plot, max(d["total_tf"] or 0 for d in data), color=colors[0])
+    ocm_scale = _value_axis(canvas, plot, max(d["ocm_overall"] or 0 for d in data), side="right", color=colors[1], grid=False)
+    xs = _point_positions(plot, len(data))
+    for px, d in zip(xs, data):
+        canvas.circle(px, tf_scale(d["total_tf"]), 5, fill=colors[0], opacity=0.8)
+        canvas.circle(px, ocm_scale(d["ocm_overall"]), 5, fill=colors[1], opacity=0.8)
+    _label_axis(canvas, plot, [d["label"] for d in data], xs)
+    x, y, w, h = box
+    for i, (label, color) in enumerate((("Total TF", colors[0]), ("OCM Overall", colors[1]))):
+        lx = x + w - 220 + i * 110
+        canvas.rect(lx, y + 13, 10, 10, fill=color)
+        canvas.text(lx + 16, y + 22, label, size=9)
+
+
+def sankey_layout(nodes, links, plot, node_width=40, node_padding=18):
+    """Left-aligned sankey layout (d3.sankeyLeft): node rectangles and link ribbons in plot coordinates."""
+    x, y, w, h = plot
+    count = len(nodes)
+    links = [
+        dict(link) for link in links
+        if 0 <= link["source"] < count and 0 <= link["target"] < count and link["value"] > 0
+    ]
+    depth = [0] * count
+    for _ in range(count):  # longest path from a source, bounded so cycles cannot loop forever
+        changed = False
+        for link in links:
+            if depth[link["target"]] < depth[link["source"]] + 1:
+                depth[link["target"]] = depth[link["source"]] + 1
+                changed = True
+        if not changed:
+            break
+    values = [
+        max(sum(l["value"] for l in links if l["source"] == i), sum(l["value"] for l in links if l["target"] == i))
+        for i in range(count)
+    ]
+    columns = {}
+    for i in range(count):
+        columns.setdefault(depth[i], []).append(i)
+    last_column = max(columns) if columns else 0
+    ky = min(
+        (h - (len(members) - 1) * node_padding) / (sum(values[i] for i in members) or 1)
+        for members in columns.values()
+    ) if columns else 0
+
+    layout = [None] * count
+    for column, members in columns.items():
+        nx = x + (w - node_width) * column / last_column if last_column else x
+        ny = y
+        for i in members:
+            height = max(values[i] * ky, 2)
+            layout[i] = {"name": nodes[i]["name"], "value": values[i], "x0": nx, "x1": nx + node_width, "y0": ny, "y1": ny + height}
+            ny += height + node_padding
+
+    source_offset = [node["y0"] for node in layout]
+    target_offset = [node["y0"] for node in layout]
+    ribbons = []
+    # Sorting by (source, target) position stacks each node's outgoing links by target and its
+    # incoming links by source, which keeps ribbons from crossing at the node edges
+    for link in sorted(links, key=lambda l: (layout[l["source"]]["y0"], layout[l["target"]]["y0"])):
+        source, target = link["source"], link["target"]
+        width = link["value"] * ky
+        ribbons.append({
+            "source": source, "value": link["value"], "width": width,
+            "sx": layout[source]["x1"], "sy": source_offset[source],
+            "tx": layout[target]["x0"], "ty": target_offset[target],
+        })
+        source_offset[source] += width
+        target_offset[target] += width
+    return layout, ribbons
+
+
+def draw_sankey_chart(canvas, box, data, title):
+    plot = _chart_card(canvas, box, title)
+    if not data or not data.get("nodes") or not data.get("links"):
+        return _empty_chart(canvas, plot)
+    x, y, w, h = plot
+    layout, ribbons = sankey_layout(data["nodes"], data["links"], (x, y, w - 120, h))
+    for ribbon in ribbons:
+        sx, tx, width = ribbon["sx"], ribbon["tx"], ribbon["width"]
+        sy, ty = ribbon["sy"], ribbon["ty"]
+        mx = (sx + tx) / 2
+        canvas.path([
+            ("M", sx, sy),
+            ("C", mx, sy, mx, ty, tx, ty),
+            ("L", tx, ty + width),
+            ("C", mx, ty + width, mx, sy + width, sx, sy + width),
+            ("Z",),
+        ], fill=SANKEY_COLORS[ribbon["source"] % len(SANKEY_COLORS)], opacity=0.35)
+    for i, node in enumerate(layout):
+        canvas.rect(node["x0"], node["y0"], node["x1"] - node["x0"], node["y1"] - node["y0"], fill=SANKEY_COLORS[i % len(SANKEY_COLORS)])
+        label_y = (node["y0"] + node["y1"]) / 2
+        canvas.text(node["x1"] + 6, label_y, node["name"], size=9, bold=True)
+        canvas.text(node["x1"] + 6, label_y + 11, _format_value(node["value"]), size=8, color=MUTED_COLOR)
+
+
+def draw_metric_cards(canvas, box, cards):
+    """cards: (label, value, trend arrow or None, percent change or None) tuples."""
+    if not cards:
+        return
+    x, y, w, h = box
+    gap = 16
+    card_width = (w - gap * (len(cards) - 1)) / len(cards)
+    for i, (label, value, trend, percent_change) in enumerate(cards):
+        cx = x + i * (card_width + gap)
+        canvas.rect(cx, y, card_width, h, fill=CARD_COLOR, stroke=CARD_BORDER)
+        canvas.text(cx + 14, y + 20, label, size=10, color=MUTED_COLOR)
+        canvas.text(cx + 14, y + 46, value, size=20, bold=True)
+        if trend:
+            up = trend == "↑"
+            color = TREND_UP_COLOR if up else TREND_DOWN_COLOR
+            tx, ty = cx + 20 + text_width(value, 20, bold=True), y + 40
+            tip, base = (ty - 6, ty + 2) if up else (ty + 2, ty - 6)
+            canvas.path([("M", tx, base), ("L", tx + 5, tip), ("L", tx + 10, base), ("Z",)], fill=color)
+            canvas.text(tx + 14, y + 44, f"({percent_change or 0:.2f}%)", size=10, color=color)
+
+
+def _metric_cards(spec, payload):
+    if "metrics" not in spec:
+        return [(metric["label"], _format_value(metric["value"]), None, None) for metric in payload.get("metrics", [])]
+    current = payload["metrics"]["current_metrics"]
+    trends = current.get("trends", {})
+    return [
+        (label, f"{current[key]}{suffix}", trends.get(f"{key}_trend"), trends.get(f"{key}_percent_change"))
+        for label, key, suffix in spec["metrics"]
+    ]
+
+
+def _chart_boxes(area, count):
+    x, y, w, h = area
+    columns = 2 if count == 4 else max(count, 1)
+    rows = math.ceil(count / columns)
+    gap = 16
+    cell_w = (w - gap * (columns - 1)) / columns
+    cell_h = (h - gap * (rows - 1)) / rows
+    return [(x + (i % columns) * (cell_w + gap), y + (i // columns) * (cell_h + gap), cell_w, cell_h) for i in range(count)]
+
+
+def draw_dashboard_page(canvas, path, payload):
+    spec = REPORT_PAGES.get(path, REPORT_PAGES["/"])
+    canvas.new_page()
+    canvas.text(PAGE_MARGIN, PAGE_MARGIN + 18, spec["title"], size=20, bold=True)
+    content_top = PAGE_MARGIN + 36
+    content_w = canvas.width - 2 * PAGE_MARGIN
+    if not payload:
+        canvas.text(canvas.width / 2, canvas.height / 2, "No data available", size=14, color=MUTED_COLOR, anchor="middle")
+        return
+
+    cards = _metric_cards(spec, payload)
+    if cards:
+        draw_metric_cards(canvas, (PAGE_MARGIN, content_top, content_w, 64), cards)
+        content_top += 80
+    area = (PAGE_MARGIN, content_top, content_w, canvas.height - PAGE_MARGIN - content_top)
+    for box, (kind, key, title, *extra) in zip(_chart_boxes(area, len(spec["charts"])), spec["charts"]):
+        if kind == "sankey":
+            draw_sankey_chart(canvas, box, payload, title)
+        elif kind == "line":
+            draw_line_chart(canvas, box, payload.get(key), title)
+        elif kind == "bar":
+            trends = payload["metrics"]["current_metrics"].get("trends", {})
+            draw_bar_chart(canvas, box, payload.get(key), title, percent_change=trends.get(extra[0]) if extra else None)
+        elif kind == "lollipop":
+            draw_lollipop_chart(canvas, box, payload.get(key), title)
+        elif kind == "scatter":
+            draw_scatter_chart(canvas, box, payload.get(key), title)
+
+
+def render_dashboard_report(pages):
+    """pages: (path, api payload or None) pairs, one PDF page each; returns the PDF bytes."""
+    canvas = PdfCanvas()
+    for path, payload in pages:
+        draw_dashboard_page(canvas, path, payload)
+    return canvas.to_bytes()
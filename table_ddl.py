@@ -0,0 +1,103 @@
+import oracledb
+
+# DDL for destination tables the transfers create themselves. Column types come from the source
+# cursor.description (type, length, precision, scale), so numbers and dates are stored as such
+# instead of as VARCHAR2(4000) text that needs implicit conversion on every insert and cannot back
+# a typed index.
+COMPRESSION_CLAUSES = {
+    "basic": "ROW STORE COMPRESS BASIC",              # direct-path loads only
+    "advanced": "ROW STORE COMPRESS ADVANCED",        # conventional DML too (Advanced Compression option)
+    "query_low": "COLUMN STORE COMPRESS FOR QUERY LOW",  # the column-store levels need Exadata-class storage
+    "query_high": "COLUMN STORE COMPRESS FOR QUERY HIGH",
+    "archive_high": "COLUMN STORE COMPRESS FOR ARCHIVE HIGH",
+}
+
+
+def _char_length(size):
+    return max(1, min(int(size or 4000), 4000))
+
+
+def column_type(description_entry):
+    """Oracle column type for one cursor.description entry; unknown types fall back to VARCHAR2(4000)."""
+    _, type_code, display_size, internal_size, precision, scale, _ = description_entry
+    if type_code == oracledb.DB_TYPE_NUMBER:
+        if scale == -127:
+            return f"FLOAT({precision})" if precision and precision != 126 else "NUMBER"
+        if precision:
+            return f"NUMBER({precision}, {scale})" if scale else f"NUMBER({precision})"
+        return "NUMBER" if not scale else f"NUMBER(*, {scale})"
+    if type_code == oracledb.DB_TYPE_BINARY_DOUBLE:
+        return "BINARY_DOUBLE"
+    if type_code == oracledb.DB_TYPE_BINARY_FLOAT:
+        return "BINARY_FLOAT"
+    if type_code == oracledb.DB_TYPE_BINARY_INTEGER:
+        return "NUMBER(10)"
+    if type_code == oracledb.DB_TYPE_VARCHAR:
+        return f"VARCHAR2({_char_length(display_size)} CHAR)"
+    if type_code == oracledb.DB_TYPE_CHAR:
+        return f"CHAR({_char_length(display_size)} CHAR)"
+    if type_code == oracledb.DB_TYPE_NVARCHAR:
+        return f"NVARCHAR2({min(_char_length(display_size), 2000)})"
+    if type_code == oracledb.DB_TYPE_NCHAR:
+        return f"NCHAR({min(_char_length(display_size), 1000)})"
+    if type_code == oracledb.DB_TYPE_DATE:
+        return "DATE"
+    if type_code == oracledb.DB_TYPE_TIMESTAMP:
+        return f"TIMESTAMP({scale if scale is not None else 6})"
+    if type_code == oracledb.DB_TYPE_TIMESTAMP_TZ:
+        return f"TIMESTAMP({scale if scale is not None else 6}) WITH TIME ZONE"
+    if type_code == oracledb.DB_TYPE_TIMESTAMP_LTZ:
+        return f"TIMESTAMP({scale if scale is not None else 6}) WITH LOCAL TIME ZONE"
+    if type_code == oracledb.DB_TYPE_INTERVAL_DS:
+        return f"INTERVAL DAY({precision or 2}) TO SECOND({scale if scale is not None else 6})"
+    if type_code == oracledb.DB_TYPE_INTERVAL_YM:
+        return f"INTERVAL YEAR({precision or 2}) TO MONTH"
+    if type_code == oracledb.DB_TYPE_RAW:
+        return f"RAW({max(1, min(int(internal_size or 2000), 2000))})"
+    if type_code in (oracledb.DB_TYPE_CLOB, oracledb.DB_TYPE_LONG):
+        return "CLOB"
+    if type_code in (oracledb.DB_TYPE_NCLOB, oracledb.DB_TYPE_LONG_NVARCHAR):
+        return "NCLOB"
+    if type_code in (oracledb.DB_TYPE_BLOB, oracledb.DB_TYPE_LONG_RAW):
+        return "BLOB"
+    return "VARCHAR2(4000)"  # also ROWIDs, copied as their text
+
+
+def table_columns(description):
+    """[(name, type)] for the columns of a cursor.description."""
+    return [(desc[0], column_type(desc)) for desc in description]
+
+
+def hash_partitions(column, partitions=16):
+    return f"PARTITION BY HASH ({column}) PARTITIONS {int(partitions)}"
+
+
+def interval_partitions(column, interval="NUMTOYMINTERVAL(1, 'MONTH')", first_bound="DATE '2000-01-01'"):
+    """Range partitioning that adds a partition per interval as rows arrive (for numbers, pass numeric ones)."""
+    return f"PARTITION BY RANGE ({column}) INTERVAL ({interval}) (PARTITION p_first VALUES LESS THAN ({first_bound}))"
+
+
+def create_table_sql(table, columns, primary_key=None, compress=None, partition_by=None, tablespace=None):
+    """
+    CREATE TABLE for [(name, type)] columns.
+
+    primary_key:  column name or list of names; adds a named PK constraint (and its index)
+    compress:     a COMPRESSION_CLAUSES name, or a literal table compression clause
+    partition_by: a partitioning clause, e.g. from hash_partitions() or interval_partitions()
+    """
+    definitions = [f"{name} {column_type}" for name, column_type in columns]
+    if primary_key:
+        keys = [primary_key] if isinstance(primary_key, str) else list(primary_key)
+        missing = [key for key in keys if key.upper() not in [name.upper() for name, _ in columns]]
+        if missing:
+            raise ValueError(f"Primary key column(s) {', '.join(missing)} not among the table columns")
+        name = table.rpartition(".")[2]
+        definitions.append(f"CONSTRAINT {name[:27]}_PK PRIMARY KEY ({', '.join(keys)})")
+    sql = f"CREATE TABLE {table} ({', '.join(definitions)})"
+    if compress:
+        sql += f" {COMPRESSION_CLAUSES.get(compress, compress)}"
+    if tablespace:
+        sql += f" TABLESPACE {tablespace}"
+    if partition_by:
+        sql += f" {partition_by}"
+    return sql
@@ -0,0 +1,184 @@
+import os
+import re
+import sys
+
+import oracledb
+import pytest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from load_strategy import LoadStrategy  # noqa: E402
+from reject_rows import (  # noqa: E402
+    FileRejectStore, RejectHandler, RejectLimitExceeded, TableRejectStore, execute_batch
+)
+from transfer_checkpoint import FileCheckpointStore, TableCheckpoint  # noqa: E402
+
+INSERT_SQL = "INSERT INTO DST (ID, NAME) VALUES (:1, :2)"
+
+
+class BatchError:
+    def __init__(self, offset, code, message):
+        self.offset, self.code, self.message = offset, code, message
+
+
+class FakeDatabase:
+    """Committed rows per table; each connection keeps its own uncommitted rows."""
+
+    def __init__(self, source_rows):
+        self.source_rows = source_rows
+        self.tables = {}
+
+    def connect(self, **config):
+        return FakeConnection(self)
+
+
+class FakeConnection:
+    def __init__(self, db):
+        self.db = db
+        self.pending = []
+
+    def cursor(self):
+        return FakeCursor(self)
+
+    def commit(self):
+        for table, row in self.pending:
+            self.db.tables.setdefault(table, []).append(row)
+        self.pending = []
+
+    def rollback(self):
+        self.pending = []
+
+    def close(self):
+        pass
+
+
+class FakeCursor:
+    def __init__(self, conn):
+        self.connection = conn
+        self.arraysize = self.prefetchrows = 100
+        self.rows = []
+        self.errors = []
+
+    def execute(self, sql, binds=None, **kwargs):
+        count = re.match(r"SELECT COUNT\(\*\) FROM (\S+) WHERE ID = :key", sql)
+        if count:
+            table = self.connection.db.tables.get(count.group(1), [])
+            self.rows = [(sum(row[0] == kwargs["key"] for row in table),)]
+        elif sql.lstrip().startswith("SELECT"):
+            self.rows = list(self.connection.db.source_rows)
+
+    def fetchone(self):
+        return self.rows.pop(0)
+
+    def fetchmany(self, size):
+        batch, self.rows = self.rows[:size], self.rows[size:]
+        return batch
+
+    def setinputsizes(self, *types):
+        pass
+
+    def executemany(self, sql, rows, batcherrors=False):
+        table = re.search(r"INSERT INTO (\S+)", sql).group(1)
+        self.errors = []
+        for offset, row in enumerate(rows):
+            if table == "DST" and row[1] is None:  # NOT NULL column
+                self.errors.append(BatchError(offset, 1400, 'ORA-01400: cannot insert NULL into ("DST"."NAME")'))
+            else:
+                self.connection.pending.append((table, row))
+
+    def getbatcherrors(self):
+        return self.errors
+
+    def close(self):
+        pass
+
+
+@pytest.fixture
+def db(monkeypatch):
+    db = FakeDatabase([(i, None if i % 4 == 0 else f"name {i}") for i in range(1, 21)])
+    monkeypatch.setattr(oracledb, "connect", db.connect)
+    return db
+
+
+def _load(store, limit, batch_rows=10, checkpoint=None, strategy="single_commit"):
+    """The write loop of the Db-to-db.py workers: commits per the strategy, rollback on failure."""
+    load_strategy = LoadStrategy.named(strategy)
+    src_cursor = oracledb.connect().cursor()
+    dst_conn = oracledb.connect()
+    dst_cursor = dst_conn.cursor()
+    committer = load_strategy.committer(dst_conn, checkpoint)
+    rejects = RejectHandler.open(store, {}, "SRC->DST", limit, load_strategy)
+    total_rows = 0
+    src_cursor.execute("SELECT * FROM SRC")
+    try:
+        for rows in iter(lambda: src_cursor.fetchmany(batch_rows), []):
+            written, rejected = execute_batch(dst_cursor, INSERT_SQL, rows, rejects)
+            if checkpoint:
+                checkpoint.batch_done(rows, rejected)
+            committer.batch_done(written)
+            total_rows += written
+        committer.flush()
+    except RejectLimitExceeded:
+        committer.rollback()
+        raise
+    finally:
+        rejects.close()
+    return total_rows, rejects.rejected
+
+
+def test_table_rejects_survive_the_rollback_of_the_batch_that_trips_the_limit(db):
+    with pytest.raises(RejectLimitExceeded):
+        _load(TableRejectStore(), limit=3)
+
+    assert "DST" not in db.tables  # the load itself was rolled back
+    rejects = db.tables["TRANSFER_REJECTS"]
+    assert [(name, code) for name, code, *_ in rejects] == [("SRC->DST", 1400)] * 5
+    assert '[4, null]' in rejects[0][3]
+
+
+def test_file_rejects_survive_the_limit(db, tmp_path):
+    store = FileRejectStore(str(tmp_path))
+    with pytest.raises(RejectLimitExceeded):
+        _load(store, limit=0)
+
+    with open(store.location("SRC->DST")) as f:
+        assert len(f.readlines()) == 2  # the first batch's two rejects
+
+
+def test_rows_under_the_limit_are_loaded_and_rejects_counted(db):
+    total_rows, rejected = _load(TableRejectStore(), limit=None)
+
+    assert total_rows == len(db.tables["DST"]) == 15
+    assert rejected == len(db.tables["TRANSFER_REJECTS"]) == 5
+
+
+def _checkpoint(tmp_path):
+    checkpoint = TableCheckpoint(FileCheckpointStore(str(tmp_path)), "SRC", "DST", "ID")
+    checkpoint.select_sql(["ID", "NAME"])
+    return checkpoint
+
+
+def test_checkpoint_counts_written_rows_and_moves_past_rejects(db, tmp_path):
+    checkpoint = _checkpoint(tmp_path)
+    total_rows, rejected = _load(TableRejectStore(), limit=None, batch_rows=8, checkpoint=checkpoint,
+                                 strategy="conventional")
+
+    assert checkpoint.rows == total_rows == len(db.tables["DST"]) == 15
+    assert checkpoint.last_key == 20  # the last row was rejected, the resume point still passes it
+
+
+def test_crash_after_commit_of_a_batch_ending_in_a_reject_is_resolved_as_landed(db, tmp_path):
+    checkpoint = _checkpoint(tmp_path)
+    dst_conn = oracledb.connect()
+    rejects = RejectHandler.open(TableRejectStore(), {}, "SRC->DST", None)
+    rows = db.source_rows[:8]  # ID 8 has no name and is rejected
+    written, rejected = execute_batch(dst_conn.cursor(), INSERT_SQL, rows, rejects)
+    checkpoint.batch_done(rows, rejected)
+    checkpoint.before_commit(dst_conn)
+    dst_conn.commit()  # the process dies before after_commit
+
+    resumed = _checkpoint(tmp_path)
+    resumed._resolve_pending(dst_conn, checkpoint.store.load(dst_conn, checkpoint.name))
+
+    assert (written, resumed.rows, resumed.last_key) == (6, 6, 8)
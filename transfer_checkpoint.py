@@ -0,0 +1,342 @@
+import datetime
+import json
+import os
+import re
+import tempfile
+
+import oracledb
+
+# Resumable table copies. A checkpoint records the last committed key of a source->destination
+# copy, written together with the batch it covers, so a rerun continues with the next key and
+# tables already marked done are skipped. Rows are read in key order (the source's single-column
+# primary key by default, ROWID when there is none), which costs a sort or an index scan. A key
+# given by the caller must be unique and NOT NULL: resuming after key k skips every row <= k.
+DEFAULT_CHECKPOINT_DIR = os.getenv("TRANSFER_CHECKPOINT_DIR", "transfer_checkpoints")
+CHECKPOINT_TABLE = "TRANSFER_CHECKPOINTS"
+ROWID_KEY = "ROWID"
+
+
+def encode_key(value):
+    if value is None:
+        return None
+    if isinstance(value, datetime.datetime):
+        return ["datetime", value.isoformat()]
+    if isinstance(value, datetime.date):
+        return ["date", value.isoformat()]
+    if isinstance(value, int):
+        return ["int", str(value)]
+    if isinstance(value, float):
+        return ["float", repr(value)]
+    return ["str", str(value)]
+
+
+def decode_key(encoded):
+    if encoded is None:
+        return None
+    kind, text = encoded
+    if kind == "datetime":
+        return datetime.datetime.fromisoformat(text)
+    if kind == "date":
+        return datetime.date.fromisoformat(text)
+    if kind == "int":
+        return int(text)
+    if kind == "float":
+        return float(text)
+    return text
+
+
+def primary_key_columns(conn, table):
+    """The table's primary key columns in key order (empty when it has none)."""
+    owner, _, name = table.rpartition(".")
+    cursor = conn.cursor()
+    cursor.execute("""
+        SELECT cc.column_name
+        FROM all_constraints c
+        JOIN all_cons_columns cc
+          ON cc.owner = c.owner
+         AND cc.constraint_name = c.constraint_name
+        WHERE c.constraint_type = 'P'
+          AND c.owner = :owner
+          AND c.table_name = :name
+        ORDER BY cc.position
+    """, owner=(owner or conn.username).upper(), name=name.upper())
+    columns = [row[0] for row in cursor.fetchall()]
+    cursor.close()
+    return columns
+
+
+def primary_key_column(conn, table):
+    """The table's primary key column, or None when it has none or the key is composite."""
+    columns = primary_key_columns(conn, table)
+    return columns[0] if len(columns) == 1 else None
+
+
+def is_unique_key(conn, table, column):
+    """Whether column alone is NOT NULL and unique in table (a single-column key or unique index)."""
+    owner, _, name = table.rpartition(".")
+    cursor = conn.cursor()
+    cursor.execute("""
+        SELECT COUNT(*)
+        FROM all_tab_columns col
+        WHERE col.owner = :owner AND col.table_name = :name AND col.column_name = :col_name
+          AND col.nullable = 'N'
+          AND (EXISTS (SELECT 1 FROM all_constraints c
+                       JOIN all_cons_columns cc ON cc.owner = c.owner AND cc.constraint_name = c.constraint_name
+                       WHERE c.owner = col.owner AND c.table_name = col.table_name
+                         AND c.constraint_type IN ('P', 'U') AND c.status = 'ENABLED'
+                       GROUP BY c.constraint_name
+                       HAVING COUNT(*) = 1 AND MAX(cc.column_name) = col.column_name)
+               OR EXISTS (SELECT 1 FROM all_indexes i
+                          JOIN all_ind_columns ic ON ic.index_owner = i.owner AND ic.index_name = i.index_name
+                          WHERE i.table_owner = col.owner AND i.table_name = col.table_name
+                            AND i.uniqueness = 'UNIQUE'
+                          GROUP BY i.owner, i.index_name
+                          HAVING COUNT(*) = 1 AND MAX(ic.column_name) = col.column_name))
+    """, owner=(owner or conn.username).upper(), name=name.upper(), col_name=column.upper())
+    unique = cursor.fetchone()[0] > 0
+    cursor.close()
+    return unique
+
+
+class FileCheckpointStore:
+    """One JSON file per table copy in a local directory.
+
+    The next key is written as pending before each commit and confirmed after it; a crash in
+    between is resolved on resume by looking the pending key up in the destination.
+    """
+
+    def __init__(self, directory=DEFAULT_CHECKPOINT_DIR):
+        self.directory = directory
+        os.makedirs(directory, exist_ok=True)
+
+    def _path(self, name):
+        return os.path.join(self.directory, re.sub(r"[^A-Za-z0-9_.-]+", "_", name) + ".json")
+
+    def _write(self, name, state):
+        fd, tmp_path = tempfile.mkstemp(dir=self.directory, suffix=".tmp")
+        with os.fdopen(fd, "w") as f:
+            json.dump(state, f)
+        os.replace(tmp_path, self._path(name))  # never a half-written checkpoint
+
+    def load(self, conn, name):
+        try:
+            with open(self._path(name)) as f:
+                return json.load(f)
+        except FileNotFoundError:
+            return None
+
+    def before_commit(self, conn, name, next_state, pending_state):
+        self._write(name, pending_state)
+
+    def after_commit(self, conn, name, state):
+        self._write(name, state)
+
+    def mark_done(self, conn, name, state):
+        self._write(name, state)
+
+    def reset(self, conn, name):
+        try:
+            os.remove(self._path(name))
+        except FileNotFoundError:
+            pass
+
+
+class TableCheckpointStore:
+    """Checkpoints in a destination control table, updated in the same transaction as the rows."""
+
+    def __init__(self, table=CHECKPOINT_TABLE):
+        self.table = table
+        self._ready = False
+
+    def _ensure_table(self, conn):
+        if self._ready:
+            return
+        self._ready = True
+        cursor = conn.cursor()
+        try:
+            cursor.execute(f"""
+                CREATE TABLE {self.table} (
+                    transfer_name VARCHAR2(512) PRIMARY KEY,
+                    state VARCHAR2(4000) NOT NULL,
+                    updated_at TIMESTAMP DEFAULT SYSTIMESTAMP NOT NULL
+                )
+            """)
+        except oracledb.DatabaseError as e:
+            if e.args[0].code != 955:  # ORA-00955: already exists
+                raise
+        finally:
+            cursor.close()
+
+    def load(self, conn, name):
+        self._ensure_table(conn)
+        cursor = conn.cursor()
+        cursor.execute(f"SELECT state FROM {self.table} WHERE transfer_name = :name", name=name)
+        row = cursor.fetchone()
+        cursor.close()
+        return json.loads(row[0]) if row else None
+
+    def _save(self, conn, name, state):
+        cursor = conn.cursor()
+        cursor.execute(f"""
+            MERGE INTO {self.table} c
+            USING (SELECT :name transfer_name FROM dual) s
+            ON (c.transfer_name = s.transfer_name)
+            WHEN MATCHED THEN UPDATE SET c.state = :state, c.updated_at = SYSTIMESTAMP
+            WHEN NOT MATCHED THEN INSERT (transfer_name, state) VALUES (:name, :state)
+        """, name=name, state=json.dumps(state))
+        cursor.close()
+
+    def before_commit(self, conn, name, next_state, pending_state):
+        self._save(conn, name, next_state)  # committed with the batch, so never ahead or behind it
+
+    def after_commit(self, conn, name, state):
+        pass
+
+    def mark_done(self, conn, name, state):
+        self._save(conn, name, state)
+        conn.commit()
+
+    def reset(self, conn, name):
+        self._ensure_table(conn)
+        cursor = conn.cursor()
+        cursor.execute(f"DELETE FROM {self.table} WHERE transfer_name = :name", name=name)
+        conn.commit()
+        cursor.close()
+
+
+class TableCheckpoint:
+    """Progress of one source->destination table copy, saved around each commit of its rows."""
+
+    def __init__(self, store, src_table, dst_table, key_column):
+        self.store = store
+        self.name = f"{src_table}->{dst_table}".upper()
+        self.src_table = src_table
+        self.dst_table = dst_table
+        self.key_column = key_column.upper()
+        self.last_key = None
+        self.rows = 0
+        self.done = False
+        self.key_index = -1  # ROWID rides along as an extra last column
+        self._pending_key = None
+        self._pending_rows = 0
+        self._landed_key = None  # last pending row actually written, what a crash check looks up
+
+    @classmethod
+    def open(cls, store, src_conn, dst_conn, src_table, dst_table, key_column=None):
+        """Load saved progress; key_column defaults to the single-column primary key, else ROWID."""
+        name = f"{src_table}->{dst_table}".upper()
+        state = store.load(dst_conn, name)
+        if state and key_column and state["key_column"] != key_column.upper():
+            raise ValueError(
+                f"{name} was checkpointed on {state['key_column']}, not {key_column}; reset the checkpoint to change keys"
+            )
+        if state:
+            key_column = state["key_column"]
+        else:
+            key_column = key_column or primary_key_column(src_conn, src_table) or ROWID_KEY
+        if key_column.upper() != ROWID_KEY and not is_unique_key(src_conn, src_table, key_column):
+            raise ValueError(
+                f"Checkpoint key {key_column} of {src_table} is not a NOT NULL single-column primary/unique key; "
+                f"a resume would skip rows sharing the last committed value (omit key_column to use the primary key or ROWID)"
+            )
+        checkpoint = cls(store, src_table, dst_table, key_column)
+        if state:
+            checkpoint.done = state["status"] == "done"
+            checkpoint.rows = state["rows"]
+            checkpoint.last_key = decode_key(state["last_key"])
+            if state.get("pending") is not None:
+                checkpoint._resolve_pending(dst_conn, state)
+        return checkpoint
+
+    def _resolve_pending(self, dst_conn, state):
+        """File store only: find out whether the batch being committed at the crash landed."""
+        pending = decode_key(state["pending"])
+        if self.key_column == ROWID_KEY:
+            raise RuntimeError(
+                f"{self.name} stopped during a commit and ROWIDs cannot be looked up in the destination; "
+                f"use TableCheckpointStore for tables without a primary key, or reset and reload"
+            )
+        cursor = dst_conn.cursor()
+        cursor.execute(f"SELECT COUNT(*) FROM {self.dst_table} WHERE {self.key_column} = :key", key=pending)
+        landed = cursor.fetchone()[0] > 0
+        cursor.close()
+        if landed:
+            self.last_key = decode_key(state.get("pending_last_key") or state["pending"])
+            self.rows = state["pending_rows"]
+
+    def describe(self):
+        if self.done:
+            return f"already complete ({self.rows} rows)"
+        if self.last_key is None:
+            return f"starting, checkpoints on {self.key_column}"
+        return f"resuming after {self.key_column} {self.last_key} ({self.rows} rows already copied)"
+
+    def select_sql(self, col_names):
+        """Key-ordered source query after the checkpoint, with its binds; also locates the key column."""
+        rowid = self.key_column == ROWID_KEY
+        if not rowid:
+            upper = [col.upper() for col in col_names]
+            if self.key_column not in upper:
+                raise ValueError(f"Checkpoint key {self.key_column} is not a column of {self.src_table}")
+            self.key_index = upper.index(self.key_column)
+        key = "t.ROWID" if rowid else f"t.{self.key_column}"
+        select_sql = f"SELECT t.*{', ROWIDTOCHAR(t.ROWID)' if rowid else ''} FROM {self.src_table} t"
+        binds = {}
+        if self.last_key is not None:
+            select_sql += f" WHERE {key} > {'CHARTOROWID(:last_key)' if rowid else ':last_key'}"
+            binds["last_key"] = self.last_key
+        return f"{select_sql} ORDER BY {key}", binds
+
+    def insert_rows(self, rows):
+        """Rows as the destination takes them (without the trailing ROWID column)."""
+        if self.key_column == ROWID_KEY:
+            return [row[:-1] for row in rows]
+        return rows
+
+    def batch_done(self, rows, rejected=()):
+        """Record a batch once inserted; rejected are the offsets of the rows the destination refused.
+
+        A resume continues after the last row read, rejected or not; rejected rows are not counted.
+        """
+        self._pending_key = rows[-1][self.key_index]
+        rejected = set(rejected)
+        for offset in range(len(rows) - 1, -1, -1):
+            if offset not in rejected:
+                self._landed_key = rows[offset][self.key_index]
+                break
+        self._pending_rows += len(rows) - len(rejected)
+
+    def _state(self, status, last_key, rows, pending=None):
+        return {
+            "status": status,
+            "key_column": self.key_column,
+            "last_key": encode_key(last_key),
+            "rows": rows,
+            "pending": encode_key(pending),
+            "pending_rows": rows + self._pending_rows if pending is not None else None,
+            "pending_last_key": encode_key(self._pending_key) if pending is not None else None
+        }
+
+    def before_commit(self, conn):
+        if self._pending_key is not None:
+            # pending is the last written row: when every pending row was rejected there is
+            # nothing to look up, and a resume simply reads those rows again
+            self.store.before_commit(
+                conn, self.name,
+                self._state("running", self._pending_key, self.rows + self._pending_rows),
+                self._state("running", self.last_key, self.rows, pending=self._landed_key)
+            )
+
+    def after_commit(self, conn):
+        if self._pending_key is not None:
+            self.last_key = self._pending_key
+            self.rows += self._pending_rows
+            self.rollback()
+            self.store.after_commit(conn, self.name, self._state("running", self.last_key, self.rows))
+
+    def rollback(self):
+        self._pending_key, self._pending_rows, self._landed_key = None, 0, None
+
+    def finish(self, conn):
+        self.done = True
+        self.store.mark_done(conn, self.name, self._state("done", self.last_key, self.rows))
@@ -0,0 +1,213 @@
+import datetime
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import oracledb
+
+from transfer_checkpoint import primary_key_columns
+
+# Verification of finished copies. Both tables are cut into the same buckets of a key column
+# (equal-width WIDTH_BUCKET ranges for numbers and dates, ORA_HASH buckets for other keys, row-hash
+# buckets without a key) and each side computes COUNT(*) and SUM(row hash) per bucket in one
+# grouped scan. The sum does not depend on row order, so the two scans run at the same time with
+# no sort and nothing shipped between the databases. Only buckets whose count or sum differ are
+# reported, each with the predicate that selects its rows for a re-copy.
+VERIFY_RANGES = 256
+NUMBER_TYPES = (oracledb.DB_TYPE_NUMBER, oracledb.DB_TYPE_BINARY_DOUBLE,
+                oracledb.DB_TYPE_BINARY_FLOAT, oracledb.DB_TYPE_BINARY_INTEGER)
+DATE_TYPES = (oracledb.DB_TYPE_DATE, oracledb.DB_TYPE_TIMESTAMP,
+              oracledb.DB_TYPE_TIMESTAMP_TZ, oracledb.DB_TYPE_TIMESTAMP_LTZ)
+TEXT_TYPES = (oracledb.DB_TYPE_VARCHAR, oracledb.DB_TYPE_CHAR, oracledb.DB_TYPE_NVARCHAR,
+              oracledb.DB_TYPE_NCHAR, oracledb.DB_TYPE_RAW, oracledb.DB_TYPE_ROWID)
+HASH_CONCAT_COLUMNS = 300  # column hashes (10 digits and a separator) joined stay within VARCHAR2(4000)
+
+
+def _column_text(column, type_code):
+    """A column as NLS-independent text for hashing, or None for types that are not compared."""
+    if type_code in NUMBER_TYPES:
+        return f"TO_CHAR({column}, 'TM9')"
+    if type_code == oracledb.DB_TYPE_DATE:
+        return f"TO_CHAR({column}, 'YYYYMMDDHH24MISS')"
+    if type_code == oracledb.DB_TYPE_TIMESTAMP:
+        return f"TO_CHAR({column}, 'YYYYMMDDHH24MISSFF9')"
+    if type_code in (oracledb.DB_TYPE_TIMESTAMP_TZ, oracledb.DB_TYPE_TIMESTAMP_LTZ):
+        return f"TO_CHAR(SYS_EXTRACT_UTC({column}), 'YYYYMMDDHH24MISSFF9')"
+    if type_code in (oracledb.DB_TYPE_CLOB, oracledb.DB_TYPE_NCLOB):
+        return f"DBMS_LOB.GETLENGTH({column}) || ':' || DBMS_LOB.SUBSTR({column}, 900, 1)"  # length + prefix
+    if type_code == oracledb.DB_TYPE_BLOB:
+        return f"DBMS_LOB.GETLENGTH({column}) || ':' || RAWTOHEX(DBMS_LOB.SUBSTR({column}, 900, 1))"
+    if type_code in TEXT_TYPES:
+        return column
+    return None  # LONG, object and XML columns
+
+
+def _hash_concat(pieces):
+    if len(pieces) > HASH_CONCAT_COLUMNS:
+        pieces = [
+            f"TO_CHAR({_hash_concat(pieces[i:i + HASH_CONCAT_COLUMNS])})"
+            for i in range(0, len(pieces), HASH_CONCAT_COLUMNS)
+        ]
+    return "ORA_HASH(" + " || '|' || ".join(pieces) + ")"
+
+
+def row_hash_sql(description, alias="t"):
+    """(ORA_HASH expression over one row, names of the columns it leaves out)."""
+    pieces, skipped = [], []
+    for name, type_code, *_ in description:
+        text = _column_text(f'{alias}."{name}"', type_code)
+        if text is None:
+            skipped.append(name)
+            continue
+        pieces.append(f"NVL2({text}, TO_CHAR(ORA_HASH({text})), 'N')")  # NULL differs from any value
+    return _hash_concat(pieces), skipped
+
+
+class BucketPlan:
+    """The buckets both sides are grouped by: a SQL expression over alias t and its binds."""
+
+    def __init__(self, expression, binds, key=None, low=None, high=None, ranges=None):
+        self.expression = expression
+        self.binds = binds
+        self.key = key
+        self.low = low
+        self.high = high
+        self.width = (high - low) / ranges if low is not None else None
+        self.ranges = ranges
+
+    @classmethod
+    def for_key(cls, conn, table, key_column, key_type, ranges, row_hash):
+        if key_column is None:
+            return cls(f"MOD({row_hash}, {ranges})", {})
+        key = f't."{key_column}"'
+        if key_type in NUMBER_TYPES or key_type in DATE_TYPES:
+            cursor = conn.cursor()
+            cursor.execute(f"SELECT MIN({key}), MAX({key}) FROM {table} t")
+            low, high = cursor.fetchone()
+            cursor.close()
+            if low is not None:
+                if high == low:  # a single key value: any width will do
+                    high = low + (1 if key_type in NUMBER_TYPES else datetime.timedelta(days=1))
+                # keys below low / at or above high land in buckets 0 and ranges + 1, so rows only
+                # the destination has are still counted
+                return cls(f"WIDTH_BUCKET({key}, :low, :high, {ranges})", {"low": low, "high": high},
+                           key, low, high, ranges)
+        return cls(f"NVL2({key}, ORA_HASH({key}, {ranges - 1}), NULL)", {}, key)
+
+    def predicate(self, bucket):
+        """WHERE condition (on alias t) and binds selecting one bucket's rows."""
+        if bucket is None:
+            return f"{self.key} IS NULL", {}
+        return f"{self.expression} = :bucket", {**self.binds, "bucket": bucket}
+
+    def describe(self, bucket):
+        if bucket is None:
+            return f"{self.key} IS NULL"
+        if self.width is None:
+            return f"{'row' if self.key is None else self.key} hash bucket {bucket}"
+        if bucket == 0:
+            return f"{self.key} < {self.low}"
+        if bucket == self.ranges + 1:
+            return f"{self.key} >= {self.high}"
+        return f"{self.key} [{self.low + self.width * (bucket - 1)}, {self.low + self.width * bucket})"
+
+
+def bucket_sums(conn, table, plan, row_hash, degree=None):
+    """{bucket: (rows, hash sum)} for one side, in one grouped scan."""
+    hint = f"/*+ PARALLEL({degree}) */ " if degree else ""
+    cursor = conn.cursor()
+    cursor.arraysize = 1000
+    cursor.execute(f"""
+        SELECT {hint}bucket, COUNT(*), SUM(h)
+        FROM (SELECT {plan.expression} bucket, {row_hash} h FROM {table} t)
+        GROUP BY bucket
+    """, plan.binds)
+    sums = {(None if bucket is None else int(bucket)): (rows, total) for bucket, rows, total in cursor}
+    cursor.close()
+    return sums
+
+
+def verify_table(src_conn, dst_conn, src_table, dst_table=None, key_column=None, ranges=VERIFY_RANGES, degree=None):
+    """
+    Compare src_table and dst_table bucket by bucket; returns the figures and the mismatching buckets.
+
+    key_column: column to bucket on, default the first primary key column of the source; without
+                one, rows are bucketed by their own hash (a re-copy then has to diff the bucket)
+    ranges:     number of buckets
+    degree:     PARALLEL degree for each side's scan (default: the tables' own setting)
+    """
+    dst_table = dst_table or src_table
+    started = time.monotonic()
+    cursor = src_conn.cursor()
+    cursor.execute(f"SELECT * FROM {src_table} WHERE 1 = 0")
+    description = cursor.description
+    cursor.close()
+    if key_column is None:
+        key_column = next(iter(primary_key_columns(src_conn, src_table)), None)
+    key_type = None
+    if key_column is not None:
+        types = {name.upper(): type_code for name, type_code, *_ in description}
+        if key_column.upper() not in types:
+            raise ValueError(f"Verify key {key_column} is not a column of {src_table}")
+        key_column = next(name for name, *_ in description if name.upper() == key_column.upper())
+        key_type = types[key_column.upper()]
+
+    row_hash, skipped = row_hash_sql(description)
+    if skipped:
+        print(f"⚠️ [{src_table}] Not compared (unsupported types): {', '.join(skipped)}")
+    plan = BucketPlan.for_key(src_conn, src_table, key_column, key_type, ranges, row_hash)
+
+    # Both sides scan at the same time, each on its own connection
+    with ThreadPoolExecutor(max_workers=2) as executor:
+        src_future = executor.submit(bucket_sums, src_conn, src_table, plan, row_hash, degree)
+        dst_future = executor.submit(bucket_sums, dst_conn, dst_table, plan, row_hash, degree)
+        src_sums, dst_sums = src_future.result(), dst_future.result()
+
+    mismatches = []
+    for bucket in sorted(set(src_sums) | set(dst_sums), key=lambda b: (b is None, b)):
+        src_rows, src_hash = src_sums.get(bucket, (0, None))
+        dst_rows, dst_hash = dst_sums.get(bucket, (0, None))
+        if (src_rows, src_hash) != (dst_rows, dst_hash):
+            where, binds = plan.predicate(bucket)
+            mismatches.append({
+                "bucket": bucket,
+                "label": plan.describe(bucket),
+                "where": where,
+                "binds": binds,
+                "source_rows": src_rows,
+                "destination_rows": dst_rows
+            })
+    seconds = time.monotonic() - started
+
+    src_total = sum(rows for rows, _ in src_sums.values())
+    dst_total = sum(rows for rows, _ in dst_sums.values())
+    name = f"{src_table} → {dst_table}"
+    print(
+        f"{'✅' if not mismatches else '❌'} [{name}] Verified {len(set(src_sums) | set(dst_sums))} bucket(s) "
+        f"in {seconds:.1f}s: source {src_total} rows, destination {dst_total} rows, {len(mismatches)} mismatching"
+    )
+    for m in mismatches:
+        print(f"   [{name}] {m['label']}: source {m['source_rows']} rows, destination {m['destination_rows']} rows")
+    return {
+        "source_table": src_table,
+        "destination_table": dst_table,
+        "key_column": key_column,
+        "buckets": len(set(src_sums) | set(dst_sums)),
+        "source_rows": src_total,
+        "destination_rows": dst_total,
+        "skipped_columns": skipped,
+        "mismatches": mismatches,
+        "verified": not mismatches,
+        "seconds": seconds
+    }
+
+
+def verify_single_table(src_config, dst_config, table_pair, key_column=None, ranges=VERIFY_RANGES, degree=None):
+    """Worker function: verify_table on its own pair of connections."""
+    src_table, dst_table = table_pair
+    src_conn = oracledb.connect(**src_config)
+    dst_conn = oracledb.connect(**dst_config)
+    try:
+        return verify_table(src_conn, dst_conn, src_table, dst_table, key_column, ranges, degree)
+    finally:
+        src_conn.close()
+        dst_conn.close()
@@ -0,0 +1,179 @@
+import hashlib
+import os
+import sys
+import urllib.request
+
+from PyQt5.QtCore import QBuffer, QByteArray, QIODevice, QUrl
+from PyQt5.QtWebEngineCore import (
+    QWebEngineUrlRequestInterceptor,
+    QWebEngineUrlRequestJob,
+    QWebEngineUrlScheme,
+    QWebEngineUrlSchemeHandler,
+)
+from PyQt5.QtWebEngineWidgets import QWebEngineProfile
+
+# CDN scripts the exporters inject, vendored under static/vendor so render hosts never fetch
+# them. Run `python vendor_assets.py` on a connected machine to (re)download them; every file is
+# checked against the SHA-256 pinned in static/vendor/SHA256SUMS, both when it is downloaded and
+# when it is served. `python vendor_assets.py --force --pin` records the hashes of a fresh download:
+# review the files, then commit the manifest.
+VENDOR_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "static", "vendor")
+VENDOR_MANIFEST = os.path.join(VENDOR_DIR, "SHA256SUMS")  # "<sha256>  <path>" lines, as sha256sum writes
+VENDOR_SCHEME = b"vendor"
+CDN_ASSETS = {
+    "https://cdnjs.cloudflare.com/ajax/libs/socket.io/4.7.5/socket.io.min.js": "socket.io/4.7.5/socket.io.min.js",
+    "https://cdnjs.cloudflare.com/ajax/libs/d3/7.8.5/d3.min.js": "d3/7.8.5/d3.min.js",
+    "https://cdnjs.cloudflare.com/ajax/libs/d3-sankey/0.12.3/d3-sankey.min.js": "d3-sankey/0.12.3/d3-sankey.min.js",
+}
+
+_asset_cache = {}
+_installed = {}
+
+
+def register_vendor_scheme():
+    """Must run before the QApplication is created; later calls are ignored by Qt."""
+    if not QWebEngineUrlScheme.schemeByName(VENDOR_SCHEME).name().isEmpty():
+        return
+    scheme = QWebEngineUrlScheme(VENDOR_SCHEME)
+    scheme.setSyntax(QWebEngineUrlScheme.Syntax.Path)
+    scheme.setFlags(QWebEngineUrlScheme.SecureScheme | QWebEngineUrlScheme.CorsEnabled)
+    QWebEngineUrlScheme.registerScheme(scheme)
+
+
+def pinned_hashes():
+    """{relative path: SHA-256} from the manifest; empty when nothing is pinned yet."""
+    try:
+        with open(VENDOR_MANIFEST) as f:
+            return {path: digest for digest, path in (line.split() for line in f if line.strip())}
+    except FileNotFoundError:
+        return {}
+
+
+def _sha256(body):
+    return hashlib.sha256(body).hexdigest()
+
+
+def load_asset(relative_path):
+    """Read a vendored file once per process; returns bytes or None if it is missing or not as pinned."""
+    if relative_path not in _asset_cache:
+        path = os.path.normpath(os.path.join(VENDOR_DIR, relative_path))
+        digest = pinned_hashes().get(relative_path)
+        if digest is None or not path.startswith(VENDOR_DIR) or not os.path.isfile(path):
+            return None
+        with open(path, "rb") as f:
+            body = f.read()
+        if _sha256(body) != digest:
+            print(f"Vendored asset does not match its pinned SHA-256, not serving it: {relative_path}")
+            body = None
+        _asset_cache[relative_path] = body
+    return _asset_cache[relative_path]
+
+
+class VendorSchemeHandler(QWebEngineUrlSchemeHandler):
+    def requestStarted(self, job):
+        body = load_asset(job.requestUrl().path().lstrip("/"))
+        if body is None:
+            job.fail(QWebEngineUrlRequestJob.UrlNotFound)
+            return
+        buffer = QBuffer(job)
+        buffer.setData(QByteArray(body))
+        buffer.open(QIODevice.ReadOnly)
+        job.reply(b"application/javascript", buffer)
+
+
+class VendorAssetInterceptor(QWebEngineUrlRequestInterceptor):
+    """Redirects known CDN script URLs to the in-memory vendor:// scheme."""
+
+    def __init__(self, redirects, block_external=False, parent=None):
+        super().__init__(parent)
+        self.redirects = redirects
+        self.block_external = block_external
+
+    def interceptRequest(self, info):
+        url = info.requestUrl()
+        target = self.redirects.get(url.toString())
+        if target is not None:
+            info.redirect(target)
+        elif self.block_external and url.scheme() in ("http", "https") and url.host() not in ("127.0.0.1", "localhost"):
+            info.block(True)
+
+
+def install_vendor_assets(profile=None, block_external=False):
+    """Serve vendored CDN assets from memory for every page of the profile (idempotent).
+
+    A missing asset falls back to the CDN, unless block_external is set: the CDN request would be
+    blocked and the page rendered without the script, so that raises RuntimeError instead.
+    """
+    profile = profile or QWebEngineProfile.defaultProfile()
+    key = id(profile)
+    if key in _installed:
+        return _installed[key]
+
+    redirects = {}
+    missing = []
+    for cdn_url, relative_path in CDN_ASSETS.items():
+        if load_asset(relative_path) is not None:
+            redirects[cdn_url] = QUrl(f"{VENDOR_SCHEME.decode()}:{relative_path}")
+        else:
+            missing.append(relative_path)
+    if missing and block_external:
+        raise RuntimeError(
+            f"Vendored assets missing or not matching {VENDOR_MANIFEST}: {', '.join(missing)}; "
+            f"run `python vendor_assets.py` (external requests are blocked, so there is no CDN fallback)"
+        )
+    for relative_path in missing:
+        print(f"Vendored asset missing, falling back to CDN: {relative_path}")
+
+    handler = VendorSchemeHandler(profile)
+    interceptor = VendorAssetInterceptor(redirects, block_external, profile)
+    profile.installUrlSchemeHandler(VENDOR_SCHEME, handler)
+    profile.setUrlRequestInterceptor(interceptor)
+    _installed[key] = (handler, interceptor)
+    return _installed[key]
+
+
+def download_assets(force=False, pin=False):
+    """Fetch missing assets (all with force) and check each against its pinned SHA-256.
+
+    Raises RuntimeError for an asset without a pin or with a different hash; nothing unverified is
+    written. pin=True records the hashes of what is vendored now in the manifest instead.
+    """
+    pinned = {} if pin else pinned_hashes()
+    for cdn_url, relative_path in CDN_ASSETS.items():
+        if not pin and relative_path not in pinned:
+            raise RuntimeError(
+                f"No pinned SHA-256 for {relative_path} in {VENDOR_MANIFEST}; "
+                f"run `python vendor_assets.py --force --pin` on a trusted machine, review the files and commit the manifest"
+            )
+        path = os.path.join(VENDOR_DIR, relative_path)
+        downloaded = force or not os.path.exists(path)
+        if downloaded:
+            with urllib.request.urlopen(cdn_url, timeout=30) as response:
+                body = response.read()
+        else:
+            with open(path, "rb") as f:
+                body = f.read()
+        digest = _sha256(body)
+        if pin:
+            pinned[relative_path] = digest
+        elif digest != pinned[relative_path]:
+            raise RuntimeError(
+                f"SHA-256 of {cdn_url if downloaded else path} is {digest}, pinned {pinned[relative_path]}"
+            )
+        if downloaded:
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            with open(path, "wb") as f:
+                f.write(body)
+            print(f"Vendored {cdn_url} -> {path} ({len(body)} bytes)")
+        else:
+            print(f"Already vendored: {relative_path}")
+    if pin:
+        with open(VENDOR_MANIFEST, "w") as f:
+            f.writelines(f"{digest}  {path}\n" for path, digest in sorted(pinned.items()))
+        print(f"Pinned {len(pinned)} asset(s) in {VENDOR_MANIFEST}")
+
+
+register_vendor_scheme()
+
+if __name__ == "__main__":
+    download_assets(force="--force" in sys.argv, pin="--pin" in sys.argv)